@@ -0,0 +1,322 @@
+# Mines game archives on a pool of processes, run from the command line:
+#     python analysis.py games.bin --out results.jsonl --workers 8
+# Every game is replayed with the Tiles rules; per-game results are written
+# as JSON lines while the archive is read, and a summary is printed at the
+# end.
+import json
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import islice
+from os import cpu_count
+from time import time
+from board import PASS
+from evaluation import get_evaluator
+from game_record import read_games, GameRecord
+from position import legal_mask
+from search import Search
+from tiles import Tiles
+
+COLUMNS = "abcdefghijklmno"
+
+
+def notation(move, TILES_DIMENS):
+    """Returns a move in algebraic notation, such as "d3", or "pass"."""
+    if move == PASS:
+        return "pass"
+    row, col = divmod(move, TILES_DIMENS)
+    return COLUMNS[col] + str(row + 1)
+
+
+def evaluator(TILES_DIMENS):
+    """
+    Returns a function scoring (black, white) bitboards for black: the
+    pattern tables on 8x8 boards, and the search evaluation otherwise.
+    """
+    if TILES_DIMENS == 8:
+        return get_evaluator(8).evaluate
+    search = Search(TILES_DIMENS)
+
+    def evaluate(black, white):
+        return search.evaluate(black, white, legal_mask(black, white,
+                                                        search.masks))
+    return evaluate
+
+
+def analyze_game(index, record, opening_plies=4):
+    """
+    Replays a GameRecord with the Tiles rules. Returns a dict of the game
+    index, its opening, the winner, the disc difference (black minus white)
+    and the ply whose move changed the evaluation most (swing_ply, swing,
+    for black). Raises ValueError on an illegal move.
+    """
+    dimens = record.TILES_DIMENS
+    tiles = Tiles(dimens, dimens, 1, dimens)
+    tiles.initial_tiles(False)
+    evaluate = evaluator(dimens)
+    position = tiles.position
+    score = evaluate(position.black, position.white)
+    swing_ply, swing = None, 0
+    for ply, move in enumerate(record.moves):
+        if move == PASS:
+            if position.legal_moves(tiles.place_black):
+                raise ValueError("Game {0}: pass with legal moves.".format(
+                    index))
+            tiles.place_black = not tiles.place_black
+            continue
+        if not position.legal_moves(tiles.place_black) >> move & 1:
+            raise ValueError("Game {0}: illegal move {1}.".format(
+                index, notation(move, dimens)))
+        tiles.make_move(*divmod(move, dimens))
+        previous, score = score, evaluate(position.black, position.white)
+        if abs(score - previous) > abs(swing):
+            swing_ply, swing = ply, score - previous
+    difference = tiles.bk_tiles - tiles.wt_tiles
+    if difference > 0:
+        winner = "black"
+    elif difference < 0:
+        winner = "white"
+    else:
+        winner = "tie"
+    opening = " ".join(notation(move, dimens)
+                       for move in record.moves[:opening_plies])
+    return {"game": index, "opening": opening, "winner": winner,
+            "disc_difference": difference, "swing_ply": swing_ply,
+            "swing": swing}
+
+
+def analyze_chunk(task):
+    """
+    Given a task (index of the first game, list of (TILES_DIMENS, moves,
+    black, white), opening_plies), analyzes every game. Returns the index
+    and the list of results. Runs in a worker process.
+    """
+    start, games, opening_plies = task
+    return start, [analyze_game(start + i, GameRecord(*game), opening_plies)
+                   for i, game in enumerate(games)]
+
+
+class Summary:
+    """
+    Totals over analyzed games.
+
+    Attributes
+    ----------
+    games : int
+        Counter of games added.
+    disc_difference : int
+        Sum of the disc differences (black minus white).
+    openings : dict
+        key: opening, in algebraic notation.
+        value: dict of games, black, white, tie and disc_difference.
+
+    Methods
+    -------
+    add
+        Adds the result of one game.
+    mean_disc_difference
+        Returns the mean disc difference (black minus white).
+    win_rates
+        Returns (opening, games, black win rate) for frequent openings.
+    """
+    def __init__(self):
+        self.games = 0
+        self.disc_difference = 0
+        self.openings = {}
+
+    def add(self, result):
+        """Adds the result of one game."""
+        self.games += 1
+        self.disc_difference += result["disc_difference"]
+        opening = self.openings.get(result["opening"])
+        if opening is None:
+            opening = self.openings[result["opening"]] = {
+                "games": 0, "black": 0, "white": 0, "tie": 0,
+                "disc_difference": 0}
+        opening["games"] += 1
+        opening[result["winner"]] += 1
+        opening["disc_difference"] += result["disc_difference"]
+
+    def mean_disc_difference(self):
+        """Returns the mean disc difference (black minus white)."""
+        return float(self.disc_difference) / max(self.games, 1)
+
+    def win_rates(self, min_games=1):
+        """
+        Returns (opening, games, black win rate) for every opening played at
+        least min_games times, most played first. Ties count half a win.
+        """
+        rates = []
+        for opening, totals in self.openings.items():
+            if totals["games"] >= min_games:
+                wins = totals["black"] + 0.5 * totals["tie"]
+                rate = wins / totals["games"]
+                rates.append((opening, totals["games"], rate))
+        rates.sort(key=lambda entry: (-entry[1], entry[0]))
+        return rates
+
+
+class Pipeline:
+    """
+    Analyzes every game of an archive on a process pool while the archive
+    is read, so archives larger than memory can be mined on every core.
+
+    Games are sent to workers in chunks, with at most a few chunks per
+    worker in flight. Results come back in archive order, or in completion
+    order when unordered, and are handed to the caller one game at a time.
+
+    Attributes
+    ----------
+    path : str
+        Name of the game archive.
+    workers : int
+        Number of worker processes. 1 analyzes in this process.
+    chunk_size : int
+        Number of games sent to a worker at a time.
+    ordered : Bool
+        Conditional for returning results in archive order.
+    opening_plies : int
+        Number of moves that make up an opening.
+    summary : instance of the Summary class.
+        Totals of the games analyzed so far.
+    elapsed : float
+        Time taken by the last call to run, in seconds.
+
+    Methods
+    -------
+    chunks
+        Generates analyze_chunk tasks while reading the archive.
+    results
+        Generates the result of every game.
+    run
+        Analyzes the archive, writing results as JSON lines if asked.
+    games_per_second
+        Returns the throughput of the last call to run.
+    """
+    def __init__(self, path, workers=None, chunk_size=256, ordered=True,
+                 opening_plies=4):
+        """
+        Parameters
+        ----------
+        path : str
+            Name of the game archive.
+        workers : int (default None)
+            Number of worker processes, None for one per CPU.
+        chunk_size : int (default 256)
+            Number of games sent to a worker at a time.
+        ordered : Bool (default True)
+            Conditional for returning results in archive order.
+        opening_plies : int (default 4)
+            Number of moves that make up an opening.
+        """
+        self.path = path
+        self.workers = workers or cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.ordered = ordered
+        self.opening_plies = opening_plies
+        self.summary = Summary()
+        self.elapsed = 0.0
+
+    def chunks(self):
+        """Generates analyze_chunk tasks while reading the archive."""
+        games, start = read_games(self.path), 0
+        while True:
+            chunk = [tuple(record) for record in islice(games,
+                                                        self.chunk_size)]
+            if not chunk:
+                return
+            yield start, chunk, self.opening_plies
+            start += len(chunk)
+
+    def results(self):
+        """
+        Generates the result of every game, adding each to the summary. At
+        most 4 chunks per worker are in flight or waiting to be returned in
+        order.
+        """
+        if self.workers == 1:
+            for task in self.chunks():
+                for result in analyze_chunk(task)[1]:
+                    self.summary.add(result)
+                    yield result
+            return
+        limit = 4 * self.workers
+        waiting, following = {}, 0
+        with ProcessPoolExecutor(self.workers) as executor:
+            pending = set()
+            tasks = self.chunks()
+            while True:
+                while len(pending) + len(waiting) < limit:
+                    task = next(tasks, None)
+                    if task is None:
+                        break
+                    pending.add(executor.submit(analyze_chunk, task))
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    start, results = future.result()
+                    waiting[start] = results
+                if not self.ordered:
+                    starts = list(waiting)
+                else:
+                    starts = []
+                    while following in waiting:
+                        starts.append(following)
+                        following += len(waiting[following])
+                for start in starts:
+                    for result in waiting.pop(start):
+                        self.summary.add(result)
+                        yield result
+
+    def run(self, out=None):
+        """
+        Analyzes the archive, writing every result as a JSON line to the
+        file named out if given. Returns the summary.
+        """
+        start = time()
+        if out is None:
+            for _ in self.results():
+                pass
+        else:
+            with open(out, "w") as f:
+                for result in self.results():
+                    f.write(json.dumps(result, sort_keys=True) + "\n")
+        self.elapsed = time() - start
+        return self.summary
+
+    def games_per_second(self):
+        """Returns the throughput of the last call to run."""
+        if not self.elapsed:
+            return 0.0
+        return self.summary.games / self.elapsed
+
+
+def main(argv=None):
+    """Parses the command line, analyzes the archive and prints a summary."""
+    parser = ArgumentParser(description="Analyze an Othello game archive.")
+    parser.add_argument("archive")
+    parser.add_argument("--out", default=None,
+                        help="write per-game results as JSON lines")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    parser.add_argument("--unordered", action="store_true",
+                        help="write results as they finish")
+    parser.add_argument("--opening-plies", type=int, default=4)
+    parser.add_argument("--top", type=int, default=10,
+                        help="number of openings listed")
+    args = parser.parse_args(argv)
+
+    pipeline = Pipeline(args.archive, args.workers, args.chunk_size,
+                        not args.unordered, args.opening_plies)
+    summary = pipeline.run(args.out)
+    for opening, games, rate in summary.win_rates()[:args.top]:
+        print("{0:24s} {1:7d} games  black wins {2:5.1%}".format(
+            opening, games, rate))
+    print("{0} games, mean disc difference (black - white) {1:+.2f}".format(
+        summary.games, summary.mean_disc_difference()))
+    print("{0:.2f}s on {1} workers, {2:.0f} games/s".format(
+        pipeline.elapsed, pipeline.workers, pipeline.games_per_second()))
+
+
+if __name__ == "__main__":
+    main()
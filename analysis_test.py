@@ -0,0 +1,67 @@
+# Test for the analysis pipeline
+import json
+import pytest
+from analysis import Pipeline, analyze_game, notation
+from board import PASS
+from game_record import GameWriter, GameRecord
+from simulator import Simulator
+
+
+def record_games(path, games, TILES_DIMENS=8):
+    """Writes seeded random games to an archive. Returns their results."""
+    simulator = Simulator(TILES_DIMENS)
+    with GameWriter(path) as writer:
+        return [simulator.play_game(seed, writer) for seed in range(games)]
+
+
+def test_notation():
+    """Moves are written as column letter and row number."""
+    assert notation(19, 8) == "d3"
+    assert notation(0, 6) == "a1"
+    assert notation(PASS, 8) == "pass"
+
+
+def test_analyze_game():
+    """Replays find the winner, and illegal moves are rejected."""
+    result = analyze_game(0, GameRecord(8, bytearray([19, 18]), 3, 3), 1)
+    assert result["opening"] == "d3"
+    assert result["disc_difference"] == 0
+    assert result["winner"] == "tie"
+    assert result["swing_ply"] in (0, 1)
+    with pytest.raises(ValueError):
+        analyze_game(0, GameRecord(8, bytearray([0]), 0, 0))
+    with pytest.raises(ValueError):
+        analyze_game(0, GameRecord(8, bytearray([PASS]), 0, 0))
+
+
+def test_pipeline(tmp_path):
+    """Every worker count and merge order gives the same results."""
+    path = str(tmp_path / "games.bin")
+    results = record_games(path, 40)
+    out = str(tmp_path / "results.jsonl")
+    serial = Pipeline(path, workers=1, chunk_size=7)
+    summary = serial.run(out)
+    with open(out) as f:
+        lines = [json.loads(line) for line in f]
+    assert [line["game"] for line in lines] == list(range(40))
+    for line, result in zip(lines, results):
+        assert line["disc_difference"] == result["black"] - result["white"]
+        assert line["winner"] == result["winner"]
+    assert summary.games == 40
+    assert sum(games for _, games, _ in summary.win_rates()) == 40
+
+    ordered = list(Pipeline(path, workers=2, chunk_size=3).results())
+    assert ordered == lines
+    unordered = Pipeline(path, workers=2, chunk_size=3, ordered=False)
+    assert sorted(unordered.results(), key=lambda r: r["game"]) == lines
+    assert unordered.summary.openings == summary.openings
+
+
+def test_other_sizes(tmp_path):
+    """Boards other than 8x8 are analyzed with the search evaluation."""
+    path = str(tmp_path / "games.bin")
+    results = record_games(path, 5, 6)
+    summary = Pipeline(path, workers=1).run()
+    assert summary.games == 5
+    assert summary.disc_difference == sum(r["black"] - r["white"]
+                                          for r in results)
@@ -0,0 +1,107 @@
+# Vectorized move generation for many 8x8 positions at once, using NumPy.
+# Positions are rows of an N x 2 uint64 array holding the bitboards of the
+# player to move (own) and the opponent (opp), as used by search.py.
+import numpy as np
+from position import get_masks
+
+_MASKS = get_masks(8)
+_LEFT = [(np.uint64(shift), np.uint64(mask))
+         for shift, mask in _MASKS.left_shifts]
+_RIGHT = [(np.uint64(shift), np.uint64(mask))
+          for shift, mask in _MASKS.right_shifts]
+# Longest run of opponent tiles that a move can flip on an 8x8 board.
+_STEPS = 6
+
+
+def from_grids(grids):
+    """
+    Given an N x 8 x 8 int8 array with 1 for the player to move, -1 for the
+    opponent and 0 for empty squares, returns the N x 2 uint64 positions.
+    """
+    grids = np.asarray(grids).reshape(-1, 64)
+    weights = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+    own = np.where(grids == 1, weights, np.uint64(0)).sum(axis=1,
+                                                          dtype=np.uint64)
+    opp = np.where(grids == -1, weights, np.uint64(0)).sum(axis=1,
+                                                           dtype=np.uint64)
+    return np.stack([own, opp], axis=1)
+
+
+def to_grids(positions):
+    """
+    Given N x 2 uint64 positions, returns the N x 8 x 8 int8 array with 1 for
+    the player to move, -1 for the opponent and 0 for empty squares.
+    """
+    positions = np.asarray(positions, dtype=np.uint64)
+    little = positions.astype("<u8").view(np.uint8)
+    bits = np.unpackbits(little.reshape(-1, 2, 8), axis=2, bitorder="little")
+    grids = bits[:, 0, :].astype(np.int8) - bits[:, 1, :].astype(np.int8)
+    return grids.reshape(-1, 8, 8)
+
+
+def legal_masks(positions):
+    """
+    Given N x 2 uint64 positions, returns an array of N uint64 bitboards of
+    the legal moves of each position.
+    """
+    positions = np.asarray(positions, dtype=np.uint64)
+    own, opp = positions[:, 0], positions[:, 1]
+    empty = ~(own | opp)
+    moves = np.zeros_like(own)
+    for shift, mask in _LEFT:
+        line = ((own << shift) & mask) & opp
+        for _ in range(_STEPS - 1):
+            line |= ((line << shift) & mask) & opp
+        moves |= (line << shift) & mask
+    for shift, mask in _RIGHT:
+        line = ((own >> shift) & mask) & opp
+        for _ in range(_STEPS - 1):
+            line |= ((line >> shift) & mask) & opp
+        moves |= (line >> shift) & mask
+    return moves & empty
+
+
+def flip_masks(own, opp, moves):
+    """
+    Given arrays of own and opp bitboards and of move squares (bit indices),
+    returns an array of the bitboards of the tiles each move flips.
+    """
+    bits = np.left_shift(np.uint64(1), moves.astype(np.uint64))
+    flips = np.zeros_like(own)
+    zero = np.uint64(0)
+    for shift, mask in _LEFT:
+        line = ((bits << shift) & mask) & opp
+        for _ in range(_STEPS - 1):
+            line |= ((line << shift) & mask) & opp
+        closed = ((line << shift) & mask) & own
+        flips |= np.where(closed != zero, line, zero)
+    for shift, mask in _RIGHT:
+        line = ((bits >> shift) & mask) & opp
+        for _ in range(_STEPS - 1):
+            line |= ((line >> shift) & mask) & opp
+        closed = ((line >> shift) & mask) & own
+        flips |= np.where(closed != zero, line, zero)
+    return flips
+
+
+def expand(positions):
+    """
+    Given N x 2 uint64 positions, returns the legal moves of every position
+    and the positions they lead to, as a tuple of arrays:
+
+    legal : N uint64 legal-move bitboards, one per position.
+    parents : M indices of the position each move is played in.
+    moves : M move squares (bit indices).
+    children : M x 2 uint64 positions after each move, from the point of
+        view of the next player to move.
+    """
+    positions = np.asarray(positions, dtype=np.uint64)
+    legal = legal_masks(positions)
+    little = legal.astype("<u8").view(np.uint8)
+    bits = np.unpackbits(little.reshape(-1, 8), axis=1, bitorder="little")
+    parents, moves = np.nonzero(bits)
+    own, opp = positions[parents, 0], positions[parents, 1]
+    flips = flip_masks(own, opp, moves)
+    placed = np.left_shift(np.uint64(1), moves.astype(np.uint64))
+    children = np.stack([opp ^ flips, own | flips | placed], axis=1)
+    return legal, parents, moves, children
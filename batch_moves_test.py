@@ -0,0 +1,64 @@
+# Test the vectorized move generation against Tiles.
+import pytest
+from benchmark import sample_positions
+from tiles import Tiles
+
+np = pytest.importorskip("numpy")
+batch_moves = pytest.importorskip("batch_moves")
+
+
+def make_tiles(own, opp):
+    """Returns a Tiles instance with own as black, to move, and opp white."""
+    tiles = Tiles(8, 8, 1, 8)
+    for square in range(64):
+        if own >> square & 1:
+            tiles.update_color(square // 8, square % 8, "black")
+        elif opp >> square & 1:
+            tiles.update_color(square // 8, square % 8, "white")
+    tiles.generate_legal_moves()
+    return tiles
+
+
+def sample():
+    """Returns positions from every stage of the game."""
+    positions = []
+    for empties in (58, 50, 40, 30, 20, 10, 4):
+        positions += sample_positions(8, empties, 6, seed=empties)
+    return positions
+
+
+def test_grids_round_trip():
+    """Test the from_grids and to_grids functions."""
+    positions = np.array(sample(), dtype=np.uint64)
+    grids = batch_moves.to_grids(positions)
+    assert grids.shape == (len(positions), 8, 8)
+    own, opp = sample()[0]
+    assert grids[0, 0, 0] == (1 if own & 1 else -1 if opp & 1 else 0)
+    assert (batch_moves.from_grids(grids) == positions).all()
+
+
+def test_matches_tiles():
+    """Legal moves and resulting positions match Tiles."""
+    raw = sample()
+    positions = np.array(raw, dtype=np.uint64)
+    legal, parents, moves, children = batch_moves.expand(positions)
+    assert len(legal) == len(raw)
+    expected_children = []
+    for index, (own, opp) in enumerate(raw):
+        tiles = make_tiles(own, opp)
+        assert int(legal[index]) == tiles.position.legal_moves(True)
+        for (row, col), flip_set in sorted(tiles.legal_moves.items()):
+            flips = sum(1 << (r * 8 + c) for r, c in flip_set)
+            move = 1 << (row * 8 + col)
+            expected_children.append((index, row * 8 + col, opp ^ flips,
+                                      own | flips | move))
+    actual = sorted((int(p), int(m), int(c[0]), int(c[1]))
+                    for p, m, c in zip(parents, moves, children))
+    assert actual == sorted(expected_children)
+
+
+def test_empty_batch():
+    """No positions give no moves."""
+    legal, parents, moves, children = batch_moves.expand(
+        np.zeros((0, 2), dtype=np.uint64))
+    assert len(legal) == len(parents) == len(moves) == len(children) == 0
@@ -0,0 +1,386 @@
+# Benchmarks for the Othello engine, run from the command line:
+#     python benchmark.py search --seconds 2
+from argparse import ArgumentParser
+from os import cpu_count
+from random import Random
+from time import time
+from endgame import EndgameSolver
+from mcts import MCTS
+from evaluation import PatternEvaluator, pattern_index
+from opening_book import OpeningBook, build_book, opening_positions
+from parallel_search import ParallelSearch
+from position import (Masks, squares, legal_mask, kogge_stone_mask,
+                      flip_mask, get_masks)
+from score_organizer import ScoreOrganizer
+from score_store import ScoreStore
+from search import Search
+from tiles import Tiles
+from transposition import TranspositionTable
+
+# 8x8 endgames with 10 and 12 empty squares, as (own, opp, exact final disc
+# difference) for the player to move.
+ENDGAME_POSITIONS = [
+    (0x60c0e0e7d5efc706, 0x183e1f182a102049, -2),
+    (0x1102f4fbfaeeded8, 0x08790a0405112124, 38),
+    (0x01103429162f7f39, 0xfee7ca9628500006, -10),
+    (0x8bff7f1edb0b0508, 0x5000806024f4f812, 6),
+    (0xfcfdeb352d9d8048, 0x000214ca52627e00, 38),
+    (0x3f9fa84480412220, 0xc060573b7f349c1c, 8),
+    (0x7f330f3a14181100, 0x804cf0452b662c2f, 18),
+    (0x9880c0d088adf8ef, 0x643c382c76520700, 14),
+    (0x0203c20410d81c00, 0x39103d7baf2763fe, 8),
+    (0x2ce8800824140ca4, 0xc1077f775a6b524a, 10),
+    (0x140e1e8690049210, 0x427161796f7b4d0d, 4),
+    (0x044fff75e9542311, 0xf310000a16295c04, -6),
+]
+
+
+def initial_position(dimens):
+    """Returns the bitboards of black and white at the start of a game."""
+    tiles = Tiles(dimens, dimens, 1, dimens)
+    tiles.initial_tiles(False)
+    return tiles.position.sides(True)
+
+
+def sample_positions(dimens, empties, count, seed=0):
+    """
+    Plays seeded random games until empties squares remain. Returns a list of
+    (own, opp) bitboards for the player to move, skipping games that end or
+    reach a pass before then.
+    """
+    masks = get_masks(dimens)
+    rng = Random(seed)
+    positions = []
+    while len(positions) < count:
+        own, opp = initial_position(dimens)
+        while dimens * dimens - bin(own | opp).count("1") > empties:
+            moves = squares(legal_mask(own, opp, masks))
+            if not moves:
+                break
+            move = moves[rng.randrange(len(moves))]
+            flips = flip_mask(own, opp, move, masks)
+            own, opp = opp ^ flips, own | flips | (1 << move)
+        else:
+            if legal_mask(own, opp, masks):
+                positions.append((own, opp))
+    return positions
+
+
+def bench_search(args):
+    """
+    Reports the nodes per second of the negamax search and the hit rate of
+    its transposition table per move.
+    """
+    table = None
+    if args.table_mb:
+        table = TranspositionTable(int(args.table_mb * (1 << 20)),
+                                   args.policy)
+    search = Search(args.dimens, table=table)
+    positions = [initial_position(args.dimens)]
+    positions += sample_positions(args.dimens, args.dimens ** 2 // 2, 4)
+    total_nodes, total_time = 0, 0.0
+    for own, opp in positions:
+        search.choose_move(own, opp, args.seconds)
+        stats = search.stats
+        total_nodes += stats["nodes"]
+        total_time += stats["elapsed"]
+        print("depth {0:2d}  nodes {1:9d}  {2:10.0f} nodes/s  "
+              "tt hits {3:5.1%}".format(stats["depth"], stats["nodes"],
+                                       search.nodes_per_second(),
+                                       stats.get("tt_hit_rate", 0)))
+    print("total {0:.0f} nodes/s".format(total_nodes / total_time))
+
+
+def bench_endgame(args):
+    """
+    Solves the fixed endgame positions, checking each result and reporting
+    the nodes per second of the solver.
+    """
+    solver = EndgameSolver(8, threshold=64)
+    if args.fastest_first is not None:
+        solver.fastest_first = args.fastest_first
+    total_nodes, total_time = 0, 0.0
+    for own, opp, expected in ENDGAME_POSITIONS:
+        if solver.empties(own, opp) > args.max_empties:
+            continue
+        move, score = solver.solve(own, opp)
+        stats = solver.stats
+        if score != expected:
+            raise SystemExit("Wrong result {0} for {1:#x} {2:#x}, expected "
+                             "{3}".format(score, own, opp, expected))
+        total_nodes += stats["nodes"]
+        total_time += stats["elapsed"]
+        print("empties {0:2d}  score {1:+3d}  nodes {2:8d}  {3:7.3f}s".format(
+            stats["empties"], score, stats["nodes"], stats["elapsed"]))
+    print("total {0:.3f}s  {1:.0f} nodes/s".format(
+        total_time, total_nodes / total_time))
+
+
+def bench_parallel(args):
+    """
+    Reports the latency of a fixed-depth root-split search for 1 up to the
+    given number of workers.
+    """
+    positions = sample_positions(args.dimens, args.dimens ** 2 // 2, 3)
+    for workers in sorted(set([1, 2, args.workers])):
+        if workers > args.workers:
+            continue
+        search = ParallelSearch(args.dimens, workers)
+        search.choose_move(positions[0][0], positions[0][1], 60, 1)  # Warm.
+        total_time = 0.0
+        for own, opp in positions:
+            search.choose_move(own, opp, 600, args.depth)
+            total_time += search.stats["elapsed"]
+        search.close()
+        print("workers {0:3d}  {1:7.3f}s per move at depth {2}".format(
+            workers, total_time / len(positions), args.depth))
+
+
+def bench_batch(args):
+    """
+    Reports positions expanded per second by the NumPy batch move generator
+    next to a loop over legal_mask and flip_mask.
+    """
+    import numpy as np
+    from batch_moves import expand
+    masks = get_masks(8)
+    positions = sample_positions(8, 30, 64, seed=1) * (args.positions // 64)
+    start = time()
+    for own, opp in positions:
+        for move in squares(legal_mask(own, opp, masks)):
+            flip_mask(own, opp, move, masks)
+    loop_time = time() - start
+    batch = np.array(positions, dtype=np.uint64)
+    start = time()
+    children = expand(batch)[3]
+    batch_time = time() - start
+    print("{0} positions, {1} children".format(len(positions), len(children)))
+    print("loop  {0:10.0f} positions/s".format(len(positions) / loop_time))
+    print("batch {0:10.0f} positions/s".format(len(positions) / batch_time))
+
+
+def bench_movegen(args):
+    """
+    Reports how the cost of generating the moves of a half-full position
+    grows with the board size, for the lane scan of Tiles, one shift per
+    step, Kogge-Stone fills, and Kogge-Stone with the flips of every move.
+    """
+    from perft import lane_moves
+    print("{0:>6s} {1:>10s} {2:>10s} {3:>10s} {4:>10s}   us/position".format(
+        "dimens", "lanes", "shifts", "kogge", "flips"))
+    for dimens in args.dimens:
+        positions = sample_positions(dimens, dimens ** 2 // 2, args.positions,
+                                     seed=dimens)
+        linear = Masks(dimens)
+        linear.kogge_stone = False
+        masks = get_masks(dimens)
+        timings = []
+        if dimens <= args.lanes_max:
+            start = time()
+            for own, opp in positions:
+                tiles = Tiles(dimens * 100, dimens * 100, 100, dimens)
+                for row, col in tiles.position.coordinates(own):
+                    tiles.update_color(row, col, "black")
+                for row, col in tiles.position.coordinates(opp):
+                    tiles.update_color(row, col, "white")
+                lane_moves(tiles)
+            timings.append(time() - start)
+        else:
+            timings.append(None)
+        for generate, generate_masks in ((legal_mask, linear),
+                                         (kogge_stone_mask, masks)):
+            start = time()
+            for _ in range(args.rounds):
+                for own, opp in positions:
+                    generate(own, opp, generate_masks)
+            timings.append((time() - start) / args.rounds)
+        start = time()
+        for _ in range(args.rounds):
+            for own, opp in positions:
+                for move in squares(kogge_stone_mask(own, opp, masks)):
+                    flip_mask(own, opp, move, masks)
+        timings.append((time() - start) / args.rounds)
+        print("{0:6d} ".format(dimens) + " ".join(
+            "{0:>10s}".format("-") if elapsed is None else
+            "{0:10.1f}".format(elapsed / len(positions) * 1e6)
+            for elapsed in timings))
+
+
+def bench_mcts(args):
+    """
+    Reports the playouts per second of the Monte Carlo tree search from the
+    initial position and from sampled positions, and the playouts a move
+    gets within --seconds, Board.computer_thinking_time by default.
+    """
+    mcts = MCTS(args.dimens, seed=0)
+    positions = [initial_position(args.dimens)]
+    for empties in (args.dimens ** 2 * 2 // 3, args.dimens ** 2 // 3):
+        positions += sample_positions(args.dimens, empties, 2, seed=empties)
+    total_playouts, total_time = 0, 0.0
+    for own, opp in positions:
+        mcts.choose_move(own, opp, time_budget=args.seconds)
+        stats = mcts.stats
+        total_playouts += stats["playouts"]
+        total_time += stats["elapsed"]
+        empties = args.dimens ** 2 - bin(own | opp).count("1")
+        print("{0:3d} empties: {1:7d} playouts {2:8.0f} playouts/s "
+              "{3:7d} nodes  win rate {4:.2f}".format(
+                  empties, stats["playouts"], mcts.playouts_per_second(),
+                  stats["nodes"], stats["win_rate"]))
+    print("mean {0:.0f} playouts/s, {1:.0f} playouts per {2}s move".format(
+        total_playouts / total_time, total_playouts / len(positions),
+        args.seconds))
+
+
+def bench_book(args):
+    """
+    Reports the time of an opening book lookup, building a small book first
+    if none is given.
+    """
+    path = args.path
+    if path is None:
+        path = "bench_book.bin"
+        build_book(path, 8, 4, 1)
+    book = OpeningBook(path)
+    keys = list(opening_positions(book.TILES_DIMENS, 4))
+    keys += [key + 1 for key in keys]  # Misses.
+    start = time()
+    for _ in range(args.rounds):
+        for key in keys:
+            book.lookup(key)
+    elapsed = time() - start
+    print("{0} entries, {1:.2f} us per lookup ({2:.0%} hits)".format(
+        book.count, 1e6 * elapsed / (args.rounds * len(keys)),
+        float(book.hits) / book.lookups))
+    book.close()
+
+
+def bench_eval(args):
+    """
+    Reports evaluations per second of the table-driven pattern evaluation
+    next to reading every pattern square by square.
+    """
+    evaluator = PatternEvaluator()
+    positions = sample_positions(8, 30, 64, seed=2) * (args.positions // 64)
+    evaluate = evaluator.evaluate
+    start = time()
+    for own, opp in positions:
+        evaluate(own, opp)
+    table_time = time() - start
+    start = time()
+    for own, opp in positions:
+        sum(table[pattern_index(own, opp, pattern)]
+            for table, pattern in evaluator.patterns)
+    square_time = time() - start
+    print("{0} positions".format(len(positions)))
+    print("tables  {0:10.0f} evals/s".format(len(positions) / table_time))
+    print("squares {0:10.0f} evals/s".format(len(positions) / square_time))
+
+
+def bench_scores(args):
+    """
+    Reports insert and query times of the sqlite3 score store holding
+    --records scores, next to one othello.txt update of the same size.
+    """
+    import os
+    import shutil
+    import tempfile
+    rng = Random(0)
+    records = [("player{0}".format(rng.randrange(args.records // 10 + 1)),
+                rng.randrange(65)) for _ in range(args.records)]
+    directory = tempfile.mkdtemp()
+    store = ScoreStore(os.path.join(directory, "scores.db"))
+    start = time()
+    store.add_many(records)
+    print("bulk insert {0} scores: {1:.2f}s".format(args.records,
+                                                  time() - start))
+    start = time()
+    for name, score in records[:100]:
+        store.add(name, score)
+    print("add          {0:10.2f} ms/score".format((time() - start) * 10))
+    start = time()
+    for _ in range(100):
+        store.top(10)
+    print("top 10       {0:10.3f} ms".format((time() - start) * 10))
+    start = time()
+    for name, _ in records[:100]:
+        store.player(name)
+    print("player       {0:10.3f} ms".format((time() - start) * 10))
+    store.close()
+    text = os.path.join(directory, "othello.txt")
+    with open(text, "w") as f:
+        for name, score in sorted(records, key=lambda r: -r[1]):
+            f.write(name + " " + str(score) + "\n")
+    start = time()
+    ScoreOrganizer("player", 32, text).update_score()
+    print("othello.txt  {0:10.2f} ms/score".format((time() - start) * 1000))
+    shutil.rmtree(directory)
+
+
+def main(argv=None):
+    """Parses the command line and runs the chosen benchmark."""
+    parser = ArgumentParser(description="Othello engine benchmarks.")
+    commands = parser.add_subparsers(dest="command")
+    commands.required = True
+
+    search = commands.add_parser("search", help="negamax nodes per second")
+    search.add_argument("--dimens", type=int, default=8)
+    search.add_argument("--seconds", type=float, default=2)
+    search.add_argument("--table-mb", type=float, default=4,
+                        help="transposition table size, 0 to disable")
+    search.add_argument("--policy", choices=("depth", "always"),
+                        default="depth")
+    search.set_defaults(run=bench_search)
+
+    endgame = commands.add_parser("endgame", help="exact endgame solver")
+    endgame.add_argument("--max-empties", type=int, default=12)
+    endgame.add_argument("--fastest-first", type=int, default=None,
+                         help="empties above which fastest-first is used")
+    endgame.set_defaults(run=bench_endgame)
+
+    parallel = commands.add_parser("parallel",
+                                   help="root-split search latency")
+    parallel.add_argument("--dimens", type=int, default=8)
+    parallel.add_argument("--depth", type=int, default=5)
+    parallel.add_argument("--workers", type=int, default=cpu_count() or 1)
+    parallel.set_defaults(run=bench_parallel)
+
+    batch = commands.add_parser("batch", help="NumPy batch move generation")
+    batch.add_argument("--positions", type=int, default=100000)
+    batch.set_defaults(run=bench_batch)
+
+    movegen = commands.add_parser("movegen",
+                                  help="move generation cost per board size")
+    movegen.add_argument("--dimens", type=int, nargs="+",
+                         default=[8, 12, 16, 24, 32, 48, 64])
+    movegen.add_argument("--positions", type=int, default=20)
+    movegen.add_argument("--rounds", type=int, default=20)
+    movegen.add_argument("--lanes-max", type=int, default=16,
+                         help="largest board timed with the lane scan")
+    movegen.set_defaults(run=bench_movegen)
+
+    mcts = commands.add_parser("mcts", help="MCTS playouts per second")
+    mcts.add_argument("--dimens", type=int, default=8)
+    mcts.add_argument("--seconds", type=float, default=2,
+                      help="budget per move, as Board.computer_thinking_time")
+    mcts.set_defaults(run=bench_mcts)
+
+    book = commands.add_parser("book", help="opening book lookups")
+    book.add_argument("path", nargs="?", default=None)
+    book.add_argument("--rounds", type=int, default=100)
+    book.set_defaults(run=bench_book)
+
+    evaluation = commands.add_parser("eval", help="pattern evaluations")
+    evaluation.add_argument("--positions", type=int, default=100000)
+    evaluation.set_defaults(run=bench_eval)
+
+    scores = commands.add_parser("scores", help="score store inserts")
+    scores.add_argument("--records", type=int, default=1000000)
+    scores.set_defaults(run=bench_scores)
+
+    args = parser.parse_args(argv)
+    args.run(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
 # Creates an instance representing a board for othello.
+from threading import Thread
 from tiles import Tiles
 from comp_ai import CompAI
+from renderer import ProcessingRenderer
+
+PASS = 0xFF  # Move recorded for a turn without legal moves.
+GREEN = (0, 100, 0)  # Color of the board.
 
 
 class Board:
@@ -36,18 +41,40 @@ class Board:
     no_legal_move_count = int
         Tallies consecutive cases of no legal moves
     computer_thinking_time = int
-        Delay to computer's move (in seconds)
+        Delay to computer's move (in seconds). Spent searching instead of
+        waiting when the computer uses a search strategy.
     frames = int
         Number of frames before computer makes move.
+    verbose = Bool
+        Conditional for printing messages to terminal.
+    history = list of tuples
+        Turn state saved before every placed tile, for undo.
+    moves = list of ints
+        Record of the game: the square (row * TILES_DIMENS + col) of every
+        placed tile, and PASS for every turn without legal moves.
+    renderer = instance of ProcessingRenderer or RecordingRenderer class.
+        Surface the board is drawn on.
+    grid = offscreen buffer, or None.
+        Background and grid lines, drawn once and reused every frame.
+    redraw = Bool
+        Conditional for drawing the whole board on the next frame.
+    threaded = Bool
+        Conditional for running the computer's search on a worker thread
+        while frames keep being drawn.
+    thinker = Thread object, or None.
+        Worker thread choosing the computer's move for the current turn.
+    comp_move = tuple, or None.
+        Coordinates chosen by the worker thread, None until it is done.
+    think_error = Exception, or None.
+        Error raised by the worker thread's search, if any.
 
     Methods
     -------
     place_tile
         Given the row_index and col_index, update the corresponding tile with
         the correct color based on the turn.
-    flip_tiles
-        Given the key to a dictionary of legal moves, flip the color attributes
-        of all of the Tile objects associated with the key to the given color.
+    undo
+        Takes back the last placed tile and restores the turn.
     update_message
         Given the player, prints whose turn it is to terminal.
     check_winning_conditions
@@ -59,7 +86,16 @@ class Board:
         Displays the current turn to terminal. Performs computer's turn if
         applicable.
     do_comp_turn
-        Perform the computer's turn once enough time has elapsed.
+        Perform the computer's turn once enough time has elapsed and its
+        move has been chosen.
+    start_thinking
+        Starts choosing the computer's move on a worker thread.
+    think
+        Chooses the computer's move. Runs on the worker thread.
+    cancel_thinking
+        Stops the worker thread and forgets its move.
+    reset
+        Starts a new game on the same board.
     no_legal_moves
         Scenario where there are no legal moves for the turn. Makes the
         appropriate changes to switch turns.
@@ -67,10 +103,14 @@ class Board:
         Makes necessary updates including checking the winning conditions,
         checking for the correct player's turn, and checking for legal moves.
     display
-        Display the board to screen with the necessary updates.
+        Display the board to screen with the necessary updates, drawing only
+        the tiles that changed.
+    draw_grid
+        Draws the background and the grid lines with a renderer.
 
     """
-    def __init__(self, WIDTH, HEIGHT, TILES_DIMENS, SPACING, game_controller):
+    def __init__(self, WIDTH, HEIGHT, TILES_DIMENS, SPACING, game_controller,
+                 strategy="random", threaded=True):
         """
         Parameters
         ----------
@@ -84,6 +124,11 @@ class Board:
             Number of tiles per side of the square board.
         game_controller = GameController instance
             Maintains the state of the game.
+        strategy : str (default random)
+            Strategy of the computer player, see CompAI.
+        threaded : Bool (default True)
+            Conditional for running the computer's search on a worker
+            thread, so that drawing never waits for it.
         """
         self.WIDTH = WIDTH
         self.HEIGHT = HEIGHT
@@ -93,13 +138,23 @@ class Board:
         self.place_black = True
         self.gc = game_controller
         self.tiles = Tiles(WIDTH, HEIGHT, SPACING, TILES_DIMENS)
-        self.ai = CompAI(self.tiles)
         self.print_user_message = True
         self.print_comp_message = False
         self.game_over = False
         self.no_legal_move_count = 0
         self.computer_thinking_time = 2
         self.frames = 0
+        self.verbose = True
+        self.history = []
+        self.moves = []
+        self.renderer = ProcessingRenderer()
+        self.grid = None
+        self.redraw = True
+        self.threaded = threaded
+        self.thinker = None
+        self.comp_move = None
+        self.think_error = None
+        self.ai = CompAI(self.tiles, strategy, self.computer_thinking_time)
 
     def place_tile(self, row, col):
         """
@@ -109,30 +164,34 @@ class Board:
         RESET = 0
         key = (row, col)
         if key in self.tiles.legal_moves.keys():  # A legal move
+            self.history.append((self.place_black, self.no_legal_move_count,
+                                 self.print_user_message,
+                                 self.print_comp_message, len(self.moves)))
+            self.moves.append(row * self.TILES_DIMENS + col)
+            self.tiles.place_black = self.place_black
+            self.tiles.make_move(row, col)
             if self.place_black:  # Player's turn
-                self.tiles.update_color(row, col, "black")
-                self.flip_tiles(key, "black")
                 self.update_message("comp")
             else:  # Computer's turn
-                self.tiles.update_color(row, col, "white")
-                self.flip_tiles(key, "white")
                 self.update_message("user")
             self.place_black = not self.place_black
             self.no_legal_move_count = RESET
 
-    def flip_tiles(self, key, color):
+    def undo(self):
         """
-        Given the key to a dictionary of legal moves, flip the color attributes
-        of all of the Tile objects associated with the key to the given color.
+        Takes back the last placed tile, along with any passes after it, and
+        restores the turn. Returns False if there is nothing to take back or
+        the game is over.
         """
-        flip_values = self.tiles.legal_moves[key]
-        for value in flip_values:
-            row, col = value[0], value[1]
-            self.tiles.update_color(row, col, color)
-            if color == "black":
-                self.tiles.wt_tiles -= 1
-            else:
-                self.tiles.bk_tiles -= 1
+        if not self.history or self.game_over:
+            return False
+        (self.place_black, self.no_legal_move_count, self.print_user_message,
+         self.print_comp_message, recorded) = self.history.pop()
+        del self.moves[recorded:]
+        self.tiles.unmake_move()
+        self.tiles.place_black = self.place_black
+        self.frames = 0
+        return True
 
     def update_message(self, player):
         """Given the player, decides which message to print to terminal."""
@@ -186,27 +245,86 @@ class Board:
                 self.update_message("user")
 
     def do_comp_turn(self):
-        """Perform the computer's turn once enough time has elapsed."""
+        """
+        Perform the computer's turn once enough time has elapsed. A searching
+        computer moves at once, having spent the thinking time on its search.
+        When threaded, the search starts on a worker thread at the start of
+        the turn and every later frame only checks whether it is done, so
+        frames keep being drawn while the computer thinks.
+        """
         RESET = 0
         FRAMES_PER_SECOND = 60
-        if self.frames // FRAMES_PER_SECOND >= self.computer_thinking_time:
-            coordinates = self.ai.choose_move()
+        delay = self.computer_thinking_time
+        if self.ai.strategy != "random":
+            delay = 0
+        if self.threaded:
+            if not self.tiles.legal_moves:
+                return  # The turn is passed instead.
+            if self.thinker is None:
+                self.start_thinking()
+            if self.thinker.is_alive():
+                return
+        if self.frames // FRAMES_PER_SECOND >= delay:
+            if self.threaded:
+                coordinates = self.comp_move
+                if self.think_error is not None:
+                    # The search failed: play on rather than retrying it
+                    # every frame.
+                    if self.verbose:
+                        print("Search failed ({0!r}), playing a random "
+                              "move.".format(self.think_error))
+                    coordinates = self.ai.random_move()
+                self.thinker, self.comp_move = None, None
+                self.think_error = None
+            else:
+                coordinates = self.ai.choose_move()
             if coordinates:
                 self.place_tile(coordinates[0], coordinates[1])
             self.frames = RESET
 
+    def start_thinking(self):
+        """Starts choosing the computer's move on a worker thread."""
+        self.ai.clear_cancel()
+        self.comp_move, self.think_error = None, None
+        self.thinker = Thread(target=self.think)
+        self.thinker.daemon = True  # Never keeps the sketch from closing.
+        self.thinker.start()
+
+    def think(self):
+        """
+        Chooses the computer's move, keeping any error for the frame thread.
+        Runs on the worker thread.
+        """
+        try:
+            self.comp_move = self.ai.choose_move()
+        except Exception as error:
+            self.think_error = error
+
+    def cancel_thinking(self):
+        """
+        Stops the worker thread, waiting for its search to notice, and
+        forgets its move.
+        """
+        if self.thinker is not None:
+            self.ai.cancel()
+            self.thinker.join()
+        self.thinker, self.comp_move = None, None
+        self.think_error = None
+
     def no_legal_moves(self):
         """
         Scenario where there are no legal moves for the turn. Makes the
         appropriate changes to switch turns.
         """
-        print("There are no legal moves on this turn. Switching turns.")
+        if self.verbose:
+            print("There are no legal moves on this turn. Switching turns.")
         if self.place_black:
             self.update_message("comp")
         else:
             self.update_message("user")
         self.place_black = not self.place_black
         self.no_legal_move_count += 1
+        self.moves.append(PASS)
 
     def update(self):
         """
@@ -223,13 +341,55 @@ class Board:
         if not self.place_black:  # Only counts when computer's turn.
             self.frames += 1
 
+    def reset(self):
+        """
+        Starts a new game on the same board, cancelling the computer's
+        search if it is thinking.
+        """
+        self.cancel_thinking()
+        self.tiles = Tiles(self.WIDTH, self.HEIGHT, self.SPACING,
+                           self.TILES_DIMENS)
+        self.ai.tiles = self.tiles
+        self.place_black = True
+        self.print_user_message = True
+        self.print_comp_message = False
+        self.game_over = False
+        self.no_legal_move_count = 0
+        self.frames = 0
+        self.history = []
+        self.moves = []
+        self.redraw = True
+        self.gc.reset()
+
     def display(self):
-        """Display the board to screen with the necessary updates."""
+        """
+        Display the board to screen with the necessary updates. The
+        background and grid come from an offscreen buffer drawn once, and
+        only the tiles that changed are drawn again, so an idle frame draws
+        nothing.
+        """
         self.update()
-        self.tiles.display()
-        stroke(0)
-        strokeWeight(2)
+        renderer = self.renderer
+        if self.grid is None:
+            self.grid = renderer.buffer(self.WIDTH, self.HEIGHT,
+                                        self.draw_grid)
+        if self.redraw:
+            renderer.image(self.grid, 0, 0)
+            self.tiles.mark_dirty()
+            self.redraw = False
+        self.tiles.display(renderer, self.grid)
+
+    def draw_grid(self, renderer):
+        """
+        Draws the background and the grid lines with a renderer. The lines
+        stop at the edge of the tiles, which is short of the window when its
+        size is not a multiple of TILES_DIMENS.
+        """
+        renderer.background(*GREEN)
+        renderer.stroke(0)
+        renderer.stroke_weight(2)
+        extent = self.SPACING * self.TILES_DIMENS
         for i in range(1, self.TILES_DIMENS):
             x, y = self.SPACING * i, self.SPACING * i
-            line(x, 0, x, self.HEIGHT)
-            line(0, y, self.WIDTH, y)
+            renderer.line(x, 0, x, min(extent, self.HEIGHT))
+            renderer.line(0, y, min(extent, self.WIDTH), y)
@@ -1,6 +1,16 @@
 # Test for the Board class
-from board import Board
+from time import sleep, time
+from board import Board, PASS
 from game_controller import GameController
+from renderer import RecordingRenderer
+
+
+def finish_comp_turn(board):
+    """Polls do_comp_turn, as the frame loop does, until the computer moves."""
+    while not board.place_black:
+        if board.thinker is not None:
+            board.thinker.join()
+        board.do_comp_turn()
 
 
 def test_constructor():
@@ -75,24 +85,6 @@ def test_place_tile():
     assert board1.tiles.wt_tiles == 3
 
 
-def test_flip_tiles():
-    """Test the flip tiles method."""
-    g = GameController(400, 400)
-    board1 = Board(400, 400, 10, 100, g)
-    assert board1.tiles.all_tiles[0][0].color == "blank"
-    assert board1.tiles.all_tiles[0][3].color == "blank"
-    assert board1.tiles.all_tiles[3][0].color == "blank"
-    assert board1.tiles.all_tiles[3][3].color == "blank"
-    flip_set = {(0, 0), (0, 3), (3, 3)}
-    board1.tiles.legal_moves["key"] = flip_set
-    board1.flip_tiles("key", "black")
-
-    assert board1.tiles.all_tiles[0][0].color == "black"
-    assert board1.tiles.all_tiles[0][3].color == "black"
-    assert board1.tiles.all_tiles[3][0].color == "blank"
-    assert board1.tiles.all_tiles[3][3].color == "black"
-
-
 def test_update_message():
     """Test the update message method."""
     g = GameController(400, 400)
@@ -189,7 +181,8 @@ def test_do_comp_turn():
     board1.get_legal_moves()
 
     board1.frames = 120
-    board1.do_comp_turn()
+    finish_comp_turn(board1)
+    assert board1.thinker is None
     assert board1.tiles.bk_tiles == 1
     assert board1.tiles.wt_tiles == 4
     assert board1.place_black is True
@@ -231,3 +224,218 @@ def test_update():
     assert board1.print_comp_message is False
     assert board1.tiles.bk_tiles + board1.tiles.wt_tiles == 5
     assert board1.frames == 1
+
+
+def test_update_idle_frames():
+    """Idle frames are answered from the legal moves cache."""
+    g = GameController(400, 400)
+    board1 = Board(400, 400, 4, 100, g)
+    board1.tiles.initial_tiles(False)
+    for _ in range(60):
+        board1.update()
+    assert board1.tiles.cache_misses == 1
+    assert board1.tiles.cache_hits == 59
+
+    board1.place_tile(0, 1)
+    board1.update()
+    assert board1.tiles.cache_misses == 2
+
+
+def test_do_comp_turn_search():
+    """A searching computer moves without waiting for frames."""
+    g = GameController(400, 400)
+    board1 = Board(400, 400, 4, 100, g, "negamax")
+    assert board1.ai.strategy == "negamax"
+    assert board1.ai.thinking_time == board1.computer_thinking_time
+    board1.ai.thinking_time = 0.2
+    board1.tiles.initial_tiles(False)
+    board1.place_black = False
+    board1.get_legal_moves()
+    finish_comp_turn(board1)
+    assert board1.tiles.wt_tiles == 4
+    assert board1.place_black is True
+
+
+def test_do_comp_turn_unthreaded():
+    """Without a worker thread, the computer moves within the frame."""
+    g = GameController(400, 400)
+    board1 = Board(400, 400, 4, 100, g, "negamax", threaded=False)
+    board1.ai.thinking_time = 0.2
+    board1.tiles.initial_tiles(False)
+    board1.place_black = False
+    board1.get_legal_moves()
+    board1.do_comp_turn()
+    assert board1.thinker is None
+    assert board1.tiles.wt_tiles == 4
+    assert board1.place_black is True
+
+
+def test_do_comp_turn_background():
+    """Frames are not held up while the computer searches."""
+    g = GameController(800, 800)
+    board1 = Board(800, 800, 8, 100, g, "negamax")
+    board1.ai.thinking_time = 5
+    board1.tiles.initial_tiles(False)
+    board1.get_legal_moves()
+    board1.place_tile(2, 3)
+    board1.get_legal_moves()
+    start = time()
+    for _ in range(10):
+        board1.do_comp_turn()
+    assert time() - start < 1
+    assert board1.thinker.is_alive()
+    assert board1.place_black is False
+
+    board1.cancel_thinking()
+    assert board1.thinker is None
+    assert board1.comp_move is None
+    assert board1.place_black is False
+    board1.ai.thinking_time = 0.2
+    finish_comp_turn(board1)
+    assert board1.tiles.bk_tiles + board1.tiles.wt_tiles == 6
+
+
+def test_cancel_parallel_thinking():
+    """Cancelling stops the worker processes of a parallel search too."""
+    board1 = Board(800, 800, 8, 100, GameController(800, 800), "parallel")
+    board1.ai.thinking_time = 30
+    board1.tiles.initial_tiles(False)
+    board1.get_legal_moves()
+    board1.place_tile(2, 3)
+    board1.get_legal_moves()
+    board1.do_comp_turn()
+    deadline = time() + 10
+    while board1.ai.search.executor is None and time() < deadline:
+        sleep(0.01)  # Until the search reaches the pool.
+    assert board1.ai.search.executor is not None
+    start = time()
+    board1.cancel_thinking()
+    assert time() - start < 1
+    assert board1.thinker is None
+    board1.ai.close()
+
+
+def test_think_error():
+    """A search that raises falls back to a random move on the frame."""
+    board1 = Board(800, 800, 8, 100, GameController(800, 800), "negamax")
+    board1.verbose = False
+    board1.tiles.initial_tiles(False)
+    board1.get_legal_moves()
+    board1.place_tile(2, 3)
+    board1.get_legal_moves()
+
+    def broken_choose_move():
+        raise RuntimeError("search failed")
+    board1.ai.choose_move = broken_choose_move
+    board1.start_thinking()
+    board1.thinker.join()
+    assert isinstance(board1.think_error, RuntimeError)
+    finish_comp_turn(board1)
+    assert board1.tiles.bk_tiles + board1.tiles.wt_tiles == 6
+    assert board1.think_error is None
+    assert board1.thinker is None
+
+
+def test_reset():
+    """Resetting cancels the computer's search and starts a new game."""
+    g = GameController(800, 800)
+    board1 = Board(800, 800, 8, 100, g, "negamax")
+    board1.ai.thinking_time = 5
+    board1.tiles.initial_tiles(False)
+    board1.get_legal_moves()
+    board1.place_tile(2, 3)
+    board1.get_legal_moves()
+    board1.do_comp_turn()
+    assert board1.thinker.is_alive()
+    g.user_wins = True
+    start = time()
+    board1.reset()
+    assert time() - start < 1
+    assert board1.thinker is None
+    assert board1.ai.tiles is board1.tiles
+    assert board1.place_black is True
+    assert board1.moves == [] and board1.history == []
+    assert board1.redraw is True
+    assert g.user_wins is False
+    board1.tiles.initial_tiles(False)
+    assert (board1.tiles.bk_tiles, board1.tiles.wt_tiles) == (2, 2)
+
+
+def test_undo():
+    """Test the undo method."""
+    g = GameController(400, 400)
+    board1 = Board(400, 400, 4, 100, g)
+    board1.tiles.initial_tiles(False)
+    assert board1.undo() is False
+    board1.get_legal_moves()
+    board1.place_tile(0, 1)
+    board1.get_legal_moves()
+    board1.place_tile(0, 0)
+    assert board1.place_black is True
+
+    assert board1.undo() is True
+    assert board1.place_black is False
+    assert board1.tiles.all_tiles[0][0].color == "blank"
+    assert (board1.tiles.bk_tiles, board1.tiles.wt_tiles) == (4, 1)
+    assert board1.undo() is True
+    assert board1.place_black is True
+    assert board1.print_user_message is True
+    assert (board1.tiles.bk_tiles, board1.tiles.wt_tiles) == (2, 2)
+    assert board1.undo() is False
+
+
+def test_moves_record():
+    """Placed tiles and passes are recorded, and undo takes them back."""
+    g = GameController(400, 400)
+    board1 = Board(400, 400, 4, 100, g)
+    board1.verbose = False
+    board1.tiles.initial_tiles(False)
+    board1.get_legal_moves()
+    board1.place_tile(0, 1)
+    board1.no_legal_moves()
+    assert board1.moves == [1, PASS]
+    board1.undo()
+    assert board1.moves == []
+
+
+def test_grid_stops_at_tiles():
+    """Grid lines end with the tiles when the window has room to spare."""
+    board1 = Board(800, 800, 12, 66, GameController(800, 800))
+    renderer = RecordingRenderer()
+    board1.draw_grid(renderer)
+    lines = [c[1:] for c in renderer.commands if c[0] == "line"]
+    assert len(lines) == 22
+    assert max(max(line) for line in lines) == 792
+
+
+def test_display_dirty_tiles():
+    """Only changed tiles are drawn, over the cached grid."""
+    g = GameController(400, 400)
+    board1 = Board(400, 400, 4, 100, g)
+    renderer = RecordingRenderer()
+    board1.renderer = renderer
+    board1.display()
+    assert renderer.commands[0] == ("buffer", 400, 400)
+    assert renderer.commands[1] == ("image", 0, 0, 0)
+    grid = renderer.buffers[0].commands
+    assert grid[0] == ("background", 0, 100, 0)
+    assert len([c for c in grid if c[0] == "line"]) == 6
+    assert len([c for c in renderer.commands if c[0] == "copy"]) == 16
+    assert len([c for c in renderer.commands if c[0] == "ellipse"]) == 4
+
+    renderer.clear()
+    board1.display()  # Idle frame.
+    assert renderer.commands == []
+
+    board1.place_tile(0, 1)
+    renderer.clear()
+    board1.display()
+    copies = [c[2:4] for c in renderer.commands if c[0] == "copy"]
+    assert copies == [(100, 0), (100, 100)]
+    assert ("ellipse", 150, 50, 90, 90) in renderer.commands
+
+    board1.redraw = True
+    renderer.clear()
+    board1.display()
+    assert renderer.commands[0] == ("image", 0, 0, 0)
+    assert len([c for c in renderer.commands if c[0] == "ellipse"]) == 5
@@ -1,5 +1,13 @@
 # Simulate the AI player in the Othello game
-from random import randrange
+from random import Random
+from endgame import EndgameSolver
+from evaluation import get_evaluator
+from mcts import MCTS
+from position import legal_mask, flip_mask, squares, bit_count
+from search import Search
+from transposition import TranspositionTable
+
+STRATEGIES = ("random", "pattern", "negamax", "parallel", "mcts")
 
 
 class CompAI:
@@ -10,26 +18,239 @@ class CompAI:
     ----------
     tiles: instance of the Tiles class.
         Instance of the Tiles class for all the tiles on the board.
+    strategy : str
+        How moves are chosen: "random", "pattern", "negamax", "parallel" or
+        "mcts".
+    thinking_time : int
+        Time budget of a search, in seconds.
+    playouts : int or None
+        Playout budget of the "mcts" strategy, None to use thinking_time.
+    random : instance of the Random class.
+        Source of random moves, seeded for reproducible games.
+    search : instance of the Search or ParallelSearch class.
+        Negamax search used by the "negamax" and "parallel" strategies.
+    evaluator : instance of the PatternEvaluator class, or None.
+        Pattern tables used by the "pattern" strategy.
+    mcts : instance of the MCTS class, or None.
+        Monte Carlo tree search used by the "mcts" strategy.
+    endgame : instance of the EndgameSolver class.
+        Exact solver that replaces the search near the end of the game.
+    book : instance of the OpeningBook class, or None.
+        Opening moves consulted before searching.
+    move_stats : list of dicts
+        Search statistics of every searched move, including the hit rate of
+        the transposition table.
 
     Methods
     -------
     choose_move
+        Choose a tile from the dictionary of legal moves according to the
+        strategy and returns the coordinates of the tile as a tuple.
+    random_move
         Choose a random tile from the dictionary of legal moves and returns the
         coordinates of the tile as a tuple.
+    pattern_move
+        Choose the tile whose resulting position scores best with the pattern
+        tables, breaking ties by flip count and then at random.
+    book_move
+        Returns the move stored in the opening book for a position.
+    mcts_move
+        Runs the Monte Carlo tree search for the player to move and returns
+        the coordinates of the most visited tile as a tuple.
+    search_move
+        Search the position for the player to move within the thinking time
+        and returns the coordinates of the best tile as a tuple. Solves the
+        position exactly once few enough squares are empty.
+    cancel
+        Stops a search running on another thread.
+    clear_cancel
+        Lets the next search run after a cancel.
+    close
+        Shuts down the worker processes of the "parallel" strategy.
     """
-    def __init__(self, tiles):
+    def __init__(self, tiles, strategy="random", thinking_time=2,
+                 table_bytes=1 << 22, table_policy="depth",
+                 endgame_empties=10, seed=None, workers=2, book=None,
+                 playouts=None):
         """
         Parameters
         ----------
         tiles : instance of Tiles class.
             Instance of the Tiles class for all the tiles on the board.
+        strategy : str (default random)
+            How moves are chosen: "random", "pattern", "negamax",
+            "parallel" or "mcts". Any other strategy raises ValueError.
+        thinking_time : int (default 2)
+            Time budget of a search, in seconds.
+        table_bytes : int (default 4 MiB)
+            Memory cap of the transposition table.
+        table_policy : str (default depth)
+            Replacement policy of the transposition table.
+        endgame_empties : int (default 10)
+            Number of empty squares at which the search switches to the
+            exact endgame solver.
+        seed : int (default None)
+            Seed of the random moves, None for a random seed.
+        workers : int (default 2)
+            Number of worker processes of the "parallel" strategy.
+        book : str (default None)
+            Name of an opening book file, see opening_book.py.
+        playouts : int (default None)
+            Playouts per move of the "mcts" strategy, None to play out
+            for thinking_time seconds instead.
         """
+        if strategy not in STRATEGIES:
+            raise ValueError("unknown strategy {0!r}, expected one of {1}"
+                             .format(strategy, ", ".join(STRATEGIES)))
         self.tiles = tiles
+        self.strategy = strategy
+        self.thinking_time = thinking_time
+        self.playouts = playouts
+        self.random = Random(seed)
+        if strategy == "parallel":
+            # Imported here, as Processing's Jython has no multiprocessing.
+            from parallel_search import ParallelSearch
+            self.search = ParallelSearch(tiles.TILES_DIMENS, workers,
+                                         table_bytes, table_policy)
+        else:
+            table = None
+            if strategy == "negamax":  # Only searches need the memory.
+                table = TranspositionTable(table_bytes, table_policy)
+            self.search = Search(tiles.TILES_DIMENS, table=table)
+        self.evaluator = None
+        if strategy == "pattern":
+            self.evaluator = get_evaluator(tiles.TILES_DIMENS)
+        self.mcts = None
+        if strategy == "mcts":
+            self.mcts = MCTS(tiles.TILES_DIMENS, seed=seed)
+        self.endgame = EndgameSolver(tiles.TILES_DIMENS, endgame_empties)
+        self.book = None
+        if book is not None:
+            from opening_book import OpeningBook
+            self.book = OpeningBook(book)
+        self.move_stats = []
 
     def choose_move(self):
+        """
+        Choose a tile from the dictionary of legal moves according to the
+        strategy and returns the coordinates of the tile as a tuple.
+        """
+        if self.strategy in ("negamax", "parallel"):
+            return self.search_move()
+        if self.strategy == "pattern":
+            return self.pattern_move()
+        if self.strategy == "mcts":
+            return self.mcts_move()
+        return self.random_move()
+
+    def random_move(self):
         """
         Choose a random tile from the dictionary of legal moves and returns the
         coordinates of the tile as a tuple.
         """
         keys = list(self.tiles.legal_moves)  # Captures keys in a list.
-        return keys[randrange(0, len(keys))]
+        return keys[self.random.randrange(0, len(keys))]
+
+    def pattern_move(self):
+        """
+        Choose the tile whose resulting position scores best with the pattern
+        tables, breaking ties by the number of flipped tiles and then at
+        random, as described in ai.txt. Returns its coordinates as a tuple.
+        """
+        position, place_black = self.tiles.position, self.tiles.place_black
+        own, opp = position.sides(place_black)
+        masks, evaluate = self.search.masks, self.evaluator.evaluate
+        best, best_rank = [], None
+        for move in squares(legal_mask(own, opp, masks)):
+            flips = flip_mask(own, opp, move, masks)
+            rank = (evaluate(own | flips | (1 << move), opp ^ flips),
+                    bit_count(flips))
+            if best_rank is None or rank > best_rank:
+                best, best_rank = [move], rank
+            elif rank == best_rank:
+                best.append(move)
+        if not best:
+            return None
+        move = best[self.random.randrange(0, len(best))]
+        return divmod(move, self.tiles.TILES_DIMENS)
+
+    def mcts_move(self):
+        """
+        Runs the Monte Carlo tree search for the player to move, for
+        playouts playouts or else thinking_time seconds, and returns the
+        coordinates of the most visited tile as a tuple.
+        """
+        own, opp = self.tiles.position.sides(self.tiles.place_black)
+        if self.playouts is not None:
+            move = self.mcts.choose_move(own, opp, playouts=self.playouts)
+        else:
+            move = self.mcts.choose_move(own, opp,
+                                         time_budget=self.thinking_time)
+        if move is None:
+            return None
+        self.move_stats.append(dict(self.mcts.stats))
+        return divmod(move, self.tiles.TILES_DIMENS)
+
+    def search_move(self):
+        """
+        Search the position for the player to move within the thinking time
+        and returns the coordinates of the best tile as a tuple. Plays from
+        the opening book when it has the position, and solves the position
+        exactly once few enough squares are empty.
+        """
+        position, place_black = self.tiles.position, self.tiles.place_black
+        own, opp = position.sides(place_black)
+        key = position.zobrist(place_black)
+        move = self.book_move(own, opp, key)
+        if move is not None:
+            return divmod(move, self.tiles.TILES_DIMENS)
+        if self.endgame.applies(own, opp):
+            move = self.endgame.solve(own, opp)[0]
+            stats = self.endgame.stats
+        else:
+            move = self.search.choose_move(own, opp, self.thinking_time,
+                                           black=place_black, key=key)
+            stats = self.search.stats
+        if move is None:
+            return None
+        self.move_stats.append(dict(stats))
+        return divmod(move, self.tiles.TILES_DIMENS)
+
+    def book_move(self, own, opp, key):
+        """
+        Given a position and its Zobrist key, returns the move stored in the
+        opening book, or None if the book has no legal move for it.
+        """
+        book = self.book
+        if book is None or book.TILES_DIMENS != self.tiles.TILES_DIMENS:
+            return None
+        entry = book.lookup(key)
+        if entry is None:
+            return None
+        move, score = entry
+        if not legal_mask(own, opp, self.search.masks) >> move & 1:
+            return None  # Hash collision.
+        self.move_stats.append({"book": True, "move": move, "score": score})
+        return move
+
+    def cancel(self):
+        """
+        Stops a search running on another thread, which then returns the
+        best move found so far.
+        """
+        self.search.cancelled = True
+        self.endgame.cancelled = True
+        if self.mcts is not None:
+            self.mcts.cancelled = True
+
+    def clear_cancel(self):
+        """Lets the next search run after a cancel."""
+        self.search.cancelled = False
+        self.endgame.cancelled = False
+        if self.mcts is not None:
+            self.mcts.cancelled = False
+
+    def close(self):
+        """Shuts down the worker processes of the "parallel" strategy."""
+        if self.strategy == "parallel":
+            self.search.close()
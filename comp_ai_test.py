@@ -1,4 +1,5 @@
 # Test for the CompAI class
+import pytest
 from comp_ai import CompAI
 from tiles import Tiles
 
@@ -8,6 +9,8 @@ def test_constructor():
     tiles = Tiles(400, 400, 100, 4)
     ai = CompAI(tiles)
     assert ai.tiles is tiles
+    with pytest.raises(ValueError):
+        CompAI(tiles, "minimax")
 
 
 def test_choose_move():
@@ -17,4 +20,85 @@ def test_choose_move():
     ai.tiles.initial_tiles(False)
     ai.tiles.generate_legal_moves()
     keys = ai.tiles.legal_moves.keys()
-    assert ai.choose_move() in keys
\ No newline at end of file
+    assert ai.choose_move() in keys
+
+
+def test_choose_move_negamax():
+    """Test the negamax strategy."""
+    tiles = Tiles(400, 400, 100, 4)
+    ai = CompAI(tiles, "negamax", 1)
+    assert ai.strategy == "negamax"
+    assert ai.thinking_time == 1
+    ai.tiles.initial_tiles(False)
+    ai.tiles.generate_legal_moves()
+    assert ai.choose_move() in ai.tiles.legal_moves
+    assert ai.search.stats["depth"] >= 1
+
+
+def test_choose_move_endgame():
+    """Near the end of the game the position is solved exactly."""
+    own, opp, expected = 0x60c0e0e7d5efc706, 0x183e1f182a102049, -2
+    tiles = Tiles(800, 800, 100, 8)
+    for square in range(64):
+        if own >> square & 1:
+            tiles.update_color(square // 8, square % 8, "black")
+        elif opp >> square & 1:
+            tiles.update_color(square // 8, square % 8, "white")
+    ai = CompAI(tiles, "negamax", 1, endgame_empties=10)
+    ai.tiles.generate_legal_moves()
+    assert ai.choose_move() in ai.tiles.legal_moves
+    assert ai.move_stats[-1]["empties"] == 10
+    assert ai.move_stats[-1]["score"] == expected
+
+
+def test_choose_move_parallel():
+    """Test the parallel strategy."""
+    tiles = Tiles(400, 400, 100, 4)
+    ai = CompAI(tiles, "parallel", 1, workers=2)
+    assert ai.search.workers == 2
+    ai.tiles.initial_tiles(False)
+    ai.tiles.generate_legal_moves()
+    assert ai.choose_move() in ai.tiles.legal_moves
+    assert ai.search.executor is not None
+    ai.close()
+    assert ai.search.executor is None
+
+
+def test_choose_move_mcts():
+    """Test the mcts strategy, by playouts and by time."""
+    tiles = Tiles(400, 400, 100, 4)
+    ai = CompAI(tiles, "mcts", seed=1, playouts=100)
+    ai.tiles.initial_tiles(False)
+    ai.tiles.generate_legal_moves()
+    assert ai.choose_move() in ai.tiles.legal_moves
+    assert ai.move_stats[-1]["playouts"] == 100
+    ai.playouts, ai.thinking_time = None, 0.05
+    assert ai.choose_move() in ai.tiles.legal_moves
+    assert ai.move_stats[-1]["elapsed"] < 1
+
+
+def test_choose_move_book(tmp_path):
+    """The opening book is consulted before searching."""
+    from opening_book import build_book
+    path = str(tmp_path / "book.bin")
+    build_book(path, 8, 2, 1)
+    tiles = Tiles(800, 800, 100, 8)
+    ai = CompAI(tiles, "negamax", 1, book=path)
+    ai.tiles.initial_tiles(False)
+    ai.tiles.generate_legal_moves()
+    assert ai.choose_move() in ai.tiles.legal_moves
+    assert ai.move_stats[-1]["book"] is True
+    ai.book.close()
+
+
+def test_choose_move_pattern():
+    """The pattern strategy takes an available corner."""
+    tiles = Tiles(800, 800, 100, 8)
+    tiles.update_color(1, 1, "white")
+    tiles.update_color(2, 2, "black")
+    tiles.update_color(3, 3, "white")
+    tiles.update_color(4, 4, "black")
+    ai = CompAI(tiles, "pattern", seed=1)
+    ai.tiles.generate_legal_moves()
+    assert (0, 0) in ai.tiles.legal_moves
+    assert ai.choose_move() == (0, 0)
@@ -0,0 +1,165 @@
+# Creates an instance of the EndgameSolver class, which plays the last empty
+# squares of the board perfectly.
+from time import time
+from position import bit_count, squares, legal_mask, flip_mask, get_masks
+from search import SearchTimeout
+
+
+class EndgameSolver:
+    """
+    Exact alpha-beta solver for positions with few empty squares.
+
+    Scores are final disc differences (player to move minus opponent), the
+    same count used by Board.check_winning_conditions.
+
+    Attributes
+    ----------
+    TILES_DIMENS : int
+        Number of tiles per side of the square board.
+    masks : instance of the Masks class.
+        Precomputed masks for the board size.
+    threshold : int
+        Positions with at most this many empty squares are solved.
+    fastest_first : int
+        Above this many empty squares, moves that leave the opponent the
+        fewest replies are searched first. Below it, moves are ordered by
+        region parity only.
+    regions : list of ints
+        Bitboards of the four quadrants of the board.
+    check_interval : int
+        Number of nodes between two checks of cancelled.
+    cancelled : Bool
+        Conditional for stopping the current solve early, set from another
+        thread. Stays set until cleared.
+    nodes : int
+        Counter of nodes visited by the current solve.
+    stats : dict
+        Statistics of the last call to solve.
+
+    Methods
+    -------
+    empties
+        Returns the number of empty squares of a position.
+    applies
+        Returns True if the position is within the solver's threshold.
+    solve
+        Returns the optimal move of a position and its final disc difference.
+    negamax
+        Returns the exact final disc difference of a position.
+    order
+        Returns the legal moves of a position with their flips, in the order
+        they should be searched.
+    """
+    def __init__(self, TILES_DIMENS, threshold=10, fastest_first=4):
+        """
+        Parameters
+        ----------
+        TILES_DIMENS : int
+            Number of tiles per side of the square board.
+        threshold : int (default 10)
+            Positions with at most this many empty squares are solved.
+        fastest_first : int (default 4)
+            Number of empty squares above which fastest-first ordering is
+            used.
+        """
+        self.TILES_DIMENS = TILES_DIMENS
+        self.masks = get_masks(TILES_DIMENS)
+        self.threshold = threshold
+        self.fastest_first = fastest_first
+        half = TILES_DIMENS // 2
+        self.regions = [0, 0, 0, 0]
+        for row in range(TILES_DIMENS):
+            for col in range(TILES_DIMENS):
+                region = 2 * (row >= half) + (col >= half)
+                self.regions[region] |= 1 << (row * TILES_DIMENS + col)
+        self.check_interval = 1024
+        self.cancelled = False
+        self.nodes = 0
+        self.stats = {}
+
+    def empties(self, own, opp):
+        """Returns the number of empty squares of a position."""
+        return self.TILES_DIMENS ** 2 - bit_count(own | opp)
+
+    def applies(self, own, opp):
+        """Returns True if the position is within the solver's threshold."""
+        return self.empties(own, opp) <= self.threshold
+
+    def solve(self, own, opp):
+        """
+        Returns the optimal move of a position and its final disc difference.
+        The move is None if the player to move has to pass. A cancelled solve
+        returns the best move found so far.
+        """
+        start = time()
+        self.nodes = 0
+        limit = self.TILES_DIMENS ** 2 + 1
+        moves = legal_mask(own, opp, self.masks)
+        best_move = None
+        alpha = -limit
+        try:
+            if moves:
+                for move, flips in self.order(own, opp, moves):
+                    score = -self.negamax(opp ^ flips,
+                                          own | flips | (1 << move),
+                                          -limit, -alpha)
+                    if score > alpha:
+                        alpha, best_move = score, move
+            else:
+                alpha = self.negamax(own, opp, -limit, limit)
+        except SearchTimeout:
+            pass
+        self.stats = {"nodes": self.nodes, "elapsed": time() - start,
+                      "empties": self.empties(own, opp), "score": alpha,
+                      "move": best_move}
+        return best_move, alpha
+
+    def negamax(self, own, opp, alpha, beta):
+        """Returns the exact final disc difference of a position."""
+        self.nodes += 1
+        if not self.nodes % self.check_interval and self.cancelled:
+            raise SearchTimeout()
+        moves = legal_mask(own, opp, self.masks)
+        if not moves:
+            if not legal_mask(opp, own, self.masks):  # Game over.
+                return bit_count(own) - bit_count(opp)
+            return -self.negamax(opp, own, -beta, -alpha)  # Pass.
+        best = -self.TILES_DIMENS ** 2 - 1
+        for move, flips in self.order(own, opp, moves):
+            score = -self.negamax(opp ^ flips, own | flips | (1 << move),
+                                  -beta, -alpha)
+            if score > best:
+                best = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best
+
+    def order(self, own, opp, moves):
+        """
+        Returns the legal moves of a position with their flips, in the order
+        they should be searched.
+        """
+        masks = self.masks
+        empty = masks.full & ~(own | opp)
+        # Moving into a region with an odd number of empty squares tends to
+        # leave the last move of that region to the player to move.
+        odd = 0
+        for region in self.regions:
+            if bit_count(empty & region) % 2:
+                odd |= region
+        if bit_count(empty) <= self.fastest_first:
+            return ([(move, flip_mask(own, opp, move, masks))
+                     for move in squares(moves & odd)] +
+                    [(move, flip_mask(own, opp, move, masks))
+                     for move in squares(moves & ~odd)])
+        scored = []
+        for move in squares(moves):
+            flips = flip_mask(own, opp, move, masks)
+            bit = 1 << move
+            replies = bit_count(legal_mask(opp ^ flips, own | flips | bit,
+                                           masks))
+            scored.append((replies, not odd & bit, move, flips))
+        scored.sort()
+        return [(move, flips) for _, _, move, flips in scored]
@@ -0,0 +1,51 @@
+# Test the EndgameSolver class.
+from benchmark import ENDGAME_POSITIONS, sample_positions
+from endgame import EndgameSolver
+from search import Search, WIN_SCALE
+
+
+def test_constructor():
+    """Test the constructor."""
+    solver = EndgameSolver(8, 12)
+    assert solver.threshold == 12
+    assert len(solver.regions) == 4
+    assert solver.regions[0] == 0x0f0f0f0f
+    assert sum(solver.regions) == (1 << 64) - 1
+
+
+def test_applies():
+    """Test the empties and applies methods."""
+    solver = EndgameSolver(8, 10)
+    own, opp, _ = ENDGAME_POSITIONS[0]
+    assert solver.empties(own, opp) == 10
+    assert solver.applies(own, opp) is True
+    solver.threshold = 9
+    assert solver.applies(own, opp) is False
+
+
+def test_solve():
+    """The solver finds the known result of the fixed positions."""
+    solver = EndgameSolver(8)
+    for own, opp, expected in ENDGAME_POSITIONS[:3]:
+        move, score = solver.solve(own, opp)
+        assert score == expected
+        assert not (own | opp) & (1 << move)  # Square was empty.
+        assert solver.stats["score"] == expected
+
+
+def test_matches_full_search():
+    """The solver agrees with a search that reaches every game end."""
+    solver = EndgameSolver(6)
+    search = Search(6)
+    for own, opp in sample_positions(6, 7, 5, seed=3):
+        depth = solver.empties(own, opp) + 1
+        full = search.negamax(own, opp, depth, -1 << 30, 1 << 30)
+        assert solver.solve(own, opp)[1] * WIN_SCALE == full
+
+
+def test_pass():
+    """A player without legal moves gets no move but an exact score."""
+    solver = EndgameSolver(4)
+    own = 0
+    opp = 0b1111
+    assert solver.solve(own, opp) == (None, -4)
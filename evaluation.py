@@ -0,0 +1,214 @@
+# Creates an instance of the PatternEvaluator class, which scores 8x8
+# positions with lookup tables indexed by edge, corner and diagonal patterns.
+
+# Weights of the priorities described in ai.txt.
+CORNER = 30
+X_PENALTY = 15
+C_PENALTY = 8
+EDGE = 3
+STABLE_EDGE = 6
+DIAGONAL = 1
+
+EMPTY, OWN, OPP = 0, 1, 2
+_EVALUATORS = {}
+
+
+def pattern_index(own, opp, squares):
+    """
+    Given the bitboards of both players and the squares of a pattern,
+    returns the ternary index of the pattern: the sum of 3 ** i times the
+    state (EMPTY, OWN or OPP) of squares[i].
+    """
+    index = 0
+    for i, square in enumerate(squares):
+        if own >> square & 1:
+            index += 3 ** i
+        elif opp >> square & 1:
+            index += 2 * 3 ** i
+    return index
+
+
+def decode(index, length):
+    """Given a ternary index, returns the list of states of its cells."""
+    cells = []
+    for _ in range(length):
+        index, state = divmod(index, 3)
+        cells.append(state)
+    return cells
+
+
+def sign(state):
+    """Returns 1 for OWN, -1 for OPP and 0 for EMPTY."""
+    return (0, 1, -1)[state]
+
+
+def edge_value(cells):
+    """
+    Scores an edge of 8 cells with corners at both ends: middle squares are
+    worth EDGE, and discs joined to an occupied corner cannot be flipped.
+    Corners and C squares themselves are scored by the corner patterns.
+    """
+    value = sum(EDGE * sign(state) for state in cells[2:6])
+    stable = set()
+    for corner, step in ((0, 1), (7, -1)):
+        color = cells[corner]
+        i = corner + step
+        while color != EMPTY and 0 <= i < 8 and cells[i] == color:
+            stable.add(i)
+            i += step
+    for i in stable:
+        value += STABLE_EDGE * sign(cells[i])
+    return value
+
+
+def corner_value(cells, roles):
+    """
+    Scores a 3x3 corner block: the corner is worth CORNER, and X and C
+    squares next to an empty corner cost X_PENALTY and C_PENALTY.
+    """
+    value = 0
+    corner = roles.index("corner")
+    for state, role in zip(cells, roles):
+        if role == "corner":
+            value += CORNER * sign(state)
+        elif cells[corner] == EMPTY:
+            if role == "x":
+                value -= X_PENALTY * sign(state)
+            elif role == "c":
+                value -= C_PENALTY * sign(state)
+    return value
+
+
+def diagonal_value(cells):
+    """Scores a main diagonal: its four central squares are worth DIAGONAL."""
+    return sum(DIAGONAL * sign(state) for state in cells[2:6])
+
+
+def corner_squares(row, col):
+    """
+    Returns the squares of the 3x3 block whose top-left square is (row, col),
+    in the bit order produced by the corner extraction of evaluate.
+    """
+    return [(row + r) * 8 + col + c for r in range(3) for c in range(3)]
+
+
+def corner_roles(squares):
+    """Returns the role of every square of a corner block."""
+    roles = []
+    for square in squares:
+        row, col = divmod(square, 8)
+        edge_row, edge_col = row in (0, 7), col in (0, 7)
+        near_row, near_col = row in (1, 6), col in (1, 6)
+        if edge_row and edge_col:
+            roles.append("corner")
+        elif (edge_row and near_col) or (near_row and edge_col):
+            roles.append("c")
+        elif near_row and near_col:
+            roles.append("x")
+        else:
+            roles.append("other")
+    return roles
+
+
+class PatternEvaluator:
+    """
+    Scores 8x8 positions for the player to move with precomputed pattern
+    tables, following the priorities of ai.txt: corners first, then edges,
+    then avoiding the X and C squares next to empty corners.
+
+    Each pattern is read from the bitboards with a few shifts and masks (or
+    a multiplication, for columns and diagonals) and turned into a ternary
+    table index with the ternary lookup, so a position costs a fixed number
+    of table lookups.
+
+    Attributes
+    ----------
+    ternary : list of ints
+        key: bits of a pattern for one player.
+        value: the same digits read in base 3.
+    edge_table : list of ints
+        Value of every state of an edge.
+    diagonal_table : list of ints
+        Value of every state of a main diagonal.
+    corner_tables : list of lists of ints
+        Value of every state of each 3x3 corner block, in the order
+        top-left, top-right, bottom-left, bottom-right.
+    patterns : list of tuples
+        (table, squares) of every pattern, for reference and testing.
+
+    Methods
+    -------
+    evaluate
+        Returns the score of a position for the player to move.
+    """
+    def __init__(self, TILES_DIMENS=8):
+        """
+        Parameters
+        ----------
+        TILES_DIMENS : int (default 8)
+            Number of tiles per side of the square board. Must be 8.
+        """
+        if TILES_DIMENS != 8:
+            raise ValueError("Pattern evaluation needs an 8x8 board.")
+        self.ternary = [pattern_index(bits, 0, range(9))
+                        for bits in range(1 << 9)]
+        self.edge_table = [edge_value(decode(index, 8))
+                           for index in range(3 ** 8)]
+        self.diagonal_table = [diagonal_value(decode(index, 8))
+                               for index in range(3 ** 8)]
+        self.corner_tables = []
+        blocks = [corner_squares(0, 0), corner_squares(0, 5),
+                  corner_squares(5, 0), corner_squares(5, 5)]
+        for squares in blocks:
+            roles = corner_roles(squares)
+            self.corner_tables.append([corner_value(decode(index, 9), roles)
+                                       for index in range(3 ** 9)])
+        edges = [list(range(8)), list(range(56, 64)),
+                 list(range(0, 64, 8)), list(range(7, 64, 8))]
+        self.patterns = ([(self.edge_table, squares) for squares in edges] +
+                         [(self.diagonal_table, list(range(0, 64, 9))),
+                          (self.diagonal_table, list(range(56, 0, -7)))] +
+                         list(zip(self.corner_tables, blocks)))
+
+    def evaluate(self, own, opp):
+        """Returns the score of a position for the player to move."""
+        t = self.ternary
+        edge, diagonal = self.edge_table, self.diagonal_table
+        top_left, top_right, bottom_left, bottom_right = self.corner_tables
+        column = 0x0101010101010101
+        gather = 0x0102040810204080
+        score = (edge[t[own & 0xFF] + 2 * t[opp & 0xFF]] +
+                 edge[t[own >> 56] + 2 * t[opp >> 56]])
+        a = ((own & column) * gather >> 56) & 0xFF
+        b = ((opp & column) * gather >> 56) & 0xFF
+        score += edge[t[a] + 2 * t[b]]
+        a = (((own >> 7) & column) * gather >> 56) & 0xFF
+        b = (((opp >> 7) & column) * gather >> 56) & 0xFF
+        score += edge[t[a] + 2 * t[b]]
+        a = ((own & 0x8040201008040201) * column >> 56) & 0xFF
+        b = ((opp & 0x8040201008040201) * column >> 56) & 0xFF
+        score += diagonal[t[a] + 2 * t[b]]
+        a = ((own & 0x0102040810204080) * column >> 56) & 0xFF
+        b = ((opp & 0x0102040810204080) * column >> 56) & 0xFF
+        score += diagonal[t[a] + 2 * t[b]]
+        a = (own & 7) | ((own >> 5) & 0x38) | ((own >> 10) & 0x1C0)
+        b = (opp & 7) | ((opp >> 5) & 0x38) | ((opp >> 10) & 0x1C0)
+        score += top_left[t[a] + 2 * t[b]]
+        a = ((own >> 5) & 7) | ((own >> 10) & 0x38) | ((own >> 15) & 0x1C0)
+        b = ((opp >> 5) & 7) | ((opp >> 10) & 0x38) | ((opp >> 15) & 0x1C0)
+        score += top_right[t[a] + 2 * t[b]]
+        a = ((own >> 40) & 7) | ((own >> 45) & 0x38) | ((own >> 50) & 0x1C0)
+        b = ((opp >> 40) & 7) | ((opp >> 45) & 0x38) | ((opp >> 50) & 0x1C0)
+        score += bottom_left[t[a] + 2 * t[b]]
+        a = ((own >> 45) & 7) | ((own >> 50) & 0x38) | ((own >> 55) & 0x1C0)
+        b = ((opp >> 45) & 7) | ((opp >> 50) & 0x38) | ((opp >> 55) & 0x1C0)
+        score += bottom_right[t[a] + 2 * t[b]]
+        return score
+
+
+def get_evaluator(TILES_DIMENS=8):
+    """Returns the (cached) PatternEvaluator instance for the board size."""
+    evaluator = _EVALUATORS.get(TILES_DIMENS)
+    if evaluator is None:
+        evaluator = _EVALUATORS[TILES_DIMENS] = PatternEvaluator(TILES_DIMENS)
+    return evaluator
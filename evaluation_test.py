@@ -0,0 +1,58 @@
+# Test for the PatternEvaluator class
+from random import Random
+import pytest
+from evaluation import PatternEvaluator, pattern_index, CORNER
+
+
+def slow_evaluate(evaluator, own, opp):
+    """Scores a position by reading every pattern square by square."""
+    return sum(table[pattern_index(own, opp, squares)]
+               for table, squares in evaluator.patterns)
+
+
+def random_position(rng):
+    """Returns a random (own, opp) pair of 8x8 bitboards."""
+    own = opp = 0
+    for square in range(64):
+        state = rng.randrange(3)
+        if state == 1:
+            own |= 1 << square
+        elif state == 2:
+            opp |= 1 << square
+    return own, opp
+
+
+def test_constructor():
+    """Test the constructor"""
+    evaluator = PatternEvaluator()
+    assert len(evaluator.ternary) == 512
+    assert evaluator.ternary[0b101] == 10
+    assert len(evaluator.edge_table) == 3 ** 8
+    assert len(evaluator.corner_tables) == 4
+    assert len(evaluator.patterns) == 10
+    with pytest.raises(ValueError):
+        PatternEvaluator(6)
+
+
+def test_evaluate_matches_patterns():
+    """The bit gathers read the same squares as the pattern lists."""
+    evaluator = PatternEvaluator()
+    rng = Random(0)
+    for _ in range(200):
+        own, opp = random_position(rng)
+        assert evaluator.evaluate(own, opp) == slow_evaluate(evaluator, own,
+                                                             opp)
+        assert evaluator.evaluate(own, opp) == -evaluator.evaluate(opp, own)
+
+
+def test_evaluate():
+    """Corners are worth most, X squares next to empty corners cost."""
+    evaluator = PatternEvaluator()
+    assert evaluator.evaluate(0, 0) == 0
+    for corner in (0, 7, 56, 63):
+        assert evaluator.evaluate(1 << corner, 0) >= CORNER
+    for x_square in (9, 14, 49, 54):
+        assert evaluator.evaluate(1 << x_square, 0) < 0
+    # The X square no longer costs once its corner is taken.
+    assert (evaluator.evaluate(1 << 0 | 1 << 9, 0) >
+            evaluator.evaluate(1 << 0, 0) + evaluator.evaluate(1 << 9, 0))
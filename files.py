@@ -0,0 +1,22 @@
+# File helpers shared by the modules that rewrite a file in one step, which
+# must work on CPython, Windows and Processing's Jython.
+import os
+
+
+def replace_file(source, target):
+    """
+    Renames source to target, replacing target if it exists. Uses
+    os.replace where it exists. Elsewhere, and on Jython in particular,
+    a rename that fails because target exists is retried after removing it.
+    """
+    replace = getattr(os, "replace", None)
+    if replace is not None:
+        replace(source, target)
+        return
+    try:
+        os.rename(source, target)
+    except OSError:
+        if not os.path.exists(target):
+            raise
+        os.remove(target)
+        os.rename(source, target)
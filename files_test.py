@@ -0,0 +1,43 @@
+# Test the file helpers.
+import os
+from files import replace_file
+
+
+def write(name, text):
+    """Writes text to the file name."""
+    with open(name, "w") as f:
+        f.write(text)
+
+
+def test_replace_file(tmp_path):
+    """The source replaces an existing target."""
+    source, target = str(tmp_path / "new.txt"), str(tmp_path / "old.txt")
+    write(source, "new")
+    write(target, "old")
+    replace_file(source, target)
+    assert not os.path.exists(source)
+    with open(target) as f:
+        assert f.read() == "new"
+
+
+def test_replace_file_without_replace(tmp_path, monkeypatch):
+    """Without os.replace, a rename that will not overwrite is retried."""
+    rename = os.rename
+
+    def jython_rename(source, target):
+        if os.path.exists(target):
+            raise OSError("target exists")
+        rename(source, target)
+    monkeypatch.delattr(os, "replace")
+    monkeypatch.setattr(os, "rename", jython_rename)
+    source, target = str(tmp_path / "new.txt"), str(tmp_path / "old.txt")
+    write(source, "new")
+    write(target, "old")
+    replace_file(source, target)
+    with open(target) as f:
+        assert f.read() == "new"
+    write(source, "newer")
+    os.remove(target)  # Plain rename when nothing is in the way.
+    replace_file(source, target)
+    with open(target) as f:
+        assert f.read() == "newer"
@@ -1,6 +1,10 @@
 # Creates an instance of GameController class which maintains the state of
 # the Othello game.
-from score_organizer import ScoreOrganizer
+from score_writer import ScoreWriter
+try:
+    from score_store import ScoreStore
+except ImportError:  # Processing's Jython has no sqlite3.
+    ScoreStore = None
 
 
 class GameController:
@@ -28,7 +32,8 @@ class GameController:
     user_score = int
         User's score, only updated at end-game
     delay = int
-        Counter to delay score update.
+        Counter of frames since the end of the game, to draw the score only
+        once and delay the score update.
 
     Methods
     -------
@@ -36,9 +41,12 @@ class GameController:
         If end-game conditions are reached, displays the winner in the terminal
         and displays the user's total score on the board.
         Updates the score file with the user's name and score.
+    reset
+        Forgets the result of the last game.
     write_score
         Continuously prompts the user until an input of at least one character
-        is given. Then updates the scores in file "othello.txt"
+        is given. Then records the score in "othello.db", or in "othello.txt"
+        without sqlite3.
     input
         Given a string message, initializes a user-interface and displays
         the message to the user. Returns user input as a string.
@@ -86,24 +94,45 @@ class GameController:
             FILL_COLOR = 255 // 2
             TEXT_SIZE = 50
 
-            message = "Your score:" + str(self.user_score)
-            fill(FILL_COLOR)
-            textSize(TEXT_SIZE)
-            text(message, self.WIDTH // 2 - SHIFT, self.HEIGHT // 2)
+            # Drawn once: the board is not cleared between frames, so
+            # drawing the text again would thicken its anti-aliased edges.
+            if not self.delay:
+                message = "Your score:" + str(self.user_score)
+                fill(FILL_COLOR)
+                textSize(TEXT_SIZE)
+                text(message, self.WIDTH // 2 - SHIFT, self.HEIGHT // 2)
             self.delay += 1
 
             if not self.updated_score and self.delay > 1:  # Update only once.
                 self.write_score()
 
+    def reset(self):
+        """Forgets the result of the last game."""
+        self.draw = True
+        self.updated_score = False
+        self.comp_wins = False
+        self.user_wins = False
+        self.tie = False
+        self.comp_score = 2
+        self.user_score = 2
+        self.delay = 0
+
     def write_score(self):
         """
         Continuously prompts the user until an input of at least one character
-        is given. Then updates the scores in file "othello.txt"
+        is given. Then records the score in "othello.db", or in "othello.txt"
+        without sqlite3.
         """
         answer = self.input("Enter your name")
         if answer:
-            scorg = ScoreOrganizer(answer, self.user_score, "othello.txt")
-            scorg.update_score()
+            if ScoreStore is not None:
+                store = ScoreStore("othello.db")
+                store.add(answer, self.user_score)
+                store.close()
+            else:
+                # One score per game: written at once, not batched.
+                with ScoreWriter("othello.txt") as writer:
+                    writer.write(answer, self.user_score)
             self.updated_score = True
         else:
             print("Please enter at least one character.")
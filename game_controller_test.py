@@ -1,4 +1,5 @@
 # Test the GameController class.
+import game_controller
 from game_controller import GameController
 from board import Board
 
@@ -33,3 +34,22 @@ def test_update():
     assert board.gc.comp_wins is True
     assert board.gc.comp_score == 9
     assert board.gc.user_score == 7
+
+
+def test_update_draws_score_once(monkeypatch):
+    """The final score is drawn on the first frame after the game only."""
+    texts = []
+    monkeypatch.setattr(game_controller, "fill", lambda *args: None,
+                        raising=False)
+    monkeypatch.setattr(game_controller, "textSize", lambda *args: None,
+                        raising=False)
+    monkeypatch.setattr(game_controller, "text",
+                        lambda *args: texts.append(args), raising=False)
+    gc = GameController(400, 400)
+    gc.user_wins = True
+    gc.user_score = 10
+    gc.updated_score = True  # No name prompt.
+    for _ in range(3):
+        gc.update()
+    assert texts == [("Your score:10", 67, 200)]
+    assert gc.delay == 3
@@ -0,0 +1,121 @@
+# Compact binary records of finished games. An archive is a file header
+# followed by games, each a small header and one byte per move:
+#     file header  "OTHR", version
+#     game header  TILES_DIMENS, number of moves, black tiles, white tiles
+#     moves        square (row * TILES_DIMENS + col) per move, PASS for a pass
+from collections import namedtuple
+from struct import Struct
+from board import PASS
+
+MAGIC = b"OTHR"
+VERSION = 1
+FILE_HEADER = Struct("<4sB")
+GAME_HEADER = Struct("<BHHH")
+# Largest board whose squares fit in a byte next to PASS.
+MAX_DIMENS = 15
+
+GameRecord = namedtuple("GameRecord", "TILES_DIMENS moves black white")
+
+
+class GameWriter:
+    """
+    Appends game records to an archive as they are played, so that an
+    archive never has to be held in memory.
+
+    Attributes
+    ----------
+    path : str
+        Name of the archive.
+    file : file object
+        Archive opened for appending.
+    games : int
+        Counter of games written by this writer.
+
+    Methods
+    -------
+    write
+        Appends one game given its moves and final tile counts.
+    write_board
+        Appends the game recorded by a Board.
+    close
+        Closes the archive.
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            Name of the archive, created with its header if it does not
+            exist and appended to otherwise.
+        """
+        self.path = path
+        self.file = open(path, "ab")
+        if self.file.tell() == 0:
+            self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+        self.games = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, TILES_DIMENS, moves, black, white):
+        """
+        Appends one game given the board size, the list of moves (squares or
+        PASS) and the final numbers of black and white tiles.
+        """
+        if TILES_DIMENS > MAX_DIMENS:
+            raise ValueError("Game records hold boards up to {0}x{0}.".format(
+                MAX_DIMENS))
+        self.file.write(GAME_HEADER.pack(TILES_DIMENS, len(moves), black,
+                                         white))
+        self.file.write(bytearray(moves))
+        self.games += 1
+
+    def write_board(self, board):
+        """Appends the game recorded by a Board."""
+        self.write(board.TILES_DIMENS, board.moves, board.tiles.bk_tiles,
+                   board.tiles.wt_tiles)
+
+    def close(self):
+        """Closes the archive."""
+        self.file.close()
+
+
+def read_games(path):
+    """
+    Generates the GameRecord of every game in an archive, reading one game
+    at a time. moves is a bytearray of squares and PASS. Raises ValueError
+    if the file is not an archive or ends in the middle of a game.
+    """
+    with open(path, "rb") as f:
+        header = f.read(FILE_HEADER.size)
+        if len(header) < FILE_HEADER.size:
+            raise ValueError(path + " is not a game archive.")
+        magic, version = FILE_HEADER.unpack(header)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(path + " is not a game archive.")
+        while True:
+            header = f.read(GAME_HEADER.size)
+            if not header:
+                return
+            if len(header) < GAME_HEADER.size:
+                raise ValueError(path + " ends in a game header.")
+            dimens, count, black, white = GAME_HEADER.unpack(header)
+            moves = bytearray(f.read(count))
+            if len(moves) < count:
+                raise ValueError(path + " ends in a game.")
+            yield GameRecord(dimens, moves, black, white)
+
+
+def coordinates(record):
+    """
+    Generates the moves of a record as (row, col) tuples, with None for a
+    pass.
+    """
+    for move in record.moves:
+        if move == PASS:
+            yield None
+        else:
+            yield divmod(move, record.TILES_DIMENS)
@@ -0,0 +1,69 @@
+# Test for the game record reader and writer
+import pytest
+from board import PASS
+from game_record import GameWriter, read_games, coordinates, GAME_HEADER
+from simulator import Simulator
+
+
+def replay(record):
+    """Plays a record on a new Board. Returns the Board."""
+    board = Simulator(record.TILES_DIMENS).new_board()
+    for move in coordinates(record):
+        board.get_legal_moves()
+        if move is None:
+            assert not board.tiles.legal_moves
+            board.no_legal_moves()
+        else:
+            assert move in board.tiles.legal_moves
+            board.place_tile(*move)
+    return board
+
+
+def test_round_trip(tmp_path):
+    """Recorded games replay to the recorded final counts."""
+    path = str(tmp_path / "games.bin")
+    simulator = Simulator(6)
+    with GameWriter(path) as writer:
+        results = [simulator.play_game(seed, writer) for seed in range(20)]
+    with GameWriter(path) as writer:  # Appending keeps one file header.
+        results.append(simulator.play_game(20, writer))
+    records = list(read_games(path))
+    assert len(records) == 21
+    passes = 0
+    for record, result in zip(records, results):
+        assert record.TILES_DIMENS == 6
+        assert (record.black, record.white) == (result["black"],
+                                                result["white"])
+        board = replay(record)
+        assert board.tiles.bk_tiles == record.black
+        assert board.tiles.wt_tiles == record.white
+        passes += record.moves.count(PASS)
+    assert passes > 0
+
+
+def test_one_byte_per_move(tmp_path):
+    """A game takes its header plus one byte per move."""
+    path = str(tmp_path / "games.bin")
+    with GameWriter(path) as writer:
+        writer.write(8, [19, 18, PASS, 17], 3, 4)
+    with open(path, "rb") as f:
+        data = f.read()
+    assert len(data) == 5 + GAME_HEADER.size + 4
+    record = next(read_games(path))
+    assert list(coordinates(record)) == [(2, 3), (2, 2), None, (2, 1)]
+    with pytest.raises(ValueError):
+        GameWriter(path).write(16, [], 0, 0)
+
+
+def test_bad_archives(tmp_path):
+    """Files that are not whole archives are rejected."""
+    path = tmp_path / "games.bin"
+    path.write_bytes(b"NOPE\x01")
+    with pytest.raises(ValueError):
+        list(read_games(str(path)))
+    with GameWriter(str(path) + "2") as writer:
+        writer.write(8, [19, 18], 3, 2)
+    with open(str(path) + "2", "rb") as f:
+        path.write_bytes(f.read()[:-1])
+    with pytest.raises(ValueError):
+        list(read_games(str(path)))
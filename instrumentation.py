@@ -0,0 +1,267 @@
+# Creates an instance of the Instrumentation class, which times the hot paths
+# of the game and counts the work they do. Nothing is measured until enable
+# is called, as the measured methods are only wrapped while enabled.
+import json
+from bisect import bisect_left
+from time import time
+from board import Board
+from comp_ai import CompAI
+from files import replace_file
+from tiles import Tiles, LazyFlips
+
+# Upper bounds of the latency buckets, in seconds.
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Upper bounds of the flip-set and frontier size buckets, in tiles.
+SIZE_BUCKETS = (1, 2, 3, 4, 6, 8, 12, 16, 24, 32, 48, 64)
+PREFIX = "othello_"
+# Instrumentation instance currently wrapping the methods, at most one.
+_ACTIVE = []
+
+
+class Histogram:
+    """
+    Distribution of observed values over fixed buckets.
+
+    Attributes
+    ----------
+    bounds : tuple of floats
+        Upper bound of every bucket, in increasing order.
+    counts : list of ints
+        Number of values per bucket, the last one counting values above
+        every bound.
+    total : float
+        Sum of the observed values.
+    count : int
+        Number of observed values.
+
+    Methods
+    -------
+    observe
+        Adds a value to its bucket.
+    cumulative
+        Returns (bound, count of values <= bound) for every bucket.
+    to_dict
+        Returns the histogram as a dictionary.
+    """
+    def __init__(self, bounds):
+        """
+        Parameters
+        ----------
+        bounds : tuple of floats
+            Upper bound of every bucket, in increasing order.
+        """
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        """Adds a value to its bucket."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Returns (bound, count of values <= bound) for every bucket, ending
+        with (float("inf"), count).
+        """
+        pairs, running = [], 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+    def to_dict(self):
+        """Returns the histogram as a dictionary."""
+        return {"bounds": list(self.bounds), "counts": list(self.counts),
+                "sum": self.total, "count": self.count}
+
+
+class Instrumentation:
+    """
+    Opt-in measurements of Board.update, Tiles.generate_legal_moves,
+    Tiles.display and CompAI.choose_move.
+
+    While enabled, those methods are replaced on their classes by wrappers
+    that record per-call latency histograms and counters of legal moves
+    generated, flip-set and frontier sizes, legal-move cache hits and search
+    nodes.
+    disable puts the original methods back, so a disabled game runs exactly
+    the code it runs without this module.
+
+    Attributes
+    ----------
+    histograms : dict
+        key: metric name.
+        value: instance of the Histogram class.
+    counters : dict
+        key: metric name.
+        value: int
+    enabled : Bool
+        Conditional for the methods being wrapped.
+    originals : list of tuples
+        (class, name, original attribute) of every wrapped method.
+
+    Methods
+    -------
+    enable
+        Wraps the measured methods.
+    disable
+        Restores the measured methods.
+    patch
+        Replaces a method of a class, remembering the original.
+    timed
+        Returns a wrapper of a method recording its latency.
+    to_json
+        Returns the metrics as a JSON string.
+    to_prometheus
+        Returns the metrics in the Prometheus text format.
+    dump
+        Writes the metrics to a file, as JSON or Prometheus text.
+    """
+    def __init__(self):
+        self.histograms = {
+            "board_update_seconds": Histogram(LATENCY_BUCKETS),
+            "generate_legal_moves_seconds": Histogram(LATENCY_BUCKETS),
+            "tiles_display_seconds": Histogram(LATENCY_BUCKETS),
+            "choose_move_seconds": Histogram(LATENCY_BUCKETS),
+            "flip_set_size": Histogram(SIZE_BUCKETS),
+            "frontier_size": Histogram(SIZE_BUCKETS),
+        }
+        self.counters = {
+            "legal_moves_generated": 0,
+            "legal_moves_cache_hits": 0,
+            "legal_moves_cache_misses": 0,
+            "search_nodes": 0,
+            "transposition_hits": 0,
+            "book_moves": 0,
+        }
+        self.enabled = False
+        self.originals = []
+
+    def enable(self):
+        """
+        Wraps the measured methods. Raises RuntimeError if another instance
+        is already enabled.
+        """
+        if self.enabled:
+            return
+        if _ACTIVE:
+            raise RuntimeError("Another Instrumentation is enabled.")
+        generate = vars(Tiles)["generate_legal_moves"]
+        choose = vars(CompAI)["choose_move"]
+        histograms, counters = self.histograms, self.counters
+
+        def generate_legal_moves(tiles):
+            hits = tiles.cache_hits
+            start = time()
+            generate(tiles)
+            histograms["generate_legal_moves_seconds"].observe(time() - start)
+            if tiles.cache_hits != hits:
+                counters["legal_moves_cache_hits"] += 1
+                return
+            counters["legal_moves_cache_misses"] += 1
+            counters["legal_moves_generated"] += len(tiles.legal_moves)
+            histograms["frontier_size"].observe(
+                tiles.position.frontier_size(tiles.place_black))
+            legal_moves = tiles.legal_moves
+            if isinstance(legal_moves, LazyFlips):
+                # Counted on the bitboards, so that measuring does not
+                # build the flip sets that lazy_flips skips.
+                sizes = legal_moves.flip_counts()
+            else:
+                sizes = [len(flips) for flips in legal_moves.values()]
+            for size in sizes:
+                histograms["flip_set_size"].observe(size)
+
+        def choose_move(ai):
+            count = len(ai.move_stats)
+            start = time()
+            move = choose(ai)
+            histograms["choose_move_seconds"].observe(time() - start)
+            for stats in ai.move_stats[count:]:
+                counters["search_nodes"] += stats.get("nodes", 0)
+                counters["transposition_hits"] += stats.get("tt_hits", 0)
+                if stats.get("book"):
+                    counters["book_moves"] += 1
+            return move
+
+        self.patch(Board, "update",
+                   self.timed(vars(Board)["update"], "board_update_seconds"))
+        self.patch(Tiles, "display",
+                   self.timed(vars(Tiles)["display"], "tiles_display_seconds"))
+        self.patch(Tiles, "generate_legal_moves", generate_legal_moves)
+        self.patch(CompAI, "choose_move", choose_move)
+        self.enabled = True
+        _ACTIVE.append(self)
+
+    def disable(self):
+        """Restores the measured methods. The metrics are kept."""
+        if not self.enabled:
+            return
+        for cls, name, original in reversed(self.originals):
+            setattr(cls, name, original)
+        self.originals = []
+        self.enabled = False
+        _ACTIVE.remove(self)
+
+    def patch(self, cls, name, wrapper):
+        """Replaces a method of a class, remembering the original."""
+        self.originals.append((cls, name, vars(cls)[name]))
+        wrapper.__name__ = name
+        wrapper.__doc__ = vars(cls)[name].__doc__
+        setattr(cls, name, wrapper)
+
+    def timed(self, method, metric):
+        """Returns a wrapper of a method recording its latency in metric."""
+        histogram = self.histograms[metric]
+
+        def wrapper(instance, *args, **kwargs):
+            start = time()
+            result = method(instance, *args, **kwargs)
+            histogram.observe(time() - start)
+            return result
+        return wrapper
+
+    def to_json(self):
+        """Returns the metrics as a JSON string."""
+        histograms = dict((name, histogram.to_dict())
+                          for name, histogram in self.histograms.items())
+        return json.dumps({"histograms": histograms,
+                           "counters": self.counters},
+                          indent=2, sort_keys=True)
+
+    def to_prometheus(self):
+        """Returns the metrics in the Prometheus text exposition format."""
+        lines = []
+        for name in sorted(self.counters):
+            metric = PREFIX + name + "_total"
+            lines.append("# TYPE {0} counter".format(metric))
+            lines.append("{0} {1}".format(metric, self.counters[name]))
+        for name in sorted(self.histograms):
+            histogram, metric = self.histograms[name], PREFIX + name
+            lines.append("# TYPE {0} histogram".format(metric))
+            for bound, count in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append('{0}_bucket{{le="{1}"}} {2}'.format(metric, le,
+                                                                 count))
+            lines.append("{0}_sum {1!r}".format(metric, histogram.total))
+            lines.append("{0}_count {1}".format(metric, histogram.count))
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path):
+        """
+        Writes the metrics to a file, as JSON if its name ends with .json and
+        as Prometheus text otherwise. The file is replaced in one step, so a
+        collector never reads it half written.
+        """
+        if path.endswith(".json"):
+            text = self.to_json()
+        else:
+            text = self.to_prometheus()
+        temporary = path + ".tmp"
+        with open(temporary, "w") as f:
+            f.write(text)
+        replace_file(temporary, path)
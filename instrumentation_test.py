@@ -0,0 +1,69 @@
+# Test for the Instrumentation and Histogram classes
+import json
+import pytest
+from instrumentation import Instrumentation, Histogram
+from simulator import Simulator
+from tiles import Tiles
+
+
+def test_histogram():
+    """Values land in the first bucket whose bound is not below them."""
+    histogram = Histogram((1, 2, 4))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    assert histogram.counts == [2, 0, 1, 1]
+    assert histogram.count == 4
+    assert histogram.total == 14.5
+    assert histogram.cumulative() == [(1, 2), (2, 2), (4, 3),
+                                      (float("inf"), 4)]
+
+
+def test_enable_disable():
+    """The methods are only wrapped while enabled."""
+    original = vars(Tiles)["generate_legal_moves"]
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    try:
+        assert vars(Tiles)["generate_legal_moves"] is not original
+        with pytest.raises(RuntimeError):
+            Instrumentation().enable()
+    finally:
+        instrumentation.disable()
+    assert vars(Tiles)["generate_legal_moves"] is original
+    instrumentation.disable()  # Disabling twice is harmless.
+
+
+def test_measurements(tmp_path):
+    """A game records latencies and counters, dumped as JSON or text."""
+    instrumentation = Instrumentation()
+    instrumentation.enable()
+    try:
+        board = Simulator(6).new_board()
+        board.update()
+        board.tiles.generate_legal_moves()
+        Simulator(6, "random", "negamax:0.01").play_game(seed=1)
+    finally:
+        instrumentation.disable()
+    counters, histograms = instrumentation.counters, instrumentation.histograms
+    assert histograms["board_update_seconds"].count == 1
+    assert counters["legal_moves_cache_hits"] >= 1
+    assert counters["legal_moves_generated"] > 0
+    assert (histograms["flip_set_size"].count ==
+            counters["legal_moves_generated"])
+    assert (histograms["frontier_size"].count ==
+            counters["legal_moves_cache_misses"])
+    assert counters["search_nodes"] > 0
+    assert histograms["choose_move_seconds"].count > 0
+
+    path = str(tmp_path / "metrics.json")
+    instrumentation.dump(path)
+    instrumentation.dump(path)  # Replaces the previous dump.
+    with open(path) as f:
+        assert json.load(f)["counters"] == counters
+    path = str(tmp_path / "metrics.prom")
+    instrumentation.dump(path)
+    with open(path) as f:
+        text = f.read()
+    assert "othello_search_nodes_total {0}\n".format(
+        counters["search_nodes"]) in text
+    assert 'othello_board_update_seconds_bucket{le="+Inf"} 1\n' in text
@@ -0,0 +1,250 @@
+# Creates an instance of the MCTS class, a Monte Carlo tree search with UCT
+# selection and random playouts on bitboards, used by the computer player.
+from array import array
+from math import log, sqrt
+from random import Random
+from time import time
+from position import bit_count, squares, legal_mask, flip_mask, get_masks
+
+# Move of a node reached by passing, and of the root.
+PASS = -1
+EXPLORATION = 1.4
+# Number of playouts between two checks of the clock.
+CHECK_INTERVAL = 16
+
+
+class MCTS:
+    """
+    Monte Carlo tree search with UCT selection.
+
+    Positions are passed as the bitboards of the player to move (own) and
+    the opponent (opp), and moves are returned as bit indices, as with the
+    Search class. Playouts play random moves on bare bitboards, without
+    Tiles or Tile objects.
+
+    Node statistics are kept in flat arrays indexed by node, the children of
+    a node being stored next to each other. A node is expanded, with all of
+    its children, on its first visit after the root's.
+
+    Attributes
+    ----------
+    TILES_DIMENS : int
+        Number of tiles per side of the square board.
+    masks : instance of the Masks class.
+        Precomputed masks for the board size.
+    exploration : float
+        Weight of the exploration term of UCT.
+    random : instance of the Random class.
+        Source of the playout moves, seeded for reproducible games.
+    visits : array of ints
+        Number of playouts through each node.
+    wins : array of floats
+        Playout results through each node, for the player who moved into
+        it: 1 per win and 0.5 per tie.
+    moves : array of ints
+        Square played into each node, PASS for a pass and the root.
+    first_child : array of ints
+        Index of the first child of each node, -1 until it is expanded.
+    child_count : array of ints
+        Number of children of each node.
+    owns : list of ints
+        Bitboard of the player to move at each node.
+    opps : list of ints
+        Bitboard of the opponent at each node.
+    cancelled : Bool
+        Conditional for stopping the current search early, set from another
+        thread. Stays set until cleared.
+    stats : dict
+        Statistics of the last call to choose_move.
+
+    Methods
+    -------
+    choose_move
+        Given a position and a budget of playouts or seconds, returns the
+        most visited move.
+    reset
+        Starts a new tree at a position.
+    add_node
+        Appends a node to the arrays.
+    expand
+        Adds the children of a node.
+    select
+        Returns the child of a node with the best UCT score.
+    playout
+        Plays random moves to the end of the game.
+    run
+        Runs one selection, expansion, playout and backpropagation.
+    playouts_per_second
+        Returns the speed of the last call to choose_move.
+    """
+    def __init__(self, TILES_DIMENS, exploration=EXPLORATION, seed=None):
+        """
+        Parameters
+        ----------
+        TILES_DIMENS : int
+            Number of tiles per side of the square board.
+        exploration : float (default 1.4)
+            Weight of the exploration term of UCT.
+        seed : int (default None)
+            Seed of the playouts, None for a random seed.
+        """
+        self.TILES_DIMENS = TILES_DIMENS
+        self.masks = get_masks(TILES_DIMENS)
+        self.exploration = exploration
+        self.random = Random(seed)
+        self.cancelled = False
+        self.stats = {}
+        self.reset(0, 0)
+
+    def reset(self, own, opp):
+        """Starts a new tree whose root is the given position."""
+        self.visits = array("i")
+        self.wins = array("d")
+        self.moves = array("i")
+        self.first_child = array("i")
+        self.child_count = array("i")
+        self.owns = []
+        self.opps = []
+        self.add_node(PASS, own, opp)
+
+    def add_node(self, move, own, opp):
+        """Appends a node to the arrays. Returns its index."""
+        self.visits.append(0)
+        self.wins.append(0.0)
+        self.moves.append(move)
+        self.first_child.append(-1)
+        self.child_count.append(0)
+        self.owns.append(own)
+        self.opps.append(opp)
+        return len(self.moves) - 1
+
+    def choose_move(self, own, opp, playouts=None, time_budget=None):
+        """
+        Given a position and a budget of playouts, of seconds, or both (the
+        first one reached stops the search), returns the most visited move.
+        Returns None without legal moves.
+        """
+        start = time()
+        deadline = float("inf")
+        if time_budget is not None:
+            deadline = start + time_budget
+        if playouts is None:
+            playouts = 1 << 62 if time_budget is not None else 1000
+        self.reset(own, opp)
+        moves = legal_mask(own, opp, self.masks)
+        done = 0
+        if moves:
+            self.expand(0)
+            while done < playouts and not self.cancelled:
+                if not done % CHECK_INTERVAL and time() > deadline:
+                    break
+                self.run()
+                done += 1
+        best_move, best_visits, win_rate = None, -1, 0.0
+        for child in range(self.first_child[0],
+                           self.first_child[0] + self.child_count[0]):
+            if self.visits[child] > best_visits:
+                best_move, best_visits = self.moves[child], self.visits[child]
+                win_rate = self.wins[child] / max(self.visits[child], 1)
+        self.stats = {"playouts": done, "elapsed": time() - start,
+                      "nodes": len(self.moves), "move": best_move,
+                      "win_rate": win_rate}
+        return best_move
+
+    def expand(self, node):
+        """
+        Adds the children of a node: one per legal move, a single PASS child
+        if only the opponent can move, and none at the end of the game.
+        """
+        own, opp, masks = self.owns[node], self.opps[node], self.masks
+        moves = legal_mask(own, opp, masks)
+        first = len(self.moves)
+        if moves:
+            for move in squares(moves):
+                flips = flip_mask(own, opp, move, masks)
+                self.add_node(move, opp ^ flips, own | flips | (1 << move))
+        elif legal_mask(opp, own, masks):
+            self.add_node(PASS, opp, own)
+        self.first_child[node] = first
+        self.child_count[node] = len(self.moves) - first
+
+    def select(self, node):
+        """
+        Returns the child of a node with the best UCT score, trying every
+        child once first.
+        """
+        visits, wins = self.visits, self.wins
+        first = self.first_child[node]
+        scale = self.exploration * sqrt(log(visits[node] or 1))
+        best, best_score = first, -1.0
+        for child in range(first, first + self.child_count[node]):
+            count = visits[child]
+            if not count:
+                return child
+            score = wins[child] / count + scale / sqrt(count)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def playout(self, own, opp):
+        """
+        Plays random moves from a position to the end of the game. Returns
+        the result for the player to move: 1 for a win, 0.5 for a tie and 0
+        for a loss.
+        """
+        masks, randrange = self.masks, self.random.randrange
+        to_move = 0  # Number of plies since the position, mod 2.
+        passed = False
+        while True:
+            moves = legal_mask(own, opp, masks)
+            if moves:
+                passed = False
+                choices = squares(moves)
+                move = choices[randrange(len(choices))]
+                flips = flip_mask(own, opp, move, masks)
+                own, opp = opp ^ flips, own | flips | (1 << move)
+            elif passed:
+                break  # Neither player can move.
+            else:
+                passed = True
+                own, opp = opp, own
+            to_move ^= 1
+        difference = bit_count(own) - bit_count(opp)
+        if to_move:
+            difference = -difference
+        if difference > 0:
+            return 1.0
+        if difference < 0:
+            return 0.0
+        return 0.5
+
+    def run(self):
+        """
+        Runs one playout: selects a path down the tree with UCT, expands its
+        last node if it was visited before, plays out from there and adds
+        the result to every node of the path.
+        """
+        first_child, child_count = self.first_child, self.child_count
+        path, node = [0], 0
+        while first_child[node] >= 0 and child_count[node]:
+            node = self.select(node)
+            path.append(node)
+        if first_child[node] < 0 and self.visits[node]:
+            self.expand(node)
+            if child_count[node]:
+                node = self.select(node)
+                path.append(node)
+        # The result for the player who moved into the last node.
+        result = 1.0 - self.playout(self.owns[node], self.opps[node])
+        visits, wins = self.visits, self.wins
+        for node in reversed(path):
+            visits[node] += 1
+            wins[node] += result
+            result = 1.0 - result
+
+    def playouts_per_second(self):
+        """Returns the speed of the last call to choose_move."""
+        elapsed = self.stats.get("elapsed", 0)
+        if not elapsed:
+            return 0
+        return float(self.stats["playouts"]) / elapsed
@@ -0,0 +1,67 @@
+# Test the MCTS class.
+from threading import Timer
+from mcts import MCTS, PASS
+from search_test import initial_sides
+
+
+def test_choose_move():
+    """The most visited move is legal and the statistics add up."""
+    mcts = MCTS(8, seed=1)
+    own, opp = initial_sides(8)
+    move = mcts.choose_move(own, opp, playouts=200)
+    assert move in (19, 26, 37, 44)
+    assert mcts.stats["playouts"] == 200
+    assert mcts.visits[0] == 200
+    first, count = mcts.first_child[0], mcts.child_count[0]
+    assert count == 4
+    assert sum(mcts.visits[first:first + count]) == 200
+    assert mcts.stats["nodes"] == len(mcts.visits) > 5
+    assert 0 <= mcts.stats["win_rate"] <= 1
+    assert mcts.playouts_per_second() > 0
+
+
+def test_choose_move_no_moves():
+    """Without legal moves there is nothing to choose."""
+    mcts = MCTS(4)
+    assert mcts.choose_move(1, 0, playouts=10) is None
+    assert mcts.stats["playouts"] == 0
+
+
+def test_time_budget():
+    """Playouts stop once the time budget has been spent."""
+    mcts = MCTS(8, seed=2)
+    own, opp = initial_sides(8)
+    assert mcts.choose_move(own, opp, time_budget=0.1) in (19, 26, 37, 44)
+    assert 0 < mcts.stats["playouts"]
+    assert mcts.stats["elapsed"] < 1
+
+
+def test_cancel():
+    """Another thread can stop a long search."""
+    mcts = MCTS(8, seed=3)
+    own, opp = initial_sides(8)
+    timer = Timer(0.1, setattr, (mcts, "cancelled", True))
+    timer.start()
+    assert mcts.choose_move(own, opp, time_budget=30) in (19, 26, 37, 44)
+    assert mcts.stats["elapsed"] < 5
+
+
+def test_finds_win():
+    """The only winning move of a solved 6x6 endgame is chosen."""
+    mcts = MCTS(6, seed=0)
+    assert mcts.choose_move(0x10fac1078, 0xc5051e782, playouts=2000) == 0
+
+
+def test_playout_and_pass():
+    """Finished games are scored, and a forced pass becomes a PASS child."""
+    mcts = MCTS(4, seed=4)
+    assert mcts.playout(0b0111, 0b1000) == 1.0
+    assert mcts.playout(0b0001, 0b1110) == 0.0
+    assert mcts.playout(0b11, 0b1100) == 0.5
+    # White on (0, 1) has nothing to flank black on (0, 0): white passes.
+    mcts.reset(0b10, 0b01)
+    mcts.expand(0)
+    child = mcts.first_child[0]
+    assert mcts.child_count[0] == 1
+    assert mcts.moves[child] == PASS
+    assert (mcts.owns[child], mcts.opps[child]) == (0b01, 0b10)
@@ -0,0 +1,166 @@
+# Creates an instance of the OpeningBook class, a sorted table of precomputed
+# opening moves read through mmap. Build a book from the command line:
+#     python opening_book.py --plies 6 --depth 4 --out book.bin
+import mmap
+import struct
+from argparse import ArgumentParser
+from time import time
+from position import squares, legal_mask, flip_mask, get_zobrist_keys
+from search import Search
+from tiles import Tiles
+
+MAGIC = b"OTHB"
+VERSION = 1
+# Header: magic, version, TILES_DIMENS, number of entries.
+HEADER = struct.Struct("<4sBBI")
+# Entry: Zobrist key, move (bit index), score for the player to move.
+ENTRY = struct.Struct("<qHh")
+SCORE_LIMIT = (1 << 15) - 1
+
+
+class OpeningBook:
+    """
+    Read-only opening book. Entries are sorted by Zobrist key and found by
+    binary search on the memory-mapped file, so opening a book does not
+    read it into memory.
+
+    Attributes
+    ----------
+    path : str
+        Name of the book file.
+    TILES_DIMENS : int
+        Number of tiles per side of the board the book was built for.
+    count : int
+        Number of entries in the book.
+    lookups : int
+        Counter of calls to lookup.
+    hits : int
+        Counter of lookups that found their key.
+
+    Methods
+    -------
+    lookup
+        Given a Zobrist key, returns the stored (move, score) or None.
+    close
+        Closes the memory map and the file.
+    """
+    def __init__(self, path):
+        """
+        Parameters
+        ----------
+        path : str
+            Name of the book file.
+        """
+        self.path = path
+        self.file = open(path, "rb")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, dimens, count = HEADER.unpack_from(self.data, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(path + " is not an opening book.")
+        self.TILES_DIMENS = dimens
+        self.count = count
+        self.lookups = 0
+        self.hits = 0
+
+    def lookup(self, key):
+        """Given a Zobrist key, returns the stored (move, score) or None."""
+        self.lookups += 1
+        data, unpack = self.data, ENTRY.unpack_from
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            entry = unpack(data, HEADER.size + middle * ENTRY.size)
+            if entry[0] < key:
+                low = middle + 1
+            elif entry[0] > key:
+                high = middle
+            else:
+                self.hits += 1
+                return entry[1], entry[2]
+        return None
+
+    def close(self):
+        """Closes the memory map and the file."""
+        self.data.close()
+        self.file.close()
+
+
+def opening_positions(TILES_DIMENS, plies):
+    """
+    Returns a dictionary of every position reachable from the initial tiles
+    in fewer than plies moves, keyed by Zobrist hash. Values are
+    (own, opp, black) for the player to move. Positions where the player to
+    move has to pass are left out.
+    """
+    tiles = Tiles(TILES_DIMENS, TILES_DIMENS, 1, TILES_DIMENS)
+    tiles.initial_tiles(False)
+    masks, keys = tiles.position.masks, get_zobrist_keys(TILES_DIMENS)
+    black, white = tiles.position.black, tiles.position.white
+    frontier = {keys.hash(black, white, True): (black, white, True)}
+    positions = {}
+    for _ in range(plies):
+        following = {}
+        for key, (own, opp, is_black) in frontier.items():
+            moves = legal_mask(own, opp, masks)
+            if not moves:
+                continue
+            positions[key] = (own, opp, is_black)
+            for move in squares(moves):
+                flips = flip_mask(own, opp, move, masks)
+                child_own = opp ^ flips
+                child_opp = own | flips | (1 << move)
+                child_black = not is_black
+                if not legal_mask(child_own, child_opp, masks):
+                    if not legal_mask(child_opp, child_own, masks):
+                        continue  # Game over.
+                    child_own, child_opp = child_opp, child_own  # Pass.
+                    child_black = is_black
+                if child_black:
+                    child_key = keys.hash(child_own, child_opp, True)
+                else:
+                    child_key = keys.hash(child_opp, child_own, False)
+                following[child_key] = (child_own, child_opp, child_black)
+        frontier = following
+    return positions
+
+
+def build_book(path, TILES_DIMENS=8, plies=6, depth=4):
+    """
+    Searches every opening position up to plies moves deep to the given
+    depth and writes the best moves to a book file. Returns the number of
+    entries written.
+    """
+    search = Search(TILES_DIMENS)
+    entries = []
+    for key, (own, opp, black) in opening_positions(TILES_DIMENS,
+                                                    plies).items():
+        move = search.choose_move(own, opp, float("inf"), depth, black, key)
+        score = max(-SCORE_LIMIT, min(SCORE_LIMIT, search.stats["score"]))
+        entries.append((key, move, score))
+    entries.sort()
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, TILES_DIMENS, len(entries)))
+        for entry in entries:
+            f.write(ENTRY.pack(*entry))
+    return len(entries)
+
+
+def main(argv=None):
+    """Parses the command line and builds an opening book."""
+    parser = ArgumentParser(description="Build an Othello opening book.")
+    parser.add_argument("--out", default="book.bin")
+    parser.add_argument("--dimens", type=int, default=8)
+    parser.add_argument("--plies", type=int, default=6,
+                        help="number of opening moves covered")
+    parser.add_argument("--depth", type=int, default=4,
+                        help="search depth of each book move")
+    args = parser.parse_args(argv)
+    start = time()
+    count = build_book(args.out, args.dimens, args.plies, args.depth)
+    print("{0} entries written to {1} in {2:.1f}s".format(
+        count, args.out, time() - start))
+
+
+if __name__ == "__main__":
+    main()
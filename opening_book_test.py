@@ -0,0 +1,37 @@
+# Test the OpeningBook class and the book builder.
+from opening_book import OpeningBook, build_book, opening_positions
+from position import legal_mask, get_masks
+
+
+def test_opening_positions():
+    """Every position up to the given number of moves is found."""
+    assert len(opening_positions(8, 1)) == 1
+    assert len(opening_positions(8, 2)) == 1 + 4
+    assert len(opening_positions(8, 3)) == 1 + 4 + 12
+
+
+def test_build_and_lookup(tmp_path):
+    """Every built position can be looked up, with a legal move."""
+    path = str(tmp_path / "book.bin")
+    assert build_book(path, 6, 3, 2) == len(opening_positions(6, 3))
+    book = OpeningBook(path)
+    assert book.TILES_DIMENS == 6
+    assert book.count == len(opening_positions(6, 3))
+    masks = get_masks(6)
+    for key, (own, opp, black) in opening_positions(6, 3).items():
+        move, score = book.lookup(key)
+        assert legal_mask(own, opp, masks) >> move & 1
+    assert book.lookup(12345) is None
+    assert (book.lookups, book.hits) == (book.count + 1, book.count)
+    book.close()
+
+
+def test_not_a_book(tmp_path):
+    """Other files are rejected."""
+    path = tmp_path / "scores.txt"
+    path.write_bytes(b"Andy 42\n" * 4)
+    try:
+        OpeningBook(str(path))
+    except ValueError:
+        return
+    assert False
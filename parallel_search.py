@@ -0,0 +1,254 @@
+# Creates an instance of the ParallelSearch class, which splits the root moves
+# of a negamax search across worker processes.
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Event
+from time import time
+from position import squares, legal_mask, flip_mask, get_masks
+from search import Search, SearchTimeout, INFINITY, WIN_SCALE
+from transposition import TranspositionTable
+
+# One Search per (board size, table bytes, table policy) in each process, so
+# that its transposition table is only allocated once.
+_SEARCHES = {}
+# Cancel event of the pool, in each worker process.
+_CANCEL = None
+
+
+def init_worker(cancel):
+    """Keeps the cancel event of the pool. Runs once per worker process."""
+    global _CANCEL
+    _CANCEL = cancel
+
+
+def search_subtree(task, cancel=None):
+    """
+    Given a task (TILES_DIMENS, own, opp, depth, black, key, deadline,
+    table_bytes, table_policy, alpha, beta), searches the position with the
+    window (alpha, beta). Returns its score and node count, with a score of
+    None if the deadline passed or cancel, an Event, was set first (by
+    default the cancel event of the pool). Runs in a worker process, or in
+    this one for the searches of search_root that are not split.
+
+    The transposition table is cleared first, so the score does not depend
+    on which tasks the worker searched before.
+    """
+    (dimens, own, opp, depth, black, key, deadline, table_bytes,
+     table_policy, alpha, beta) = task
+    if cancel is None:
+        cancel = _CANCEL
+    if cancel is not None and cancel.is_set():
+        return None, 0  # Queued before a cancel.
+    cache_key = (dimens, table_bytes, table_policy)
+    search = _SEARCHES.get(cache_key)
+    if search is None:
+        table = None
+        if table_bytes:
+            table = TranspositionTable(table_bytes, table_policy)
+        search = _SEARCHES[cache_key] = Search(dimens, table=table)
+    if search.table is not None:
+        search.table.clear()
+    search.deadline = deadline
+    search.cancel_event = cancel
+    search.nodes = 0
+    try:
+        score = search.negamax(own, opp, depth, alpha, beta, black, key)
+    except SearchTimeout:
+        score = None
+    return score, search.nodes
+
+
+class ParallelSearch:
+    """
+    Iterative deepening search that splits the root moves across worker
+    processes.
+
+    The first root move is searched in this process with a full window.
+    The other moves are then searched on the workers with a null window
+    around its score, which only shows whether they are better, and those
+    that are get searched again here for their exact score. Every task
+    starts from a cleared transposition table, so the score, and the move
+    chosen, do not depend on the number of workers or the order in which
+    they finish. Ties go to the move searched first.
+
+    The first move is searched alone, before any task reaches the pool, so
+    the speedup over one worker stays below the number of workers, all the
+    more when the first move is a large share of the iteration.
+
+    Attributes
+    ----------
+    TILES_DIMENS : int
+        Number of tiles per side of the square board.
+    masks : instance of the Masks class.
+        Precomputed masks for the board size.
+    workers : int
+        Number of worker processes. 1 searches in this process.
+    table_bytes : int
+        Memory cap of the transposition table of each worker.
+    table_policy : str
+        Replacement policy of the transposition table of each worker.
+    max_depth : int
+        Deepest iteration of the iterative deepening.
+    executor : instance of ProcessPoolExecutor, or None.
+        Worker pool, started on the first parallel search.
+    search : instance of the Search class.
+        Computes the Zobrist keys of the root moves.
+    cancel_event : instance of multiprocessing's Event.
+        Shared with the workers, which stop searching once it is set.
+    cancelled : Bool
+        Conditional for stopping the current search early, set from another
+        thread. Sets or clears cancel_event, so it also stops the searches
+        running on the workers. Stays set until cleared.
+    stats : dict
+        Statistics of the last completed call to choose_move.
+
+    Methods
+    -------
+    choose_move
+        Given a position and a time budget (in seconds), returns the best
+        move found by iterative deepening.
+    search_root
+        Searches every root move to the given depth. Returns the best move
+        and its score.
+    nodes_per_second
+        Returns the search speed of the last call to choose_move.
+    close
+        Shuts the worker pool down.
+    """
+    def __init__(self, TILES_DIMENS, workers=2, table_bytes=1 << 22,
+                 table_policy="depth", max_depth=60):
+        """
+        Parameters
+        ----------
+        TILES_DIMENS : int
+            Number of tiles per side of the square board.
+        workers : int (default 2)
+            Number of worker processes.
+        table_bytes : int (default 4 MiB)
+            Memory cap of the transposition table of each worker.
+        table_policy : str (default depth)
+            Replacement policy of the transposition table of each worker.
+        max_depth : int (default 60)
+            Deepest iteration of the iterative deepening.
+        """
+        self.TILES_DIMENS = TILES_DIMENS
+        self.masks = get_masks(TILES_DIMENS)
+        self.workers = workers
+        self.table_bytes = table_bytes
+        self.table_policy = table_policy
+        self.max_depth = max_depth
+        self.executor = None
+        self.search = Search(TILES_DIMENS)
+        self.cancel_event = Event()
+        self.stats = {}
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    @cancelled.setter
+    def cancelled(self, cancelled):
+        if cancelled:
+            self.cancel_event.set()
+        else:
+            self.cancel_event.clear()
+
+    def choose_move(self, own, opp, time_budget, max_depth=None,
+                    black=True, key=None):
+        """
+        Given a position and a time budget (in seconds), returns the best
+        move found by iterative deepening. Returns None without legal moves.
+        """
+        if max_depth is None:
+            max_depth = self.max_depth
+        if key is None:
+            if black:
+                key = self.search.keys.hash(own, opp, True)
+            else:
+                key = self.search.keys.hash(opp, own, False)
+        start = time()
+        deadline = start + time_budget
+        moves = squares(legal_mask(own, opp, self.masks))
+        best_move, best_score, depth_reached, nodes = None, 0, 0, 0
+        if moves:
+            best_move = moves[0]
+        else:
+            max_depth = 0
+        for depth in range(1, max_depth + 1):
+            if self.cancelled:
+                break
+            move, score, depth_nodes = self.search_root(own, opp, moves,
+                                                        depth, black, key,
+                                                        deadline)
+            nodes += depth_nodes
+            if move is None:
+                break  # The deadline passed before every move was searched.
+            best_move, best_score, depth_reached = move, score, depth
+            # Search the previous best move first at the next depth.
+            moves.remove(best_move)
+            moves.insert(0, best_move)
+            if abs(best_score) >= WIN_SCALE or len(moves) < 2:
+                break  # Result is exact or there is no choice to make.
+        self.stats = {"nodes": nodes, "elapsed": time() - start,
+                      "depth": depth_reached, "score": best_score,
+                      "move": best_move, "workers": self.workers}
+        return best_move
+
+    def search_root(self, own, opp, moves, depth, black, key, deadline):
+        """
+        Searches every root move to the given depth: the first one here, the
+        others on the workers with a null window. Returns the best move, its
+        score and the nodes visited, with a move of None if the deadline
+        passed first.
+        """
+        tasks = []
+        for move in moves:
+            flips = flip_mask(own, opp, move, self.masks)
+            tasks.append((self.TILES_DIMENS, opp ^ flips,
+                          own | flips | (1 << move), depth - 1, not black,
+                          self.search.child_key(key, move, flips, black),
+                          deadline, self.table_bytes, self.table_policy))
+        cancel = self.cancel_event
+        score, nodes = search_subtree(tasks[0] + (-INFINITY, INFINITY),
+                                      cancel)
+        if score is None:
+            return None, None, nodes
+        best_move, alpha = moves[0], -score
+        # Each task only has to show whether its move beats alpha.
+        tasks = [task + (-alpha - 1, -alpha) for task in tasks[1:]]
+        if self.workers == 1:
+            results = [search_subtree(task, cancel) for task in tasks]
+        else:
+            if self.executor is None:
+                self.executor = ProcessPoolExecutor(
+                    self.workers, initializer=init_worker,
+                    initargs=(cancel,))
+            results = list(self.executor.map(search_subtree, tasks))
+        nodes += sum(task_nodes for _, task_nodes in results)
+        if any(score is None for score, _ in results):
+            return None, None, nodes
+        for move, task, (score, _) in zip(moves[1:], tasks, results):
+            if -score <= alpha:
+                continue
+            # Better than the first move: search again for the exact score,
+            # against the best score so far.
+            score, task_nodes = search_subtree(
+                task[:-2] + (-INFINITY, -alpha), cancel)
+            nodes += task_nodes
+            if score is None:
+                return None, None, nodes
+            if -score > alpha:
+                best_move, alpha = move, -score
+        return best_move, alpha, nodes
+
+    def nodes_per_second(self):
+        """Returns the search speed of the last call to choose_move."""
+        elapsed = self.stats.get("elapsed", 0)
+        if not elapsed:
+            return 0
+        return float(self.stats["nodes"]) / elapsed
+
+    def close(self):
+        """Shuts the worker pool down."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
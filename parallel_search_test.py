@@ -0,0 +1,110 @@
+# Test the ParallelSearch class.
+from multiprocessing import Event
+from threading import Thread
+from time import sleep, time
+import parallel_search
+from benchmark import initial_position, sample_positions
+from parallel_search import ParallelSearch, search_subtree
+from position import squares, legal_mask, flip_mask
+from search import Search, INFINITY
+
+
+def test_search_subtree():
+    """A subtree search matches the sequential negamax."""
+    own, opp = initial_position(6)
+    score, nodes = search_subtree((6, own, opp, 3, True, None, 1e18, 0,
+                                   "depth", -INFINITY, INFINITY))
+    assert score == Search(6).negamax(own, opp, 3, -INFINITY, INFINITY)
+    assert nodes > 0
+    # A null window below the score fails high, one above it fails low.
+    assert search_subtree((6, own, opp, 3, True, None, 1e18, 0, "depth",
+                           score - 1, score))[0] >= score
+    assert search_subtree((6, own, opp, 3, True, None, 1e18, 0, "depth",
+                           score, score + 1))[0] <= score
+    assert search_subtree((6, own, opp, 30, True, None, 0, 0, "depth",
+                           -INFINITY, INFINITY))[0] is None  # Deadline passed.
+    cancel = Event()
+    cancel.set()
+    assert search_subtree((6, own, opp, 3, True, None, 1e18, 0, "depth",
+                           -INFINITY, INFINITY), cancel) == (None, 0)
+
+
+def test_matches_sequential_search():
+    """The parallel search finds the sequential score at a fixed depth."""
+    own, opp = sample_positions(6, 18, 1, seed=1)[0]
+    sequential = Search(6)
+    sequential.choose_move(own, opp, 60, max_depth=4)
+    parallel = ParallelSearch(6, workers=1)
+    parallel.choose_move(own, opp, 60, max_depth=4)
+    assert parallel.stats["score"] == sequential.stats["score"]
+    assert parallel.stats["depth"] == 4
+    assert parallel.nodes_per_second() > 0
+
+
+def test_null_window_prunes():
+    """Bounding the other root moves by the first one saves nodes."""
+    own, opp = sample_positions(8, 30, 1, seed=2)[0]
+    parallel = ParallelSearch(8, workers=1, table_bytes=0)
+    moves = squares(legal_mask(own, opp, parallel.masks))
+    key = parallel.search.keys.hash(own, opp, True)
+    move, score, nodes = parallel.search_root(own, opp, moves, 5, True, key,
+                                              1e18)
+    full_scores, full_nodes = [], 0
+    for root_move in moves:
+        flips = flip_mask(own, opp, root_move, parallel.masks)
+        child_score, child_nodes = search_subtree((
+            8, opp ^ flips, own | flips | (1 << root_move), 4, False, None,
+            1e18, 0, "depth", -INFINITY, INFINITY))
+        full_scores.append(-child_score)
+        full_nodes += child_nodes
+    assert score == max(full_scores)
+    assert move == moves[full_scores.index(score)]
+    assert nodes < full_nodes
+
+
+def test_cancel_stops_workers():
+    """A cancel stops the searches already running on the workers."""
+    own, opp = sample_positions(8, 20, 1, seed=2)[0]
+    parallel = ParallelSearch(8, workers=2)
+    moves = squares(legal_mask(own, opp, parallel.masks))
+    moves.remove(15)
+    moves.insert(0, 15)  # Quickest first move, so the pool starts soon.
+    key = parallel.search.keys.hash(own, opp, True)
+    results = []
+    thread = Thread(target=lambda: results.append(parallel.search_root(
+        own, opp, moves, 9, True, key, float("inf"))))
+    thread.start()
+    deadline = time() + 30
+    while parallel.executor is None and time() < deadline:
+        sleep(0.01)
+    start = time()
+    parallel.cancelled = True
+    thread.join()
+    assert time() - start < 1
+    assert results[0][0] is None
+    parallel.close()
+
+
+def test_search_cache_per_table():
+    """Tasks with other table settings get their own Search."""
+    own, opp = initial_position(6)
+    task = (6, own, opp, 2, True, None, 1e18, 0, "depth", -INFINITY,
+            INFINITY)
+    search_subtree(task)
+    search_subtree(task[:7] + (1 << 16, "depth") + task[9:])
+    assert parallel_search._SEARCHES[(6, 0, "depth")].table is None
+    assert parallel_search._SEARCHES[(6, 1 << 16, "depth")].table is not None
+
+
+def test_deterministic_across_workers():
+    """The chosen move does not depend on the number of workers."""
+    own, opp = sample_positions(8, 40, 1, seed=2)[0]
+    results = []
+    for workers in (1, 2):
+        parallel = ParallelSearch(8, workers=workers)
+        move = parallel.choose_move(own, opp, 60, max_depth=3)
+        results.append((move, parallel.stats["score"],
+                        parallel.stats["nodes"]))
+        parallel.close()
+        assert parallel.executor is None
+    assert results[0] == results[1]
@@ -0,0 +1,222 @@
+# Perft (leaf node counts) for move generation, run from the command line:
+#     python perft.py                  checks counts and throughput
+#     python perft.py --record         stores the throughput baseline
+# A pass counts as a move, and a finished game counts as one leaf.
+import json
+import os
+import sys
+from argparse import ArgumentParser
+from time import time
+from position import squares, legal_mask, flip_mask, get_masks
+from tiles import Tiles
+
+# Leaf counts from the initial position, indexed by depth - 1.
+KNOWN_COUNTS = {
+    4: [4, 12, 44, 128, 424, 1256, 3624, 9116, 20044, 36540, 50704, 57436,
+        59564, 59980],
+    6: [4, 12, 56, 244, 1364, 7604, 47740, 308716, 2114912],
+    8: [4, 12, 56, 244, 1396, 8200, 55092, 390216, 3005288],
+}
+# Depth of each benchmark run, per engine and board size. The lane scan is
+# much slower, so it is run less deep.
+DEPTHS = {
+    "bitboard": {4: 11, 6: 8, 8: 8},
+    "tiles": {4: 9, 6: 7, 8: 7},
+    "lanes": {4: 8, 6: 6, 8: 6},
+}
+ENGINES = ("bitboard", "tiles", "lanes")
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "perft_baseline.json")
+# Fraction of the baseline throughput below which a run fails.
+TOLERANCE = 0.7
+# Runs per benchmark; the median throughput is kept, as single runs are
+# noisy.
+REPEAT = 3
+LANES = ("row", "column", "tl_diag", "tr_diag")
+
+
+def perft(own, opp, depth, masks):
+    """
+    Given the bitboards of the player to move and of the opponent, returns
+    the number of leaf nodes depth moves ahead.
+    """
+    if depth == 0:
+        return 1
+    moves = legal_mask(own, opp, masks)
+    if not moves:
+        if not legal_mask(opp, own, masks):
+            return 1  # Game over.
+        return perft(opp, own, depth - 1, masks)  # Pass.
+    if depth == 1:
+        return bin(moves).count("1")
+    nodes = 0
+    for move in squares(moves):
+        flips = flip_mask(own, opp, move, masks)
+        nodes += perft(opp ^ flips, own | flips | (1 << move), depth - 1,
+                       masks)
+    return nodes
+
+
+def lane_moves(tiles):
+    """
+    Returns the legal moves of the player to move as a dictionary like
+    Tiles.legal_moves, scanning the empty tiles next to an opponent tile
+    (the frontier of the position) with check_each_lane.
+    """
+    moves = {}
+    position = tiles.position
+    for row, col in position.coordinates(position.frontier(tiles.place_black)):
+        tile = tiles.all_tiles[row][col]
+        tiles.flip_set = set()
+        for lane in LANES:
+            tiles.check_each_lane(tile, row, col, lane)
+        if tiles.flip_set:
+            moves[(row, col)] = tiles.flip_set
+    return moves
+
+
+def tiles_moves(tiles):
+    """Returns Tiles.legal_moves after calling generate_legal_moves."""
+    tiles.generate_legal_moves()
+    return tiles.legal_moves
+
+
+def tiles_perft(tiles, depth, generate=tiles_moves):
+    """
+    Given a Tiles instance, returns the number of leaf nodes depth moves
+    ahead of its position, playing the moves in place on the tiles.
+    generate returns the legal moves of the player to move.
+    """
+    if depth == 0:
+        return 1
+    moves = generate(tiles)
+    if not moves:
+        tiles.place_black = not tiles.place_black
+        if generate(tiles):
+            nodes = tiles_perft(tiles, depth - 1, generate)  # Pass.
+        else:
+            nodes = 1  # Game over.
+        tiles.place_black = not tiles.place_black
+        return nodes
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for row, col in list(moves):
+        tiles.make_move(row, col)
+        nodes += tiles_perft(tiles, depth - 1, generate)
+        tiles.unmake_move()
+    return nodes
+
+
+def run(engine, TILES_DIMENS, depth):
+    """
+    Counts the leaf nodes depth moves from the initial position with the
+    given engine. Returns a dict of nodes, elapsed and nodes_per_second.
+    """
+    # check_tile reads coordinates back from pixel positions, so the tiles
+    # need a real spacing.
+    tiles = Tiles(TILES_DIMENS * 100, TILES_DIMENS * 100, 100, TILES_DIMENS)
+    tiles.initial_tiles(False)
+    start = time()
+    if engine == "bitboard":
+        own, opp = tiles.position.sides(True)
+        nodes = perft(own, opp, depth, get_masks(TILES_DIMENS))
+    elif engine == "tiles":
+        nodes = tiles_perft(tiles, depth)
+    elif engine == "lanes":
+        nodes = tiles_perft(tiles, depth, lane_moves)
+    else:
+        raise ValueError("Unknown perft engine: " + engine)
+    elapsed = time() - start
+    return {"nodes": nodes, "elapsed": elapsed,
+            "nodes_per_second": nodes / elapsed if elapsed else 0.0}
+
+
+def measure(engines=ENGINES, sizes=None, repeat=REPEAT, report=None):
+    """
+    Runs every engine on every board size (by default all of KNOWN_COUNTS)
+    repeat times. Returns a dict keyed by "engine/dimens/depth" of the run
+    with the median throughput. Calls report(name, result) after each
+    benchmark if given.
+    """
+    results = {}
+    for engine in engines:
+        for dimens in sizes or sorted(KNOWN_COUNTS):
+            depth = DEPTHS[engine][dimens]
+            name = "{0}/{1}/{2}".format(engine, dimens, depth)
+            runs = sorted((run(engine, dimens, depth)
+                           for _ in range(max(repeat, 1))),
+                          key=lambda result: result["nodes_per_second"])
+            results[name] = runs[len(runs) // 2]
+            if report:
+                report(name, results[name])
+    return results
+
+
+def print_result(name, result):
+    """Prints the result of one benchmark."""
+    print("{0:20s} {1:10d} nodes {2:7.2f}s {3:10.0f} nodes/s".format(
+        name, result["nodes"], result["elapsed"],
+        result["nodes_per_second"]))
+
+
+def check(results, baseline, tolerance=TOLERANCE):
+    """
+    Given results and baseline as dicts keyed by "engine/dimens/depth",
+    returns a list of messages, one per wrong count or per throughput below
+    tolerance times the baseline.
+    """
+    failures = []
+    for name, result in sorted(results.items()):
+        engine, dimens, depth = name.split("/")
+        known = KNOWN_COUNTS[int(dimens)]
+        if int(depth) <= len(known) and result["nodes"] != known[
+                int(depth) - 1]:
+            failures.append("{0}: {1} nodes, expected {2}".format(
+                name, result["nodes"], known[int(depth) - 1]))
+        if name in baseline:
+            floor = tolerance * baseline[name]["nodes_per_second"]
+            if result["nodes_per_second"] < floor:
+                failures.append("{0}: {1:.0f} nodes/s, baseline {2:.0f}"
+                                .format(name, result["nodes_per_second"],
+                                        baseline[name]["nodes_per_second"]))
+    return failures
+
+
+def main(argv=None):
+    """
+    Parses the command line, runs perft and checks or records the results.
+    Returns the exit status: 1 if a count is wrong or throughput regressed.
+    """
+    parser = ArgumentParser(description="Othello perft benchmark.")
+    parser.add_argument("--engine", choices=ENGINES, action="append",
+                        help="engine to run; repeat (default: all)")
+    parser.add_argument("--dimens", type=int, choices=sorted(KNOWN_COUNTS),
+                        action="append", help="board size; repeat")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--record", action="store_true",
+                        help="store the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--repeat", type=int, default=REPEAT,
+                        help="runs per benchmark, keeping the median")
+    args = parser.parse_args(argv)
+
+    results = measure(args.engine or ENGINES, args.dimens, args.repeat,
+                      print_result)
+    if args.record:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        return 0
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except IOError:
+        baseline = {}
+    failures = check(results, baseline, args.tolerance)
+    for failure in failures:
+        print("FAIL " + failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+# Test for the perft benchmark
+import json
+import os
+import pytest
+from perft import BASELINE, KNOWN_COUNTS, run, measure, check, main
+
+
+def test_known_counts():
+    """Every engine agrees with the known leaf counts."""
+    for dimens in (4, 6, 8):
+        for engine, depth in (("bitboard", 6), ("tiles", 5), ("lanes", 4)):
+            assert (run(engine, dimens, depth)["nodes"] ==
+                    KNOWN_COUNTS[dimens][depth - 1])
+
+
+def test_game_over():
+    """Finished 4x4 games are counted as leaves."""
+    assert run("bitboard", 4, 14)["nodes"] == KNOWN_COUNTS[4][13]
+
+
+def test_check():
+    """Wrong counts and slow runs are reported."""
+    results = {"bitboard/8/3": {"nodes": 56, "nodes_per_second": 100.0},
+               "tiles/8/3": {"nodes": 57, "nodes_per_second": 100.0}}
+    baseline = {"bitboard/8/3": {"nodes": 56, "nodes_per_second": 200.0}}
+    failures = check(results, baseline, 0.7)
+    assert len(failures) == 2
+    assert failures[0].startswith("bitboard/8/3")
+    assert failures[1].startswith("tiles/8/3")
+    assert check(results, baseline, 0.5) == failures[1:]
+
+
+def test_main(tmp_path):
+    """main records a baseline and passes against it."""
+    baseline = str(tmp_path / "baseline.json")
+    argv = ["--engine", "bitboard", "--dimens", "4", "--baseline", baseline,
+            "--repeat", "1"]
+    assert main(argv + ["--record"]) == 0
+    assert main(argv + ["--tolerance", "0"]) == 0
+
+
+def test_measure():
+    """The median of the repeated runs is kept."""
+    results = measure(["bitboard"], [4], repeat=3)
+    assert list(results) == ["bitboard/4/11"]
+    assert results["bitboard/4/11"]["nodes"] == KNOWN_COUNTS[4][10]
+
+
+@pytest.mark.skipif(not os.environ.get("PERFT_GATE"),
+                    reason="machine dependent, set PERFT_GATE=1 to run")
+def test_throughput_baseline():
+    """Every engine keeps up with perft_baseline.json."""
+    with open(BASELINE) as f:
+        baseline = json.load(f)
+    assert check(measure(), baseline) == []
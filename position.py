@@ -0,0 +1,522 @@
+# Creates an instance of the Position class that stores the discs of each
+# player as integer bitboards, with shift-and-mask move generation. Python
+# integers have no fixed width, so the same code handles boards of any size.
+
+# Smallest board on which Kogge-Stone fills beat one shift per step.
+KOGGE_STONE_DIMENS = 8
+# Indices of the colors in Position.adjacent and Position.frontiers.
+BLACK = 0
+WHITE = 1
+
+
+def bit_count(bits):
+    """Given a bitboard, returns the number of set bits."""
+    return bin(bits).count("1")
+
+
+def squares(bits):
+    """Given a bitboard, returns a list of the indices of its set bits."""
+    indices = []
+    while bits:
+        low = bits & -bits
+        indices.append(low.bit_length() - 1)
+        bits ^= low
+    return indices
+
+
+class Masks:
+    """
+    Precomputed masks for a square board of a given size.
+
+    Bit (row * TILES_DIMENS + col) of a bitboard represents the tile at
+    index-coordinates (row, col).
+
+    Attributes
+    ----------
+    TILES_DIMENS : int
+        Number of tiles per side of the square board.
+    full : int
+        Bitboard with every square of the board set.
+    left_shifts : list of tuples
+        (shift, mask) pairs for the directions reached by a left shift.
+    right_shifts : list of tuples
+        (shift, mask) pairs for the directions reached by a right shift.
+    steps : int
+        Number of extra propagation steps needed to cross the longest run
+        of opponent tiles.
+    rounds : int
+        Number of doubling rounds of a Kogge-Stone fill before its last
+        shift, enough to cross the longest run of opponent tiles.
+    kogge_stone : Bool
+        Conditional for generating moves with Kogge-Stone fills, which take
+        O(log n) shifts per direction instead of O(n).
+    neighbours : list of lists
+        Squares around each square, up to eight.
+    """
+    def __init__(self, TILES_DIMENS):
+        """
+        Parameters
+        ----------
+        TILES_DIMENS : int
+            Number of tiles per side of the square board.
+        """
+        n = TILES_DIMENS
+        self.TILES_DIMENS = n
+        self.full = (1 << (n * n)) - 1
+        first_col, last_col = 0, 0
+        for row in range(n):
+            first_col |= 1 << (row * n)
+            last_col |= 1 << (row * n + n - 1)
+        # A shift toward higher columns must never land in the first column,
+        # and a shift toward lower columns must never land in the last one.
+        no_first = self.full & ~first_col
+        no_last = self.full & ~last_col
+        self.left_shifts = [(1, no_first), (n, self.full),
+                            (n + 1, no_first), (n - 1, no_last)]
+        self.right_shifts = [(1, no_last), (n, self.full),
+                             (n + 1, no_last), (n - 1, no_first)]
+        self.steps = max(n - 3, 0)
+        # A fill with r rounds reaches 2 ** (r + 1) - 1 squares; a run of
+        # opponent tiles is at most n - 2 long.
+        self.rounds = 0
+        while 2 ** (self.rounds + 1) - 1 < n - 2:
+            self.rounds += 1
+        self.kogge_stone = n >= KOGGE_STONE_DIMENS
+        self.neighbours = []
+        for row in range(n):
+            for col in range(n):
+                self.neighbours.append(
+                    [r * n + c
+                     for r in range(max(row - 1, 0), min(row + 2, n))
+                     for c in range(max(col - 1, 0), min(col + 2, n))
+                     if (r, c) != (row, col)])
+
+
+_MASKS = {}
+_ZOBRIST_KEYS = {}
+MASK_64 = (1 << 64) - 1
+ZOBRIST_SEED = 0x0DE110
+
+
+def splitmix64(state):
+    """
+    Given a 64-bit state, returns the next state and a pseudo-random 64-bit
+    value. Unlike the random module, the sequence is the same on every
+    Python implementation, so hashes can be stored on disk.
+    """
+    state = (state + 0x9E3779B97F4A7C15) & MASK_64
+    value = ((state ^ (state >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return state, value ^ (value >> 31)
+
+
+class ZobristKeys:
+    """
+    Random keys for Zobrist hashing of a square board of a given size.
+
+    Keys are 63 bits wide so that hashes fit in a signed 64-bit integer.
+
+    Attributes
+    ----------
+    black : list of ints
+        Key of a black tile per square.
+    white : list of ints
+        Key of a white tile per square.
+    flip : list of ints
+        Key toggled when the tile on a square changes color.
+    side : int
+        Key toggled when white is to move.
+    """
+    def __init__(self, TILES_DIMENS):
+        """
+        Parameters
+        ----------
+        TILES_DIMENS : int
+            Number of tiles per side of the square board.
+        """
+        state = ZOBRIST_SEED + TILES_DIMENS
+        values = []
+        for _ in range(2 * TILES_DIMENS ** 2 + 1):
+            state, value = splitmix64(state)
+            values.append(value >> 1)
+        total = TILES_DIMENS ** 2
+        self.black = values[:total]
+        self.white = values[total:2 * total]
+        self.flip = [b ^ w for b, w in zip(self.black, self.white)]
+        self.side = values[-1]
+
+    def hash(self, black, white, place_black):
+        """
+        Given the bitboards of black and white and the player to move,
+        returns the Zobrist hash computed from scratch.
+        """
+        key = 0 if place_black else self.side
+        for square in squares(black):
+            key ^= self.black[square]
+        for square in squares(white):
+            key ^= self.white[square]
+        return key
+
+
+def get_masks(TILES_DIMENS):
+    """Returns the (cached) Masks instance for the given board size."""
+    masks = _MASKS.get(TILES_DIMENS)
+    if masks is None:
+        masks = _MASKS[TILES_DIMENS] = Masks(TILES_DIMENS)
+    return masks
+
+
+def get_zobrist_keys(TILES_DIMENS):
+    """Returns the (cached) ZobristKeys instance for the given board size."""
+    keys = _ZOBRIST_KEYS.get(TILES_DIMENS)
+    if keys is None:
+        keys = _ZOBRIST_KEYS[TILES_DIMENS] = ZobristKeys(TILES_DIMENS)
+    return keys
+
+
+def legal_mask(own, opp, masks):
+    """
+    Given the bitboards of the player to move (own) and the opponent (opp),
+    returns a bitboard of every legal move.
+    """
+    if masks.kogge_stone:
+        return kogge_stone_mask(own, opp, masks)
+    empty = masks.full & ~(own | opp)
+    steps = range(masks.steps)
+    moves = 0
+    for shift, mask in masks.left_shifts:
+        line = (own << shift) & mask & opp
+        for _ in steps:
+            line |= (line << shift) & mask & opp
+        moves |= (line << shift) & mask
+    for shift, mask in masks.right_shifts:
+        line = (own >> shift) & mask & opp
+        for _ in steps:
+            line |= (line >> shift) & mask & opp
+        moves |= (line >> shift) & mask
+    return moves & empty
+
+
+def kogge_stone_mask(own, opp, masks):
+    """
+    Same as legal_mask, but fills from own across opponent tiles with
+    Kogge-Stone doubling: each round doubles the distance covered, so a
+    direction takes O(log n) shifts on an n x n board.
+    """
+    empty = masks.full & ~(own | opp)
+    rounds = range(masks.rounds)
+    moves = 0
+    for shift, mask in masks.left_shifts:
+        fill, through, distance = own, opp & mask, shift
+        for _ in rounds:
+            fill |= through & (fill << distance)
+            through &= through << distance
+            distance <<= 1
+        fill |= through & (fill << distance)
+        moves |= ((fill & opp) << shift) & mask
+    for shift, mask in masks.right_shifts:
+        fill, through, distance = own, opp & mask, shift
+        for _ in rounds:
+            fill |= through & (fill >> distance)
+            through &= through >> distance
+            distance <<= 1
+        fill |= through & (fill >> distance)
+        moves |= ((fill & opp) >> shift) & mask
+    return moves & empty
+
+
+def flip_mask(own, opp, square, masks):
+    """
+    Given the bitboards of the player to move (own) and the opponent (opp),
+    returns a bitboard of the opponent tiles flipped by a move on square.
+    """
+    move = 1 << square
+    flips = 0
+    for shift, mask in masks.left_shifts:
+        line = 0
+        step = (move << shift) & mask
+        while step & opp:
+            line |= step
+            step = (step << shift) & mask
+        if step & own:
+            flips |= line
+    for shift, mask in masks.right_shifts:
+        line = 0
+        step = (move >> shift) & mask
+        while step & opp:
+            line |= step
+            step = (step >> shift) & mask
+        if step & own:
+            flips |= line
+    return flips
+
+
+def frontier_mask(discs, empty, masks):
+    """
+    Given a bitboard of discs and one of empty squares, returns the empty
+    squares next to at least one of the discs, computed from scratch.
+    """
+    frontier = 0
+    for shift, mask in masks.left_shifts:
+        frontier |= (discs << shift) & mask
+    for shift, mask in masks.right_shifts:
+        frontier |= (discs >> shift) & mask
+    return frontier & empty
+
+
+class Position:
+    """
+    Stores the tiles of each player as an integer bitboard.
+
+    Attributes
+    ----------
+    TILES_DIMENS : int
+        Number of tiles per side of the square board.
+    masks : instance of the Masks class.
+        Precomputed masks for the board size.
+    black : int
+        Bitboard of the black tiles.
+    white : int
+        Bitboard of the white tiles.
+    version : int
+        Incremented on every change to the tiles, used to invalidate caches.
+    keys : instance of the ZobristKeys class.
+        Zobrist keys for the board size.
+    hash : int
+        Zobrist hash of the tiles, updated with every change. Does not
+        include the player to move, see zobrist.
+    history : list of tuples
+        Undo stack of (square, flips, place_black) per move made with
+        make_move.
+    adjacent : tuple of lists
+        Number of black (first list) and white (second list) discs next to
+        each square.
+    frontiers : list of ints
+        Bitboards of the empty squares next to a black disc (first) and to
+        a white disc (second), kept up to date with every change. Only these
+        squares can be legal moves for the other player.
+
+    Methods
+    -------
+    square
+        Given a row_index and column_index, returns the bit index.
+    coordinates
+        Given a bitboard, returns a list of the index-coordinates of its set
+        bits.
+    set_color
+        Update the tile at the row_index, column_index to color.
+    get_color
+        Returns the color of the tile at the row_index, column_index.
+    zobrist
+        Returns the Zobrist hash of the position with the player to move.
+    sides
+        Returns the bitboards of the player to move and the opponent.
+    legal_moves
+        Returns a bitboard of the legal moves for the player to move.
+    flips
+        Returns a bitboard of the tiles flipped by a move at the row_index,
+        column_index.
+    make_move
+        Plays a move at the row_index, column_index in place and pushes it
+        onto the undo stack.
+    unmake_move
+        Takes back the last move made with make_move.
+    apply
+        Toggles a move on the bitboards and the hash.
+    update_frontier
+        Updates the frontiers after the disc on a square changed.
+    frontier
+        Returns a bitboard of the empty squares next to the opponent's discs.
+    frontier_size
+        Returns the number of empty squares next to the opponent's discs.
+    """
+    def __init__(self, TILES_DIMENS):
+        """
+        Parameters
+        ----------
+        TILES_DIMENS : int
+            Number of tiles per side of the square board.
+        """
+        self.TILES_DIMENS = TILES_DIMENS
+        self.masks = get_masks(TILES_DIMENS)
+        self.black = 0
+        self.white = 0
+        self.version = 0
+        self.keys = get_zobrist_keys(TILES_DIMENS)
+        self.hash = 0
+        self.history = []
+        total = TILES_DIMENS ** 2
+        self.adjacent = ([0] * total, [0] * total)
+        self.frontiers = [0, 0]
+
+    def square(self, row, col):
+        """Given a row_index and column_index, returns the bit index."""
+        return row * self.TILES_DIMENS + col
+
+    def coordinates(self, bits):
+        """
+        Given a bitboard, returns a list of the index-coordinates of its set
+        bits.
+        """
+        return [divmod(square, self.TILES_DIMENS) for square in squares(bits)]
+
+    def set_color(self, row, col, color):
+        """Update the tile at the row_index, column_index to color."""
+        square = self.square(row, col)
+        bit = 1 << square
+        old = new = None
+        if self.black & bit:
+            self.hash ^= self.keys.black[square]
+            old = BLACK
+        elif self.white & bit:
+            self.hash ^= self.keys.white[square]
+            old = WHITE
+        self.black &= ~bit
+        self.white &= ~bit
+        if color == "black":
+            self.black |= bit
+            self.hash ^= self.keys.black[square]
+            new = BLACK
+        elif color == "white":
+            self.white |= bit
+            self.hash ^= self.keys.white[square]
+            new = WHITE
+        self.update_frontier(square, old, new)
+        self.version += 1
+
+    def get_color(self, row, col):
+        """Returns the color of the tile at the row_index, column_index."""
+        bit = 1 << self.square(row, col)
+        if self.black & bit:
+            return "black"
+        elif self.white & bit:
+            return "white"
+        return "blank"
+
+    def zobrist(self, place_black):
+        """Returns the Zobrist hash of the position with the player to move."""
+        if place_black:
+            return self.hash
+        return self.hash ^ self.keys.side
+
+    def sides(self, place_black):
+        """Returns the bitboards of the player to move and the opponent."""
+        if place_black:
+            return self.black, self.white
+        return self.white, self.black
+
+    def legal_moves(self, place_black):
+        """Returns a bitboard of the legal moves for the player to move."""
+        own, opp = self.sides(place_black)
+        return legal_mask(own, opp, self.masks)
+
+    def flips(self, row, col, place_black):
+        """
+        Returns a bitboard of the tiles flipped by a move at the row_index,
+        column_index.
+        """
+        own, opp = self.sides(place_black)
+        return flip_mask(own, opp, self.square(row, col), self.masks)
+
+    def make_move(self, row, col, place_black):
+        """
+        Plays a move at the row_index, column_index for the given player in
+        place, pushing the square and the flipped tiles onto the undo stack.
+        Returns the bitboard of the flipped tiles. The move is not checked.
+        """
+        square = self.square(row, col)
+        own, opp = self.sides(place_black)
+        flips = flip_mask(own, opp, square, self.masks)
+        self.apply(square, flips, place_black)
+        self.history.append((square, flips, place_black))
+        return flips
+
+    def unmake_move(self):
+        """
+        Takes back the last move made with make_move. Returns its
+        (square, flips, place_black).
+        """
+        move = self.history.pop()
+        self.apply(*move)
+        return move
+
+    def apply(self, square, flips, place_black):
+        """
+        Toggles a move on the bitboards and the hash: playing it when its
+        square is empty, taking it back otherwise.
+        """
+        bit = 1 << square
+        keys = self.keys
+        placing = not (self.black | self.white) & bit
+        if place_black:
+            self.black ^= bit | flips
+            self.white ^= flips
+            self.hash ^= keys.black[square]
+            own, opp = BLACK, WHITE
+        else:
+            self.white ^= bit | flips
+            self.black ^= flips
+            self.hash ^= keys.white[square]
+            own, opp = WHITE, BLACK
+        if placing:
+            self.update_frontier(square, None, own)
+        else:
+            self.update_frontier(square, own, None)
+            own, opp = opp, own  # Flipped tiles go back to the opponent.
+        flip = keys.flip
+        while flips:
+            low = flips & -flips
+            flipped = low.bit_length() - 1
+            self.hash ^= flip[flipped]
+            self.update_frontier(flipped, opp, own)
+            flips ^= low
+        self.version += 1
+
+    def update_frontier(self, square, old, new):
+        """
+        Updates the neighbour counts and the frontiers after the disc on a
+        square changed from old to new (BLACK, WHITE or None for empty). The
+        bitboards must already hold the new disc. Only the eight squares
+        around it are visited.
+        """
+        if old == new:
+            return
+        adjacent, frontiers = self.adjacent, self.frontiers
+        occupied = self.black | self.white
+        neighbours = self.masks.neighbours[square]
+        if old is not None:
+            counts = adjacent[old]
+            for neighbour in neighbours:
+                counts[neighbour] -= 1
+                if not counts[neighbour] and not occupied >> neighbour & 1:
+                    frontiers[old] &= ~(1 << neighbour)
+        if new is not None:
+            counts = adjacent[new]
+            for neighbour in neighbours:
+                counts[neighbour] += 1
+                if counts[neighbour] == 1 and not occupied >> neighbour & 1:
+                    frontiers[new] |= 1 << neighbour
+        bit = 1 << square
+        if new is None:  # The square is empty again.
+            for color in (BLACK, WHITE):
+                if adjacent[color][square]:
+                    frontiers[color] |= bit
+        elif old is None:  # The square was empty.
+            frontiers[BLACK] &= ~bit
+            frontiers[WHITE] &= ~bit
+
+    def frontier(self, place_black):
+        """
+        Returns a bitboard of the empty squares next to the opponent's discs,
+        the only squares where the player to move can have legal moves.
+        """
+        if place_black:
+            return self.frontiers[WHITE]
+        return self.frontiers[BLACK]
+
+    def frontier_size(self, place_black):
+        """
+        Returns the number of empty squares next to the opponent's discs, the
+        potential mobility of the player to move.
+        """
+        return bit_count(self.frontier(place_black))
@@ -0,0 +1,189 @@
+# Test the Position class and the bitboard helpers.
+from random import Random
+from position import (Position, Masks, bit_count, squares, legal_mask,
+                      kogge_stone_mask, frontier_mask, get_masks)
+from tiles import Tiles
+
+
+def lane_legal_moves(tiles):
+    """Reference legal moves built with the per-lane scan of Tiles."""
+    legal_moves = {}
+    for row in range(tiles.TILES_DIMENS):
+        for col in range(tiles.TILES_DIMENS):
+            tile = tiles.all_tiles[row][col]
+            if tile.color == "blank":
+                for lane in ("row", "column", "tl_diag", "tr_diag"):
+                    tiles.check_each_lane(tile, row, col, lane)
+                if tiles.flip_set:
+                    legal_moves[(row, col)] = tiles.flip_set
+                tiles.flip_set = set()
+    return legal_moves
+
+
+def test_helpers():
+    """Test the bit_count and squares helpers."""
+    assert bit_count(0) == 0
+    assert bit_count(0b101101) == 4
+    assert squares(0) == []
+    assert squares(0b101101) == [0, 2, 3, 5]
+    assert squares(1 << 99) == [99]
+
+
+def test_set_color():
+    """Test the set_color and get_color methods."""
+    position = Position(8)
+    position.set_color(2, 3, "black")
+    assert position.black == 1 << 19
+    assert position.get_color(2, 3) == "black"
+    position.set_color(2, 3, "white")
+    assert position.black == 0
+    assert position.white == 1 << 19
+    position.set_color(2, 3, "blank")
+    assert position.get_color(2, 3) == "blank"
+    assert position.coordinates((1 << 19) | (1 << 63)) == [(2, 3), (7, 7)]
+
+
+def test_legal_moves():
+    """Test the legal_moves and flips methods on the initial position."""
+    tiles = Tiles(800, 800, 100, 8)
+    tiles.initial_tiles(False)
+    position = tiles.position
+    moves = position.coordinates(position.legal_moves(True))
+    assert moves == [(2, 3), (3, 2), (4, 5), (5, 4)]
+    flips = position.flips(2, 3, True)
+    assert position.coordinates(flips) == [(3, 3)]
+    assert position.flips(0, 0, True) == 0
+
+
+def test_no_wrap_around():
+    """Moves must not wrap from one edge of the board to the other."""
+    masks = get_masks(4)
+    own = 1 << 3  # (0, 3)
+    opp = 1 << 4  # (1, 0)
+    assert legal_mask(own, opp, masks) == 0
+
+
+def test_kogge_stone():
+    """Kogge-Stone fills match one shift per step on boards of any size."""
+    rng = Random(5)
+    for dimens in range(3, 25):
+        linear = Masks(dimens)
+        linear.kogge_stone = False
+        assert get_masks(dimens).kogge_stone is (dimens >= 8)
+        # The longest run: own, n - 2 opponent tiles, then the move.
+        last = dimens - 1
+        own, opp = 1 << (last * dimens), 0
+        for col in range(1, last):
+            opp |= 1 << (last * dimens + col)
+        assert kogge_stone_mask(own, opp, linear) == 1 << (dimens ** 2 - 1)
+        for _ in range(20):
+            own = opp = 0
+            for square in range(dimens ** 2):
+                draw = rng.random()
+                if draw < 0.15:
+                    own |= 1 << square
+                elif draw < 0.85:
+                    opp |= 1 << square
+            assert (kogge_stone_mask(own, opp, linear) ==
+                    legal_mask(own, opp, linear))
+
+
+def test_frontier():
+    """The frontiers kept up to date match the frontiers from scratch."""
+    rng = Random(11)
+    for dimens in (4, 8, 11):
+        tiles = Tiles(dimens * 10, dimens * 10, 10, dimens)
+        tiles.initial_tiles(False)
+        position, masks = tiles.position, get_masks(dimens)
+        assert position.frontier_size(True) == 10
+        for _ in range(3):
+            plies = 0
+            while True:
+                empty = masks.full & ~(position.black | position.white)
+                assert position.frontier(False) == frontier_mask(
+                    position.black, empty, masks)
+                assert position.frontier(True) == frontier_mask(
+                    position.white, empty, masks)
+                moves = position.legal_moves(tiles.place_black)
+                assert moves & ~position.frontier(tiles.place_black) == 0
+                if not moves:
+                    break
+                tiles.make_move(*rng.choice(position.coordinates(moves)))
+                plies += 1
+            for _ in range(plies // 2):
+                tiles.unmake_move()
+        position.set_color(0, 0, "black")
+        position.set_color(0, 0, "white")
+        position.set_color(0, 0, "blank")
+        empty = masks.full & ~(position.black | position.white)
+        assert position.frontier(True) == frontier_mask(position.white, empty,
+                                                        masks)
+
+
+def test_matches_lane_scan():
+    """Bitboard moves match the lane scan over random games."""
+    rng = Random(7)
+    for dimens in (4, 6, 8, 10):
+        for _ in range(5):
+            tiles = Tiles(dimens * 10, dimens * 10, 10, dimens)
+            tiles.initial_tiles(False)
+            passes = 0
+            while passes < 2:
+                tiles.generate_legal_moves()
+                assert tiles.legal_moves == lane_legal_moves(tiles)
+                if not tiles.legal_moves:
+                    passes += 1
+                    tiles.place_black = not tiles.place_black
+                    continue
+                passes = 0
+                row, col = rng.choice(sorted(tiles.legal_moves))
+                color = "black" if tiles.place_black else "white"
+                for r, c in tiles.legal_moves[(row, col)] | {(row, col)}:
+                    tiles.update_color(r, c, color)
+                tiles.place_black = not tiles.place_black
+
+
+def test_zobrist_hash():
+    """The incremental hash matches a hash computed from scratch."""
+    tiles = Tiles(800, 800, 100, 8)
+    tiles.initial_tiles(False)
+    position = tiles.position
+    keys = position.keys
+    assert position.hash == keys.hash(position.black, position.white, True)
+    tiles.generate_legal_moves()
+    for row, col in tiles.legal_moves[(2, 3)] | {(2, 3)}:
+        tiles.update_color(row, col, "black")
+    assert position.hash == keys.hash(position.black, position.white, True)
+    assert (position.zobrist(False) ==
+            keys.hash(position.black, position.white, False))
+    position.set_color(2, 3, "blank")
+    assert position.hash == keys.hash(position.black, position.white, True)
+    assert position.keys.black[0] == Position(8).keys.black[0]
+    assert position.keys.black[0] != Position(6).keys.black[0]
+
+
+def test_make_unmake_move():
+    """make_move and unmake_move keep the bitboards and the hash exact."""
+    position = Position(8)
+    for row, col, color in ((3, 3, "white"), (3, 4, "black"),
+                            (4, 3, "black"), (4, 4, "white")):
+        position.set_color(row, col, color)
+    start = (position.black, position.white, position.hash)
+    rng = Random(3)
+    place_black = True
+    for _ in range(20):
+        moves = position.coordinates(position.legal_moves(place_black))
+        if not moves:
+            break
+        row, col = rng.choice(moves)
+        flips = position.make_move(row, col, place_black)
+        assert flips and position.sides(place_black)[0] & flips == flips
+        assert position.hash == position.keys.hash(position.black,
+                                                   position.white, True)
+        place_black = not place_black
+    assert len(position.history) == 20
+    version = position.version
+    while position.history:
+        position.unmake_move()
+    assert (position.black, position.white, position.hash) == start
+    assert position.version == version + 20
@@ -0,0 +1,131 @@
+# Per-square ray tables: for every square of a board, the squares met walking
+# outward in each of the eight directions. Tables are built once per board
+# size, kept in memory and cached on disk, so the lane scans of Tiles are
+# straight iteration over precomputed lists.
+import os
+import struct
+import sys
+from array import array
+from files import replace_file
+
+# (row step, col step) of every ray, in the order of a square's rays.
+DIRECTIONS = ((0, 1), (0, -1), (1, 0), (-1, 0),
+              (1, 1), (-1, -1), (-1, 1), (1, -1))
+# Indices in DIRECTIONS of the two rays of each lane of Tiles.check_each_lane.
+LANE_RAYS = {"row": (0, 1), "column": (2, 3), "tl_diag": (4, 5),
+             "tr_diag": (6, 7)}
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "ray_tables")
+MAGIC = b"RAYS"
+HEADER = struct.Struct("<4sHI")
+# Squares are stored as unsigned 16-bit integers.
+MAX_CACHED_DIMENS = 256
+
+_RAYS = {}
+
+
+def build_rays(TILES_DIMENS):
+    """
+    Returns the ray table of a board size: a list indexed by square
+    (row * TILES_DIMENS + col) of tuples of eight lists of squares, one per
+    direction of DIRECTIONS, nearest square first.
+    """
+    n = TILES_DIMENS
+    rays = []
+    for row in range(n):
+        for col in range(n):
+            square_rays = []
+            for row_step, col_step in DIRECTIONS:
+                ray = []
+                r, c = row + row_step, col + col_step
+                while 0 <= r < n and 0 <= c < n:
+                    ray.append(r * n + c)
+                    r, c = r + row_step, c + col_step
+                square_rays.append(ray)
+            rays.append(tuple(square_rays))
+    return rays
+
+
+def cache_path(TILES_DIMENS, directory=CACHE_DIR):
+    """Returns the name of the cache file of a board size."""
+    return os.path.join(directory, "rays_{0}.bin".format(TILES_DIMENS))
+
+
+def save_rays(rays, TILES_DIMENS, path):
+    """
+    Writes a ray table to path: a header, then per square and direction the
+    length of the ray followed by its squares, as little-endian 16-bit
+    integers. The file is replaced in one step.
+    """
+    data = array("H")
+    for square_rays in rays:
+        for ray in square_rays:
+            data.append(len(ray))
+            data.extend(ray)
+    if sys.byteorder == "big":
+        data.byteswap()
+    temporary = "{0}.{1}.tmp".format(path, os.getpid())
+    try:
+        with open(temporary, "wb") as f:
+            f.write(HEADER.pack(MAGIC, TILES_DIMENS, len(data)))
+            data.tofile(f)
+        replace_file(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+
+
+def load_rays(TILES_DIMENS, path):
+    """
+    Reads a ray table written by save_rays. Returns None if the file is
+    missing, truncated or for another board size.
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return None
+            magic, dimens, count = HEADER.unpack(header)
+            if magic != MAGIC or dimens != TILES_DIMENS:
+                return None
+            data = array("H")
+            data.fromfile(f, count)
+    except (IOError, OSError, EOFError):
+        return None
+    if sys.byteorder == "big":
+        data.byteswap()
+    rays, i = [], 0
+    for _ in range(TILES_DIMENS ** 2):
+        square_rays = []
+        for _ in DIRECTIONS:
+            length = data[i]
+            square_rays.append(data[i + 1:i + 1 + length].tolist())
+            i += 1 + length
+        rays.append(tuple(square_rays))
+    return rays
+
+
+def get_rays(TILES_DIMENS, directory=CACHE_DIR):
+    """
+    Returns the (cached) ray table of a board size. A table not yet in
+    memory is read from the disk cache in directory, or built and written
+    there. A cache that cannot be written is skipped.
+    """
+    rays = _RAYS.get(TILES_DIMENS)
+    if rays is not None:
+        return rays
+    if TILES_DIMENS > MAX_CACHED_DIMENS:
+        rays = _RAYS[TILES_DIMENS] = build_rays(TILES_DIMENS)
+        return rays
+    path = cache_path(TILES_DIMENS, directory)
+    rays = load_rays(TILES_DIMENS, path)
+    if rays is None:
+        rays = build_rays(TILES_DIMENS)
+        try:
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+            save_rays(rays, TILES_DIMENS, path)
+        except (IOError, OSError):
+            pass  # Read-only install: rebuild the table next time.
+    _RAYS[TILES_DIMENS] = rays
+    return rays
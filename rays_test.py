@@ -0,0 +1,63 @@
+# Test the per-square ray tables and their disk cache.
+import os
+import pytest
+import rays
+from perft import lane_moves
+from rays import build_rays, cache_path, save_rays, load_rays, get_rays
+from tiles import Tiles
+
+
+def test_build_rays():
+    """Rays list the squares outward from each square, nearest first."""
+    table = build_rays(4)
+    assert len(table) == 16
+    # Square (1, 1): right, left, down, up, and the four diagonals.
+    assert table[5] == ([6, 7], [4], [9, 13], [1], [10, 15], [0], [2], [8])
+    assert all(ray == [] for ray in table[0][1::2])
+
+
+def test_disk_cache(tmp_path):
+    """A table read back from the disk cache equals the one built."""
+    path = cache_path(6, str(tmp_path))
+    save_rays(build_rays(6), 6, path)
+    assert load_rays(6, path) == build_rays(6)
+    assert load_rays(8, path) is None  # Another board size.
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 2)
+    assert load_rays(6, path) is None
+    assert load_rays(6, str(tmp_path / "missing.bin")) is None
+
+
+def test_save_rays_replaces(tmp_path, monkeypatch):
+    """A save replaces an older file and never leaves its temporary file."""
+    path = cache_path(6, str(tmp_path))
+    with open(path, "wb") as f:
+        f.write(b"stale")
+    save_rays(build_rays(6), 6, path)
+    assert load_rays(6, path) == build_rays(6)
+    assert os.listdir(str(tmp_path)) == [os.path.basename(path)]
+
+    def failing_replace(source, target):
+        raise OSError("target is locked")
+    monkeypatch.setattr(rays, "replace_file", failing_replace)
+    with pytest.raises(OSError):
+        save_rays(build_rays(6), 6, path)
+    assert os.listdir(str(tmp_path)) == [os.path.basename(path)]
+
+
+def test_get_rays(tmp_path):
+    """Tables are built once, cached on disk, and shared in memory."""
+    directory = str(tmp_path / "cache")
+    rays._RAYS.pop(7, None)
+    table = get_rays(7, directory)
+    assert os.path.exists(cache_path(7, directory))
+    assert get_rays(7, directory) is table
+    rays._RAYS.pop(7)
+    assert get_rays(7, directory) == table  # Read back from disk.
+    tiles1, tiles2 = Tiles(70, 70, 10, 7), Tiles(70, 70, 10, 7)
+    assert tiles1.rays is None  # Loaded by the first lane scan only.
+    for tiles in (tiles1, tiles2):
+        tiles.initial_tiles(False)
+        tiles.generate_legal_moves()
+        assert lane_moves(tiles) == dict(tiles.legal_moves)
+    assert tiles1.rays is tiles2.rays
@@ -0,0 +1,154 @@
+# Creates instances of the ProcessingRenderer and RecordingRenderer classes,
+# the drawing surfaces used by Board and Tiles. ProcessingRenderer draws with
+# Processing, RecordingRenderer keeps the draw commands for headless tests.
+
+
+class ProcessingRenderer:
+    """
+    Draws with the Processing drawing functions, on the sketch window or on
+    an offscreen buffer.
+
+    Attributes
+    ----------
+    graphics : PGraphics object, or None.
+        Offscreen buffer drawn on, None for the sketch window.
+
+    Methods
+    -------
+    buffer
+        Creates an offscreen buffer drawn once by a function.
+    background, stroke, stroke_weight, fill, line, ellipse
+        Same as the Processing functions of the same names.
+    image
+        Draws a whole buffer at the given position.
+    copy
+        Copies a rectangle of a buffer to the same place on the window.
+    """
+    def __init__(self, graphics=None):
+        """
+        Parameters
+        ----------
+        graphics : PGraphics object (default None)
+            Offscreen buffer drawn on, None for the sketch window.
+        """
+        self.graphics = graphics
+
+    def buffer(self, width, height, draw):
+        """
+        Creates an offscreen buffer of the given size, calls draw with a
+        renderer drawing on it, and returns the buffer.
+        """
+        graphics = createGraphics(width, height)
+        graphics.beginDraw()
+        draw(ProcessingRenderer(graphics))
+        graphics.endDraw()
+        return graphics
+
+    def background(self, red, green, blue):
+        if self.graphics is None:
+            background(red, green, blue)
+        else:
+            self.graphics.background(red, green, blue)
+
+    def stroke(self, gray):
+        if self.graphics is None:
+            stroke(gray)
+        else:
+            self.graphics.stroke(gray)
+
+    def stroke_weight(self, weight):
+        if self.graphics is None:
+            strokeWeight(weight)
+        else:
+            self.graphics.strokeWeight(weight)
+
+    def fill(self, gray):
+        if self.graphics is None:
+            fill(gray)
+        else:
+            self.graphics.fill(gray)
+
+    def line(self, x1, y1, x2, y2):
+        if self.graphics is None:
+            line(x1, y1, x2, y2)
+        else:
+            self.graphics.line(x1, y1, x2, y2)
+
+    def ellipse(self, x, y, width, height):
+        if self.graphics is None:
+            ellipse(x, y, width, height)
+        else:
+            self.graphics.ellipse(x, y, width, height)
+
+    def image(self, buffer, x, y):
+        """Draws a whole buffer with its top left corner at x, y."""
+        image(buffer, x, y)
+
+    def copy(self, buffer, x, y, width, height):
+        """Copies a rectangle of a buffer to the same place on the window."""
+        copy(buffer, x, y, width, height, x, y, width, height)
+
+
+class RecordingRenderer:
+    """
+    Records draw commands instead of drawing, so that rendering can be
+    tested without Processing.
+
+    Attributes
+    ----------
+    commands : list of tuples
+        (name, arguments...) of every draw command, in order.
+    buffers : list of instances of the RecordingRenderer class.
+        Offscreen buffers created, holding the commands drawn on them.
+
+    Methods
+    -------
+    buffer
+        Creates an offscreen buffer drawn once by a function.
+    clear
+        Forgets the commands recorded so far.
+    background, stroke, stroke_weight, fill, line, ellipse, image, copy
+        Record the command of the same name.
+    """
+    def __init__(self):
+        self.commands = []
+        self.buffers = []
+
+    def buffer(self, width, height, draw):
+        """
+        Records the creation of an offscreen buffer, calls draw with a
+        recording renderer for it and returns its index in buffers.
+        """
+        buffer = RecordingRenderer()
+        draw(buffer)
+        self.buffers.append(buffer)
+        self.commands.append(("buffer", width, height))
+        return len(self.buffers) - 1
+
+    def clear(self):
+        """Forgets the commands recorded so far."""
+        self.commands = []
+
+    def background(self, red, green, blue):
+        self.commands.append(("background", red, green, blue))
+
+    def stroke(self, gray):
+        self.commands.append(("stroke", gray))
+
+    def stroke_weight(self, weight):
+        self.commands.append(("stroke_weight", weight))
+
+    def fill(self, gray):
+        self.commands.append(("fill", gray))
+
+    def line(self, x1, y1, x2, y2):
+        self.commands.append(("line", x1, y1, x2, y2))
+
+    def ellipse(self, x, y, width, height):
+        self.commands.append(("ellipse", x, y, width, height))
+
+    def image(self, buffer, x, y):
+        self.commands.append(("image", buffer, x, y))
+
+    def copy(self, buffer, x, y, width, height):
+        self.commands.append(("copy", buffer, x, y, width, height))
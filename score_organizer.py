@@ -45,30 +45,24 @@ class ScoreOrganizer:
         the name and score for the current round, updates file accordingly.
         """
         try:
-            with open(self.filename, "r+") as f:
-                contents = f.readlines()
-        except:
-            with open(self.filename, "w") as fn:
-                fn.write("" + self.name + " " + str(self.score) + "\n")
-                return
+            with open(self.filename, "r") as f:
+                contents = [line for line in f.readlines() if line.strip()]
+        except IOError:
+            contents = []
 
-        # Store scores in dictionary for sorting.
-        score_list = []
-        separator = contents[0].rfind(' ')
-        top_score = contents[0][separator + 1:]
-        if self.score > int(top_score):
-            score_list.append((self.name, self.score))
-            score_list = self.add_scores(score_list, contents)
-        else:
-            score_list = self.add_scores(score_list, contents)
-            score_list.append((self.name, self.score))
+        # Insert the new score after every score at least as high.
+        score_list = self.add_scores([], contents)
+        index = len(score_list)
+        for i, (_, score) in enumerate(score_list):
+            if score < self.score:
+                index = i
+                break
+        score_list.insert(index, (self.name, self.score))
 
         # Writing scores back to the text file.
-        new_scores = ""
-        for scores in score_list:
-            new_scores += scores[0] + " " + str(scores[1]) + "\n"
+        lines = [name + " " + str(score) + "\n" for name, score in score_list]
         with open(self.filename, "w") as fn:
-            fn.write(new_scores)
+            fn.write("".join(lines))
 
     def add_scores(self, score_list, contents):
         """
@@ -77,6 +71,6 @@ class ScoreOrganizer:
         """
         for line in contents:
             separator = line.rfind(' ')
-            name, score = line[: separator], line[separator + 1:]
+            name, score = line[: separator], line[separator + 1:].strip()
             score_list.append((name, int(score)))
         return score_list
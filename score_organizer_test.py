@@ -10,16 +10,17 @@ def test_constructor():
     assert scorg.score == 30
 
 
-def test_update_score():
+def test_update_score(tmp_path):
     """Test the update_score method when the file does not exist."""
-    scorg = ScoreOrganizer("happy", 10, "test_scores.txt")
-    scorg2 = ScoreOrganizer("lucky go", 30, "test_scores.txt")
-    scorg3 = ScoreOrganizer("kimi", 32, "test_scores.txt")
+    filename = str(tmp_path / "test_scores.txt")
+    scorg = ScoreOrganizer("happy", 10, filename)
+    scorg2 = ScoreOrganizer("lucky go", 30, filename)
+    scorg3 = ScoreOrganizer("kimi", 32, filename)
     scorg.update_score()
     scorg2.update_score()
     scorg3.update_score()
 
-    with open("test_scores.txt", "r") as fn:
+    with open(filename, "r") as fn:
         contents = fn.readlines()
         player1, sep1 = contents[0], contents[0].rfind(' ')
         p1_name, p1_score = player1[: sep1], player1[sep1 + 1:].rstrip()
@@ -41,3 +42,14 @@ def test_add_scores():
     contents = ["Kimi 32", "Happy 10", "Lucky 30"]
     new_contents = scorg.add_scores([], contents)
     assert new_contents == [("Kimi", 32), ("Happy", 10), ("Lucky", 30)]
+
+
+def test_update_score_sorted(tmp_path):
+    """Scores stay sorted whatever order they arrive in."""
+    filename = str(tmp_path / "scores.txt")
+    for name, score in (("a", 10), ("b", 30), ("c", 20), ("d", 20), ("e", 5)):
+        ScoreOrganizer(name, score, filename).update_score()
+    with open(filename) as fn:
+        contents = fn.readlines()
+    assert ScoreOrganizer("x", 0, filename).add_scores([], contents) == [
+        ("B", 30), ("C", 20), ("D", 20), ("A", 10), ("E", 5)]
@@ -0,0 +1,135 @@
+# Creates an instance of the ScoreStore class, an sqlite3 leaderboard that
+# replaces rewriting othello.txt after every game.
+import sqlite3
+from time import time
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS scores ("
+    "id INTEGER PRIMARY KEY, name TEXT NOT NULL, score INTEGER NOT NULL, "
+    "created REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC, id)",
+    "CREATE INDEX IF NOT EXISTS scores_by_name "
+    "ON scores (name, score DESC, id)",
+)
+
+
+def normalize(name):
+    """Returns a player name capitalized like ScoreOrganizer does."""
+    return name.lower().capitalize()
+
+
+class ScoreStore:
+    """
+    Leaderboard of every game's score in an sqlite3 database.
+
+    Rows are only ever appended, and two indexes keep them sorted by score
+    and by player, so an insert costs O(log n) and top-k or per-player
+    queries read k rows of an index instead of the whole table.
+
+    Attributes
+    ----------
+    path : str
+        Name of the database file, or ":memory:".
+    connection : instance of sqlite3.Connection.
+        Open connection to the database.
+
+    Methods
+    -------
+    add
+        Records a score. Returns its row id.
+    add_many
+        Records many (name, score) pairs in one transaction.
+    top
+        Returns the k best (name, score) pairs, best first.
+    player
+        Returns the k best scores of a player, best first.
+    best
+        Returns the best score of a player, or None.
+    count
+        Returns the number of recorded scores.
+    import_text
+        Records every score of a file in the othello.txt format.
+    export_text
+        Writes the k best scores in the othello.txt format.
+    close
+        Closes the database.
+    """
+    def __init__(self, path="othello.db"):
+        """
+        Parameters
+        ----------
+        path : str (default othello.db)
+            Name of the database file, or ":memory:".
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        with self.connection:
+            for statement in SCHEMA:
+                self.connection.execute(statement)
+
+    def add(self, name, score):
+        """Records a score. Returns its row id."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO scores (name, score, created) VALUES (?, ?, ?)",
+                (normalize(name), int(score), time()))
+        return cursor.lastrowid
+
+    def add_many(self, records):
+        """Records many (name, score) pairs in one transaction."""
+        now = time()
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO scores (name, score, created) VALUES (?, ?, ?)",
+                ((normalize(name), int(score), now)
+                 for name, score in records))
+
+    def top(self, k=10):
+        """
+        Returns the k best (name, score) pairs, best first. Equal scores are
+        in the order they were recorded.
+        """
+        return self.connection.execute(
+            "SELECT name, score FROM scores ORDER BY score DESC, id LIMIT ?",
+            (k,)).fetchall()
+
+    def player(self, name, k=10):
+        """Returns the k best scores of a player, best first."""
+        rows = self.connection.execute(
+            "SELECT score FROM scores WHERE name = ? "
+            "ORDER BY score DESC, id LIMIT ?", (normalize(name), k))
+        return [score for (score,) in rows]
+
+    def best(self, name):
+        """Returns the best score of a player, or None."""
+        scores = self.player(name, 1)
+        return scores[0] if scores else None
+
+    def count(self):
+        """Returns the number of recorded scores."""
+        return self.connection.execute(
+            "SELECT COUNT(*) FROM scores").fetchone()[0]
+
+    def import_text(self, filename):
+        """
+        Records every score of a file in the othello.txt format, one
+        "Name score" per line. Returns the number of scores read.
+        """
+        records = []
+        with open(filename) as f:
+            for line in f:
+                if line.strip():
+                    name, _, score = line.strip().rpartition(" ")
+                    records.append((name, int(score)))
+        self.add_many(records)
+        return len(records)
+
+    def export_text(self, filename, k=100):
+        """Writes the k best scores in the othello.txt format."""
+        with open(filename, "w") as f:
+            for name, score in self.top(k):
+                f.write(name + " " + str(score) + "\n")
+
+    def close(self):
+        """Closes the database."""
+        self.connection.close()
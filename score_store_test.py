@@ -0,0 +1,55 @@
+# Test for the ScoreStore class
+from random import Random
+from score_store import ScoreStore
+
+
+def test_add_and_queries():
+    """Test add, top, player, best and count."""
+    store = ScoreStore(":memory:")
+    for name, score in (("andy", 42), ("kimi", 32), ("ANDY", 50),
+                        ("lucky", 32), ("happy", 10)):
+        store.add(name, score)
+    assert store.count() == 5
+    assert store.top(3) == [("Andy", 50), ("Andy", 42), ("Kimi", 32)]
+    assert store.top(10)[3] == ("Lucky", 32)
+    assert store.player("andy") == [50, 42]
+    assert store.best("Happy") == 10
+    assert store.best("nobody") is None
+    store.close()
+
+
+def test_many_scores(tmp_path):
+    """Queries stay correct and use the indexes on a large table."""
+    store = ScoreStore(str(tmp_path / "scores.db"))
+    rng = Random(0)
+    records = [("player{0}".format(rng.randrange(1000)), rng.randrange(65))
+               for _ in range(50000)]
+    store.add_many(records)
+    assert store.count() == len(records)
+    expected = sorted(score for _, score in records)[::-1][:20]
+    assert [score for _, score in store.top(20)] == expected
+    name = records[0][0]
+    expected = sorted(score for player, score in records
+                      if player == name)[::-1][:5]
+    assert store.player(name, 5) == expected
+    for query in ("SELECT name, score FROM scores ORDER BY score DESC, id "
+                  "LIMIT 10",
+                  "SELECT score FROM scores WHERE name = 'Player1' "
+                  "ORDER BY score DESC, id LIMIT 10"):
+        plan = " ".join(str(row) for row in store.connection.execute(
+            "EXPLAIN QUERY PLAN " + query))
+        assert "USING" in plan and "INDEX" in plan
+        assert "TEMP B-TREE" not in plan
+    store.close()
+
+
+def test_import_export(tmp_path):
+    """Scores move to and from the othello.txt format."""
+    text = tmp_path / "othello.txt"
+    text.write_text(u"Andy 42\nLucky go 30\n\nKimi 32\n")
+    store = ScoreStore(":memory:")
+    assert store.import_text(str(text)) == 3
+    exported = tmp_path / "top.txt"
+    store.export_text(str(exported), 2)
+    assert exported.read_text() == u"Andy 42\nKimi 32\n"
+    store.close()
@@ -0,0 +1,282 @@
+# Creates an instance of the ScoreWriter class, which adds scores to a sorted
+# score file like othello.txt safely from many processes at once. Stress test
+# from the command line:
+#     python score_writer.py --processes 8 --scores 200 --batch-size 50
+import os
+import sys
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from time import time
+from files import replace_file
+from score_organizer import ScoreOrganizer
+try:
+    import fcntl
+except ImportError:  # Processing's Jython and Windows have no fcntl.
+    fcntl = None
+try:
+    import msvcrt
+except ImportError:  # Only Windows has msvcrt.
+    msvcrt = None
+
+
+def parse_scores(lines):
+    """Given lines of "Name score", returns a list of (name, score) tuples."""
+    scores = []
+    for line in lines:
+        if line.strip():
+            name, _, score = line.strip().rpartition(" ")
+            scores.append((name, int(score)))
+    return scores
+
+
+def merge_scores(scores, new_scores):
+    """
+    Given a list of (name, score) sorted best first and a list of new
+    scores, returns the merged list, still sorted. New scores go after the
+    scores already recorded with the same value, in the order given.
+    """
+    new_scores = sorted(new_scores, key=lambda entry: -entry[1])
+    merged, i = [], 0
+    for entry in new_scores:
+        while i < len(scores) and scores[i][1] >= entry[1]:
+            merged.append(scores[i])
+            i += 1
+        merged.append(entry)
+    merged.extend(scores[i:])
+    return merged
+
+
+@contextmanager
+def exclusive_lock(lock_name):
+    """
+    Holds an exclusive lock on the file lock_name, created if missing, for
+    the body of a with statement: with a Java FileChannel on Processing's
+    Jython, msvcrt on Windows and fcntl elsewhere.
+    """
+    if sys.platform.startswith("java"):
+        # Imported here, as only Jython has the Java classes.
+        from java.io import RandomAccessFile
+        channel = RandomAccessFile(lock_name, "rw").getChannel()
+        try:
+            lock = channel.lock()
+            try:
+                yield
+            finally:
+                lock.release()
+        finally:
+            channel.close()
+        return
+    with open(lock_name, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        elif msvcrt is not None:
+            f.seek(0)
+            while True:
+                try:  # LK_LOCK gives up after ten seconds.
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except (IOError, OSError):
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class ScoreWriter:
+    """
+    Adds scores to a sorted score file, holding an exclusive lock on a
+    companion lock file for every read-modify-write so that concurrent
+    writers never lose each other's scores.
+
+    Scores can be buffered and committed in batches: one locked rewrite then
+    records every buffered score, which is how many writer processes share a
+    file without each paying a full rewrite per score. flush_ms is only
+    checked when a score is written, so a writer that stops writing keeps
+    its batch until close. The game records one score per game and writes
+    it at once (batch_size 1); batches are for long-running writers such as
+    the stress test.
+
+    Attributes
+    ----------
+    filename : str
+        Name of the score file.
+    lock_name : str
+        Name of the lock file.
+    batch_size : int
+        Number of buffered scores that triggers a flush.
+    flush_ms : float or None
+        Age of the oldest buffered score, in milliseconds, that triggers a
+        flush when the next score is written. None to flush on size only.
+    pending : list of tuples
+        (name, score) buffered since the last flush.
+    first_pending : float
+        Time at which the oldest buffered score was written.
+    flushes : int
+        Counter of rewrites of the score file.
+
+    Methods
+    -------
+    write
+        Buffers a score, flushing when the batch is full or old enough.
+    flush
+        Records every buffered score in one locked rewrite.
+    close
+        Flushes the remaining scores.
+    """
+    def __init__(self, filename="othello.txt", batch_size=1, flush_ms=None):
+        """
+        Parameters
+        ----------
+        filename : str (default othello.txt)
+            Name of the score file.
+        batch_size : int (default 1)
+            Number of buffered scores that triggers a flush. 1 writes every
+            score at once.
+        flush_ms : float (default None)
+            Age of the oldest buffered score, in milliseconds, that triggers
+            a flush. None to flush on size only.
+        """
+        self.filename = filename
+        self.lock_name = filename + ".lock"
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.pending = []
+        self.first_pending = 0.0
+        self.flushes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, name, score):
+        """
+        Buffers a score, then flushes if batch_size scores are buffered or
+        the oldest one has waited flush_ms.
+        """
+        now = time()
+        if not self.pending:
+            self.first_pending = now
+        self.pending.append((name.lower().capitalize(), int(score)))
+        waited = (now - self.first_pending) * 1000
+        if (len(self.pending) >= self.batch_size or
+                (self.flush_ms is not None and waited >= self.flush_ms)):
+            self.flush()
+
+    def flush(self):
+        """
+        Records every buffered score in one rewrite of the score file, made
+        while holding the lock. The file is replaced in one step, so readers
+        never see it half written.
+        """
+        if not self.pending:
+            return
+        with exclusive_lock(self.lock_name):
+            try:
+                with open(self.filename) as f:
+                    scores = parse_scores(f)
+            except IOError:
+                scores = []
+            scores = merge_scores(scores, self.pending)
+            temporary = "{0}.{1}.tmp".format(self.filename, os.getpid())
+            with open(temporary, "w") as f:
+                f.write("".join(name + " " + str(score) + "\n"
+                                for name, score in scores))
+            replace_file(temporary, self.filename)
+        self.pending = []
+        self.flushes += 1
+
+    def close(self):
+        """Flushes the remaining scores."""
+        self.flush()
+
+
+def write_scores(task):
+    """
+    Given a task (filename, writer index, number of scores, batch_size,
+    flush_ms), writes that many scores named after the writer. Returns the
+    number of flushes. Runs in a worker process.
+    """
+    filename, index, count, batch_size, flush_ms = task
+    with ScoreWriter(filename, batch_size, flush_ms) as writer:
+        for score in range(count):
+            writer.write("writer{0}".format(index), score)
+    return writer.flushes
+
+
+def organizer_scores(task):
+    """
+    Same as write_scores, but with the unlocked ScoreOrganizer.update_score
+    for comparison. Returns the number of rewrites.
+    """
+    filename, index, count, _, _ = task
+    for score in range(count):
+        ScoreOrganizer("writer{0}".format(index), score,
+                       filename).update_score()
+    return count
+
+
+def stress(filename, processes=4, scores=100, batch_size=1, flush_ms=None,
+           worker=write_scores):
+    """
+    Runs processes writers at once, each writing scores scores to filename
+    with worker. Returns a dict of the scores expected and found, the lost
+    scores, whether the file is sorted, the elapsed time and the scores/s.
+    """
+    # Imported here, as Processing's Jython has no concurrent.futures.
+    from concurrent.futures import ProcessPoolExecutor
+    tasks = [(filename, index, scores, batch_size, flush_ms)
+             for index in range(processes)]
+    start = time()
+    with ProcessPoolExecutor(processes) as executor:
+        flushes = sum(executor.map(worker, tasks))
+    elapsed = time() - start
+    with open(filename) as f:
+        found = parse_scores(f)
+    expected = set(("Writer{0}".format(index), score)
+                   for index in range(processes) for score in range(scores))
+    values = [score for _, score in found]
+    return {"expected": len(expected), "found": len(found),
+            "lost": len(expected - set(found)),
+            "sorted": values == sorted(values, reverse=True),
+            "flushes": flushes, "elapsed": elapsed,
+            "scores_per_second": len(expected) / elapsed if elapsed else 0.0}
+
+
+def main(argv=None):
+    """Parses the command line and runs the stress test."""
+    parser = ArgumentParser(description="Concurrent score writer stress test.")
+    parser.add_argument("--file", default="stress_scores.txt")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--scores", type=int, default=200,
+                        help="scores written by each process")
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--flush-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    runs = [("unlocked", 1, organizer_scores)]
+    for batch_size in sorted(set([1, args.batch_size])):
+        runs.append(("batch {0}".format(batch_size), batch_size, write_scores))
+    for label, batch_size, worker in runs:
+        if os.path.exists(args.file):
+            os.remove(args.file)
+        result = stress(args.file, args.processes, args.scores, batch_size,
+                        args.flush_ms, worker)
+        print("{0:10s} {1}/{2} scores, {3} lost, {4} rewrites, {5:.2f}s, "
+              "{6:.0f} scores/s".format(
+                  label, result["found"], result["expected"], result["lost"],
+                  result["flushes"], result["elapsed"],
+                  result["scores_per_second"]))
+    for name in (args.file, args.file + ".lock"):
+        if os.path.exists(name):
+            os.remove(name)
+
+
+if __name__ == "__main__":
+    main()
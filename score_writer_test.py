@@ -0,0 +1,63 @@
+# Test for the ScoreWriter class and the stress test
+from score_writer import (ScoreWriter, exclusive_lock, merge_scores,
+                          parse_scores, stress)
+
+
+def test_merge_scores():
+    """New scores are merged in order, after equal recorded scores."""
+    scores = [("Kimi", 32), ("Lucky", 30), ("Happy", 10)]
+    merged = merge_scores(scores, [("Andy", 30), ("Bo", 50), ("Cy", 1)])
+    assert merged == [("Bo", 50), ("Kimi", 32), ("Lucky", 30), ("Andy", 30),
+                      ("Happy", 10), ("Cy", 1)]
+    assert parse_scores(["Lucky go 30\n", "\n"]) == [("Lucky go", 30)]
+
+
+def test_exclusive_lock(tmp_path):
+    """The lock file is created, and the lock released after the body."""
+    lock_name = str(tmp_path / "scores.txt.lock")
+    for _ in range(2):
+        with exclusive_lock(lock_name):
+            assert (tmp_path / "scores.txt.lock").exists()
+
+
+def test_batches(tmp_path):
+    """Scores are written when the batch is full or on close."""
+    filename = str(tmp_path / "scores.txt")
+    with ScoreWriter(filename, batch_size=3) as writer:
+        for name, score in (("a", 1), ("b", 3), ("c", 2), ("d", 4)):
+            writer.write(name, score)
+        assert writer.flushes == 1
+        assert len(writer.pending) == 1
+    assert writer.flushes == 2
+    with open(filename) as f:
+        assert parse_scores(f) == [("D", 4), ("B", 3), ("C", 2), ("A", 1)]
+
+
+def test_flush_ms(tmp_path):
+    """A batch is flushed once its oldest score is old enough."""
+    filename = str(tmp_path / "scores.txt")
+    writer = ScoreWriter(filename, batch_size=100, flush_ms=0)
+    writer.write("a", 1)
+    assert writer.flushes == 1
+    writer = ScoreWriter(filename, batch_size=100, flush_ms=60000)
+    writer.write("b", 2)
+    writer.write("c", 3)
+    assert writer.flushes == 0
+    writer.close()
+    with open(filename) as f:
+        assert len(parse_scores(f)) == 3
+
+
+def test_stress(tmp_path):
+    """Concurrent writers lose nothing, and batches rewrite less often."""
+    results = []
+    for batch_size in (1, 20):
+        filename = str(tmp_path / "scores{0}.txt".format(batch_size))
+        result = stress(filename, processes=4, scores=60,
+                        batch_size=batch_size)
+        assert result["found"] == result["expected"] == 240
+        assert result["lost"] == 0
+        assert result["sorted"]
+        results.append(result)
+    assert results[0]["flushes"] == 240
+    assert results[1]["flushes"] == 12
@@ -0,0 +1,286 @@
+# Creates an instance of the Search class, a negamax alpha-beta search over
+# bitboard positions used by the computer player.
+from time import time
+from position import (bit_count, squares, legal_mask, flip_mask,
+                      frontier_mask, get_masks, get_zobrist_keys)
+from transposition import EXACT, LOWER, UPPER
+
+INFINITY = 1 << 30
+# Final disc differences are scaled so that they outweigh any evaluation.
+WIN_SCALE = 1000
+CORNER_WEIGHT = 10
+MOBILITY_WEIGHT = 1
+# Weight of the difference in frontier sizes (empty squares next to the
+# opponent's discs), the moves a player may get later.
+POTENTIAL_MOBILITY_WEIGHT = 1
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside the search once the time budget has been used up or the
+    search has been cancelled.
+    """
+
+
+class Search:
+    """
+    Negamax search with alpha-beta pruning and iterative deepening.
+
+    Positions are passed as the bitboards of the player to move (own) and
+    the opponent (opp), with their Zobrist key and whether black is to move.
+    Moves are returned as bit indices.
+
+    Attributes
+    ----------
+    TILES_DIMENS : int
+        Number of tiles per side of the square board.
+    masks : instance of the Masks class.
+        Precomputed masks for the board size.
+    keys : instance of the ZobristKeys class.
+        Zobrist keys for the board size.
+    table : instance of the TranspositionTable class, or None.
+        Results shared between transpositions and iterations.
+    corners : int
+        Bitboard of the four corner squares.
+    max_depth : int
+        Deepest iteration of the iterative deepening.
+    check_interval : int
+        Number of nodes between two checks of the clock.
+    deadline : float
+        Wall-clock time at which the current search must stop.
+    cancelled : Bool
+        Conditional for stopping the current search early, set from another
+        thread. Stays set until cleared.
+    cancel_event : Event or None
+        Event for stopping the current search early, set from another
+        process. Checked along with cancelled.
+    nodes : int
+        Counter of nodes visited by the current search.
+    stats : dict
+        Statistics of the last completed call to choose_move.
+
+    Methods
+    -------
+    choose_move
+        Given a position and a time budget (in seconds), returns the best
+        move found by iterative deepening.
+    search_root
+        Searches every root move to the given depth. Returns the best move and
+        its score.
+    child_key
+        Returns the key of a position after a move.
+    negamax
+        Returns the score of a position searched to the given depth, from the
+        point of view of the player to move.
+    evaluate
+        Returns the static score of a position for the player to move.
+    nodes_per_second
+        Returns the search speed of the last call to choose_move.
+    """
+    def __init__(self, TILES_DIMENS, max_depth=60, table=None):
+        """
+        Parameters
+        ----------
+        TILES_DIMENS : int
+            Number of tiles per side of the square board.
+        max_depth : int (default 60)
+            Deepest iteration of the iterative deepening.
+        table : instance of the TranspositionTable class (default None)
+            Transposition table, or None to search without one.
+        """
+        self.TILES_DIMENS = TILES_DIMENS
+        self.masks = get_masks(TILES_DIMENS)
+        self.keys = get_zobrist_keys(TILES_DIMENS)
+        self.table = table
+        last = TILES_DIMENS - 1
+        self.corners = 0
+        for row, col in ((0, 0), (0, last), (last, 0), (last, last)):
+            self.corners |= 1 << (row * TILES_DIMENS + col)
+        self.max_depth = max_depth
+        self.check_interval = 1024
+        self.deadline = float("inf")
+        self.cancelled = False
+        self.cancel_event = None
+        self.nodes = 0
+        self.stats = {}
+
+    def choose_move(self, own, opp, time_budget, max_depth=None,
+                    black=True, key=None):
+        """
+        Given a position and a time budget (in seconds), returns the best
+        move found by iterative deepening. Returns None without legal moves.
+        The key is computed from the bitboards when not given.
+        """
+        if max_depth is None:
+            max_depth = self.max_depth
+        if key is None:
+            if black:
+                key = self.keys.hash(own, opp, True)
+            else:
+                key = self.keys.hash(opp, own, False)
+        start = time()
+        self.deadline = start + time_budget
+        self.nodes = 0
+        if self.table is not None:
+            self.table.new_search()
+            self.table.reset_stats()
+        moves = squares(legal_mask(own, opp, self.masks))
+        best_move, best_score, depth_reached = None, 0, 0
+        if moves:
+            best_move = moves[0]
+        else:
+            max_depth = 0
+        for depth in range(1, max_depth + 1):
+            try:
+                move, score = self.search_root(own, opp, moves, depth,
+                                               black, key)
+            except SearchTimeout:
+                break
+            best_move, best_score, depth_reached = move, score, depth
+            # Search the previous best move first at the next depth.
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN_SCALE or len(moves) < 2:
+                break  # Result is exact or there is no choice to make.
+        elapsed = time() - start
+        self.stats = {"nodes": self.nodes, "elapsed": elapsed,
+                      "depth": depth_reached, "score": best_score,
+                      "move": best_move}
+        if self.table is not None:
+            self.stats["tt_probes"] = self.table.probes
+            self.stats["tt_hits"] = self.table.hits
+            self.stats["tt_hit_rate"] = self.table.hit_rate()
+        return best_move
+
+    def search_root(self, own, opp, moves, depth, black=True, key=None):
+        """
+        Searches every root move to the given depth. Returns the best move and
+        its score.
+        """
+        alpha = -INFINITY
+        best_move = None
+        for move in moves:
+            flips = flip_mask(own, opp, move, self.masks)
+            child_key = None
+            if key is not None:
+                child_key = self.child_key(key, move, flips, black)
+            score = -self.negamax(opp ^ flips, own | flips | (1 << move),
+                                  depth - 1, -INFINITY, -alpha, not black,
+                                  child_key)
+            if best_move is None or score > alpha:
+                alpha, best_move = score, move
+        if self.table is not None and key is not None:
+            self.table.store(key, depth, EXACT, alpha, best_move)
+        return best_move, alpha
+
+    def child_key(self, key, move, flips, black):
+        """
+        Given the key of a position, returns the key after the player to move
+        (black or white) plays move, flipping the tiles of flips.
+        """
+        keys = self.keys
+        key ^= keys.side
+        if black:
+            key ^= keys.black[move]
+        else:
+            key ^= keys.white[move]
+        flip = keys.flip
+        while flips:
+            low = flips & -flips
+            key ^= flip[low.bit_length() - 1]
+            flips ^= low
+        return key
+
+    def negamax(self, own, opp, depth, alpha, beta, black=True, key=None):
+        """
+        Returns the score of a position searched to the given depth, from the
+        point of view of the player to move.
+        """
+        self.nodes += 1
+        if not self.nodes % self.check_interval and (
+                self.cancelled or time() > self.deadline or
+                (self.cancel_event is not None and
+                 self.cancel_event.is_set())):
+            raise SearchTimeout()
+        masks = self.masks
+        moves = legal_mask(own, opp, masks)
+        if not moves:
+            if not legal_mask(opp, own, masks):  # Game over.
+                return (bit_count(own) - bit_count(opp)) * WIN_SCALE
+            if key is not None:
+                key ^= self.keys.side
+            return -self.negamax(opp, own, depth, -beta, -alpha,  # Pass.
+                                 not black, key)
+        if depth <= 0:
+            return self.evaluate(own, opp, moves)
+
+        table = self.table
+        if key is None:
+            table = None
+        ordered = squares(moves)
+        if table is not None:
+            entry = table.probe(key)
+            if entry >= 0:
+                if table.depths[entry] >= depth:
+                    score, bound = table.scores[entry], table.bounds[entry]
+                    if bound == EXACT:
+                        return score
+                    elif bound == LOWER and score > alpha:
+                        alpha = score
+                    elif bound == UPPER and score < beta:
+                        beta = score
+                    if alpha >= beta:
+                        return score
+                best_move = table.moves[entry]
+                if best_move in ordered:  # Search the stored move first.
+                    ordered.remove(best_move)
+                    ordered.insert(0, best_move)
+        alpha_start = alpha
+
+        best, best_move = -INFINITY, -1
+        for move in ordered:
+            flips = flip_mask(own, opp, move, masks)
+            child_key = None
+            if table is not None:
+                child_key = self.child_key(key, move, flips, black)
+            score = -self.negamax(opp ^ flips, own | flips | (1 << move),
+                                  depth - 1, -beta, -alpha, not black,
+                                  child_key)
+            if score > best:
+                best, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+
+        if table is not None:
+            if best <= alpha_start:
+                bound = UPPER
+            elif best >= beta:
+                bound = LOWER
+            else:
+                bound = EXACT
+            table.store(key, depth, bound, best, best_move)
+        return best
+
+    def evaluate(self, own, opp, moves):
+        """
+        Returns the static score of a position for the player to move, given
+        the bitboard of its legal moves.
+        """
+        corners = (bit_count(own & self.corners) -
+                   bit_count(opp & self.corners))
+        masks = self.masks
+        mobility = bit_count(moves) - bit_count(legal_mask(opp, own, masks))
+        empty = masks.full & ~(own | opp)
+        potential = (bit_count(frontier_mask(opp, empty, masks)) -
+                     bit_count(frontier_mask(own, empty, masks)))
+        return (CORNER_WEIGHT * corners + MOBILITY_WEIGHT * mobility +
+                POTENTIAL_MOBILITY_WEIGHT * potential)
+
+    def nodes_per_second(self):
+        """Returns the search speed of the last call to choose_move."""
+        elapsed = self.stats.get("elapsed", 0)
+        if not elapsed:
+            return 0
+        return float(self.stats["nodes"]) / elapsed
@@ -0,0 +1,86 @@
+# Test the Search class.
+from position import bit_count, legal_mask
+from search import Search, WIN_SCALE
+from transposition import TranspositionTable
+from tiles import Tiles
+
+
+def initial_sides(dimens):
+    """Returns the bitboards of black and white at the start of a game."""
+    tiles = Tiles(dimens * 10, dimens * 10, 10, dimens)
+    tiles.initial_tiles(False)
+    return tiles.position.sides(True)
+
+
+def test_choose_move():
+    """Test the choose move method on the initial position."""
+    search = Search(8)
+    own, opp = initial_sides(8)
+    move = search.choose_move(own, opp, 10, max_depth=3)
+    assert move in (19, 26, 37, 44)
+    assert search.stats["depth"] == 3
+    assert search.stats["nodes"] > 0
+    assert search.nodes_per_second() > 0
+
+
+def test_choose_move_no_moves():
+    """Without legal moves there is nothing to choose."""
+    search = Search(4)
+    assert search.choose_move(1, 0, 1) is None
+
+
+def test_time_budget():
+    """The search stops once the time budget has been spent."""
+    search = Search(8)
+    search.check_interval = 1
+    own, opp = initial_sides(8)
+    move = search.choose_move(own, opp, 0.05)
+    assert move in (19, 26, 37, 44)
+    assert search.stats["elapsed"] < 1
+    assert search.stats["depth"] < search.max_depth
+
+
+def test_solves_small_board():
+    """The 4x4 board is searched to the end within the budget."""
+    search = Search(4)
+    own, opp = initial_sides(4)
+    search.choose_move(own, opp, 30)
+    # With perfect play white wins the 4x4 game by 8 tiles.
+    assert search.stats["score"] == -8 * WIN_SCALE
+
+
+def test_negamax_pruning():
+    """Alpha-beta returns the same score as a full-width search."""
+    search = Search(6)
+    own, opp = initial_sides(6)
+    full = search.negamax(own, opp, 3, -WIN_SCALE * 100, WIN_SCALE * 100)
+    assert search.search_root(own, opp, [8, 13, 22, 27], 3)[1] == full
+
+
+def test_transposition_table():
+    """A transposition table keeps the score and saves nodes."""
+    own, opp = initial_sides(6)
+    plain = Search(6)
+    plain.choose_move(own, opp, 30, max_depth=5)
+    hashed = Search(6, table=TranspositionTable())
+    hashed.choose_move(own, opp, 30, max_depth=5)
+    assert hashed.stats["score"] == plain.stats["score"]
+    assert hashed.stats["nodes"] < plain.stats["nodes"]
+    assert hashed.stats["tt_hits"] > 0
+    assert 0 < hashed.stats["tt_hit_rate"] <= 1
+
+
+def test_evaluate_potential_mobility():
+    """The evaluation counts the frontier sizes kept by Position."""
+    tiles = Tiles(80, 80, 10, 8)
+    tiles.initial_tiles(False)
+    tiles.make_move(2, 3)
+    position = tiles.position
+    own, opp = position.sides(False)
+    search = Search(8)
+    moves = legal_mask(own, opp, search.masks)
+    mobility = bit_count(moves) - bit_count(legal_mask(opp, own,
+                                                       search.masks))
+    potential = position.frontier_size(False) - position.frontier_size(True)
+    assert potential == 8  # 13 empty squares next to black, 5 to white.
+    assert search.evaluate(own, opp, moves) == mobility + potential
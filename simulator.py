@@ -0,0 +1,182 @@
+# Plays computer-vs-computer Othello games with the Board rules and no
+# rendering, run from the command line:
+#     python simulator.py --games 100 --black random --white negamax:0.05
+from argparse import ArgumentParser
+from time import time
+from board import Board
+from comp_ai import CompAI
+from game_controller import GameController
+
+
+def make_ai(tiles, spec, seed=None):
+    """
+    Given a Tiles instance and an AI spec "strategy[:thinking_time]", such as
+    "random" or "negamax:0.1", returns a CompAI instance playing on tiles.
+    A budget ending in "p", such as "mcts:500p", is a number of playouts.
+    """
+    strategy, _, thinking_time = spec.partition(":")
+    if thinking_time.endswith("p"):
+        return CompAI(tiles, strategy, seed=seed,
+                      playouts=int(thinking_time[:-1]))
+    if thinking_time:
+        return CompAI(tiles, strategy, float(thinking_time), seed=seed)
+    return CompAI(tiles, strategy, seed=seed)
+
+
+class Simulator:
+    """
+    Plays games between two computer players using the rules of Board,
+    without any rendering or frame delays.
+
+    Attributes
+    ----------
+    TILES_DIMENS : int
+        Number of tiles per side of the square board.
+    black : str
+        AI spec of the black player, see make_ai.
+    white : str
+        AI spec of the white player, see make_ai.
+
+    Methods
+    -------
+    new_board
+        Returns a Board with the initial tiles placed and no output.
+    play_game
+        Plays one game to the end. Returns a dictionary of the result.
+    play_games
+        Plays a number of games. Returns a dictionary of totals.
+    """
+    def __init__(self, TILES_DIMENS=8, black="random", white="random"):
+        """
+        Parameters
+        ----------
+        TILES_DIMENS : int (default 8)
+            Number of tiles per side of the square board.
+        black : str (default random)
+            AI spec of the black player.
+        white : str (default random)
+            AI spec of the white player.
+        """
+        self.TILES_DIMENS = TILES_DIMENS
+        self.black = black
+        self.white = white
+
+    def new_board(self):
+        """Returns a Board with the initial tiles placed and no output."""
+        dimens = self.TILES_DIMENS
+        board = Board(dimens, dimens, dimens, 1,
+                      GameController(dimens, dimens))
+        board.verbose = False
+        board.tiles.initial_tiles(False)
+        return board
+
+    def play_game(self, seed=None, writer=None):
+        """
+        Plays one game to the end. Returns a dictionary of the result, with
+        the final tile counts and the winner ("black", "white" or "tie").
+        Appends the game to writer, a GameWriter, if given.
+        """
+        board = self.new_board()
+        black_seed = white_seed = None
+        if seed is not None:
+            black_seed, white_seed = 2 * seed, 2 * seed + 1
+        players = {True: make_ai(board.tiles, self.black, black_seed),
+                   False: make_ai(board.tiles, self.white, white_seed)}
+        board.ai = players[False]
+        moves = 0
+        try:
+            while True:
+                board.check_winning_conditions()
+                if board.game_over:
+                    break
+                board.get_legal_moves()
+                if not board.tiles.legal_moves:
+                    board.no_legal_moves()
+                    continue
+                row, col = players[board.place_black].choose_move()
+                board.place_tile(row, col)
+                moves += 1
+        finally:
+            for player in players.values():
+                player.close()
+
+        if writer is not None:
+            writer.write_board(board)
+        if board.gc.user_wins:
+            winner = "black"
+        elif board.gc.comp_wins:
+            winner = "white"
+        else:
+            winner = "tie"
+        return {"black": board.tiles.bk_tiles, "white": board.tiles.wt_tiles,
+                "winner": winner, "moves": moves}
+
+    def play_games(self, games, seed=None, writer=None):
+        """
+        Plays a number of games, appending them to writer if given. Returns a
+        dictionary with the number of wins per color, the mean disc
+        difference (black minus white), the elapsed time and the games per
+        second.
+        """
+        totals = {"games": 0, "black": 0, "white": 0, "tie": 0,
+                  "disc_difference": 0.0}
+        start = time()
+        for game in range(games):
+            game_seed = None
+            if seed is not None:
+                game_seed = seed + game
+            result = self.play_game(game_seed, writer)
+            totals["games"] += 1
+            totals[result["winner"]] += 1
+            totals["disc_difference"] += result["black"] - result["white"]
+        elapsed = time() - start
+        if games:
+            totals["disc_difference"] /= games
+        totals["elapsed"] = elapsed
+        totals["games_per_second"] = games / elapsed if elapsed else 0.0
+        return totals
+
+
+def main(argv=None):
+    """Parses the command line, plays the games and prints the totals."""
+    parser = ArgumentParser(description="Headless Othello self-play.")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--dimens", type=int, default=8)
+    parser.add_argument("--black", default="random",
+                        help="AI spec, strategy[:seconds or playouts + p]")
+    parser.add_argument("--white", default="random",
+                        help="AI spec, strategy[:seconds or playouts + p]")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--metrics", default=None,
+                        help="write timings and counters to this file "
+                             "(.json for JSON, else Prometheus text)")
+    parser.add_argument("--record", default=None,
+                        help="append the games to this game archive")
+    args = parser.parse_args(argv)
+
+    instrumentation = None
+    if args.metrics:
+        from instrumentation import Instrumentation
+        instrumentation = Instrumentation()
+        instrumentation.enable()
+    simulator = Simulator(args.dimens, args.black, args.white)
+    writer = None
+    if args.record:
+        from game_record import GameWriter
+        writer = GameWriter(args.record)
+    totals = simulator.play_games(args.games, args.seed, writer)
+    if writer is not None:
+        writer.close()
+    if instrumentation is not None:
+        instrumentation.disable()
+        instrumentation.dump(args.metrics)
+    print("{0} games: black {1}, white {2}, tie {3}".format(
+        totals["games"], totals["black"], totals["white"], totals["tie"]))
+    print("mean disc difference (black - white): {0:+.2f}".format(
+        totals["disc_difference"]))
+    print("{0:.2f}s, {1:.1f} games/s".format(totals["elapsed"],
+                                            totals["games_per_second"]))
+
+
+if __name__ == "__main__":
+    main()
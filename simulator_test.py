@@ -0,0 +1,51 @@
+# Test the Simulator class.
+from simulator import Simulator, make_ai
+from tiles import Tiles
+
+
+def test_make_ai():
+    """Test the make_ai function."""
+    tiles = Tiles(400, 400, 100, 4)
+    ai = make_ai(tiles, "random", 3)
+    assert ai.tiles is tiles
+    assert ai.strategy == "random"
+    ai = make_ai(tiles, "negamax:0.5")
+    assert ai.strategy == "negamax"
+    assert ai.thinking_time == 0.5
+    ai = make_ai(tiles, "mcts:500p")
+    assert ai.strategy == "mcts"
+    assert ai.playouts == 500
+
+
+def test_new_board():
+    """The board starts with the initial tiles and prints nothing."""
+    board = Simulator(6).new_board()
+    assert board.verbose is False
+    assert board.tiles.bk_tiles == 2
+    assert board.tiles.wt_tiles == 2
+    assert len(board.tiles.all_tiles) == 6
+
+
+def test_play_game():
+    """A game is played to the end with consistent results."""
+    simulator = Simulator(6)
+    result = simulator.play_game(seed=4)
+    assert result["black"] + result["white"] <= 36
+    assert result["moves"] == result["black"] + result["white"] - 4
+    if result["black"] > result["white"]:
+        assert result["winner"] == "black"
+    elif result["white"] > result["black"]:
+        assert result["winner"] == "white"
+    else:
+        assert result["winner"] == "tie"
+    assert simulator.play_game(seed=4) == result  # Seeded games repeat.
+
+
+def test_play_games():
+    """Test the play_games method."""
+    simulator = Simulator(4, "random", "negamax:0.5")
+    totals = simulator.play_games(5, seed=0)
+    assert totals["games"] == 5
+    assert totals["black"] + totals["white"] + totals["tie"] == 5
+    assert totals["white"] == 5  # White wins 4x4 with perfect play.
+    assert totals["games_per_second"] > 0
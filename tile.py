@@ -1,4 +1,5 @@
 # Creates an instance of the Tile class with specified coordinates and color.
+from renderer import ProcessingRenderer
 
 
 class Tile:
@@ -20,6 +21,8 @@ class Tile:
     -------
     display()
         If colored, draws the tile onto its constructed coordinates.
+    render(renderer)
+        If colored, draws the tile with the given renderer.
     """
     def __init__(self, coordinates, color="blank", spacing=100):
         """
@@ -35,18 +38,23 @@ class Tile:
         self.color = color
         self.x = coordinates[0]
         self.y = coordinates[1]
-        self.diameter = spacing - 10
+        # Keeps a visible gap between tiles on large boards too.
+        self.diameter = max(spacing - 10, spacing * 4 // 5)
 
     def display(self):
         """If colored, draws the tile onto its constructed coordinates."""
+        self.render(ProcessingRenderer())
+
+    def render(self, renderer):
+        """If colored, draws the tile with the given renderer."""
         WHITE = 255
         BLACK = 0
         if self.color == "blank":
             return
 
-        stroke(0)
+        renderer.stroke(0)
         if self.color == "white":
-            fill(WHITE)
+            renderer.fill(WHITE)
         elif self.color == "black":
-            fill(BLACK)
-        ellipse(self.x, self.y, self.diameter, self.diameter)
+            renderer.fill(BLACK)
+        renderer.ellipse(self.x, self.y, self.diameter, self.diameter)
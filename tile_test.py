@@ -15,3 +15,6 @@ def test_constructor():
     assert tile2.x == 30
     assert tile2.y == 100
     assert tile2.diameter == 90
+
+    tile3 = Tile((10, 10), spacing=20)
+    assert tile3.diameter == 16
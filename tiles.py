@@ -1,7 +1,133 @@
 # Creates an instance of the Tiles class that generates all of the tile objects
 # onto the board.
 from tile import Tile
-from copy import deepcopy
+from position import Position, bit_count, squares, flip_mask, get_masks
+from rays import LANE_RAYS, get_rays
+try:
+    from collections.abc import MutableMapping
+except ImportError:  # Processing's Jython is Python 2.7.
+    from collections import MutableMapping
+
+
+class LazyFlips(MutableMapping):
+    """
+    Legal moves of a position, mapped to their flippable tiles like a dict,
+    but computing the flips of a move only when it is looked up. Generating
+    the moves of a frame then costs one bitboard, whatever the number of
+    moves.
+
+    Attributes
+    ----------
+    TILES_DIMENS : int
+        Number of tiles per side of the square board.
+    own : int
+        Bitboard of the player to move when the moves were generated.
+    opp : int
+        Bitboard of the opponent when the moves were generated.
+    moves : int
+        Bitboard of the legal moves.
+    order : list of tuples
+        Index-coordinates of the legal moves, in square order.
+    flips : dict
+        key: index-coordinates of a move.
+        value: set of the index-coordinates of its flippable tiles, for the
+        moves looked up or assigned so far.
+    computed : int
+        Counter of flip sets computed.
+
+    Methods
+    -------
+    square
+        Returns the square of index-coordinates, or None.
+    flip_counts
+        Returns the number of flippable tiles of every move.
+    """
+    def __init__(self, own, opp, moves, TILES_DIMENS):
+        """
+        Parameters
+        ----------
+        own : int
+            Bitboard of the player to move.
+        opp : int
+            Bitboard of the opponent.
+        moves : int
+            Bitboard of the legal moves of the player to move.
+        TILES_DIMENS : int
+            Number of tiles per side of the square board.
+        """
+        self.TILES_DIMENS = TILES_DIMENS
+        self.own = own
+        self.opp = opp
+        self.moves = moves
+        self.order = [divmod(square, TILES_DIMENS)
+                      for square in squares(moves)]
+        self.flips = {}
+        self.computed = 0
+
+    def __getitem__(self, key):
+        flips = self.flips.get(key)
+        if flips is not None:
+            return flips
+        if key not in self:
+            raise KeyError(key)
+        n = self.TILES_DIMENS
+        bits = flip_mask(self.own, self.opp, self.square(key), get_masks(n))
+        flips = self.flips[key] = set(divmod(square, n)
+                                      for square in squares(bits))
+        self.computed += 1
+        return flips
+
+    def __setitem__(self, key, flips):
+        if key not in self:
+            self.order.append(key)
+        self.flips[key] = flips
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self.order.remove(key)
+        self.flips.pop(key, None)
+        square = self.square(key)
+        if square is not None:
+            self.moves &= ~(1 << square)
+
+    def __contains__(self, key):
+        if key in self.flips:
+            return True
+        square = self.square(key)
+        return square is not None and bool(self.moves >> square & 1)
+
+    def __iter__(self):
+        return iter(self.order)
+
+    def __len__(self):
+        return len(self.order)
+
+    def __repr__(self):
+        return "LazyFlips({0!r})".format(self.order)
+
+    def square(self, key):
+        """
+        Returns the square of index-coordinates on the board, or None for
+        any other key.
+        """
+        try:
+            row, col = key
+        except (TypeError, ValueError):
+            return None
+        n = self.TILES_DIMENS
+        if 0 <= row < n and 0 <= col < n:
+            return row * n + col
+        return None
+
+    def flip_counts(self):
+        """
+        Returns the number of flippable tiles of every move, in order,
+        counted on the bitboards without building the flip sets.
+        """
+        n, masks = self.TILES_DIMENS, get_masks(self.TILES_DIMENS)
+        return [bit_count(flip_mask(self.own, self.opp, row * n + col, masks))
+                for row, col in self.order]
 
 
 class Tiles:
@@ -21,33 +147,63 @@ class Tiles:
     TILES_DIMENS : int
         Amount of tiles per side of the square board
     all_tiles : list of lists of Tile objects
-        Completes each row/column of tiles on the board
+        Completes each row/column of tiles on the board, TILES_DIMENS rows
+        of TILES_DIMENS tiles whatever the window size
+    square_tiles : list of Tile objects
+        The tiles of all_tiles indexed by square (row * TILES_DIMENS + col).
+    rays : list of tuples, or None
+        Squares met walking outward from each square in each direction,
+        shared by every Tiles instance of the same size, see rays.py. None
+        until the first call to check_each_lane.
+    position : instance of the Position class.
+        Bitboards of the black and white tiles, kept in step with all_tiles.
     done_initial : Bool
         Conditional for initial placement of tiles
     bk_tiles : int
         Counter of black tiles, updated per frame
     wt_tiles : int
         Counter of white tiles, updated per frame
-    legal_moves : dict
+    legal_moves : dict, or instance of the LazyFlips class.
         key: tuple containing index-coordinates of the target tile.
         value: Set containing the index-coordinates of flippable tiles
-        Refreshed per frame.
+        Rebuilt only when the position or the player to move changes.
+    lazy_flips : Bool
+        Conditional for computing the flippable tiles of a legal move only
+        when it is looked up in legal_moves.
+    legal_moves_key : tuple
+        (position version, place_black) that legal_moves was built for.
+    cache_hits : int
+        Counter of generate_legal_moves calls answered from legal_moves.
+    cache_misses : int
+        Counter of generate_legal_moves calls that rebuilt legal_moves.
     flip_set : set
         Contains the index-coordinates of flippable tiles for a legal move.
+    dirty : set
+        Index-coordinates of the tiles changed since they were last drawn.
     place_black : Bool
         Conditional for player's turn vs computer's turn
 
     Methods
     -------
     display
-        Call the display method for each tile.
+        Draws the tiles changed since the last call with a renderer, or
+        every tile without one.
+    mark_dirty
+        Marks every tile to be drawn again.
     initial_tiles
         If not yet completed, place the initial tiles on the board.
     update_color
         Update a tile at the row_index, column_index to color
     generate_legal_moves
-        Iterates through every Tile object on the board to check for legal
-        moves, also storing the coordinates of flippable tiles per legal move.
+        Uses the bitboard position to find every legal move, with the
+        coordinates of flippable tiles per legal move, computed when looked
+        up if lazy_flips. Skipped when nothing has changed since the last
+        call.
+    make_move
+        Plays a move at the row_index, column_index for the player to move in
+        place and passes the turn. Takes back with unmake_move.
+    unmake_move
+        Takes back the last move made with make_move.
     check_each_lane
         Given a tile instance, its row-index, column-index, and the specified
         search lane on the board, updates self.flip_set with the coordinates of
@@ -77,15 +233,24 @@ class Tiles:
         self.TILES_DIMENS = TILES_DIMENS
         # Initialize a list of lists of tiles objects.
         self.all_tiles = [[Tile((self.SPACING * i - self.shift,
-                                 self.SPACING * j - self.shift))
-                           for i in range(1, self.WIDTH // self.SPACING + 1)]
-                          for j in range(1, self.HEIGHT // self.SPACING + 1)]
+                                 self.SPACING * j - self.shift),
+                                spacing=self.SPACING)
+                           for i in range(1, TILES_DIMENS + 1)]
+                          for j in range(1, TILES_DIMENS + 1)]
+        self.square_tiles = [tile for row in self.all_tiles for tile in row]
+        self.rays = None  # Only the lane scans need them.
+        self.position = Position(TILES_DIMENS)
         self.done_initial = False
         self.bk_tiles = 0
         self.wt_tiles = 0
         self.legal_moves = {}
+        self.lazy_flips = True
+        self.legal_moves_key = None
+        self.cache_hits = 0
+        self.cache_misses = 0
         self.flip_set = set()
         self.place_black = True
+        self.dirty = set()
 
     def initial_tiles(self, done):
         """If not yet completed, place the initial tiles on the board."""
@@ -106,95 +271,111 @@ class Tiles:
         elif color == "white":
             self.wt_tiles += 1
         self.all_tiles[row][col].color = color
+        self.position.set_color(row, col, color)
+        self.dirty.add((row, col))
 
     def generate_legal_moves(self):
         """
-        Iterates through every Tile object on the board to check for legal
-        moves, also storing the coordinates of flippable tiles per legal move.
+        Uses the bitboard position to find every legal move, also storing the
+        coordinates of flippable tiles per legal move. With lazy_flips, the
+        flippable tiles of a move are only computed when it is looked up,
+        which for a move placed by Board happens once. Skipped when nothing
+        has changed since the last call.
         """
+        position = self.position
+        key = (position.version, self.place_black)
+        if key == self.legal_moves_key:
+            self.cache_hits += 1
+            return
+        self.cache_misses += 1
+        self.legal_moves_key = key
+        moves = position.legal_moves(self.place_black)
+        if self.lazy_flips:
+            own, opp = position.sides(self.place_black)
+            self.legal_moves = LazyFlips(own, opp, moves, self.TILES_DIMENS)
+            return
         self.legal_moves = {}
-        for row in range(self.TILES_DIMENS):
-            for col in range(self.TILES_DIMENS):
-                potential_tile = self.all_tiles[row][col]
-                if potential_tile.color == "blank":  # Otherwise no action.
-                    self.check_each_lane(potential_tile, row, col, "row")
-                    self.check_each_lane(potential_tile, row, col, "column")
-                    self.check_each_lane(potential_tile, row, col, "tl_diag")
-                    self.check_each_lane(potential_tile, row, col, "tr_diag")
-                    if self.flip_set:
-                        self.legal_moves[(row, col)] = deepcopy(self.flip_set)
-                    self.flip_set = set()  # Reset for each tile.
+        for row, col in position.coordinates(moves):
+            flips = position.flips(row, col, self.place_black)
+            self.legal_moves[(row, col)] = set(position.coordinates(flips))
+
+    def make_move(self, row, col):
+        """
+        Plays a move at the row_index, column_index for the player to move in
+        place and passes the turn. Only the square and the flipped tiles are
+        pushed onto the undo stack of the position. Returns the bitboard of
+        the flipped tiles. The move is not checked.
+        """
+        if self.place_black:
+            color = "black"
+        else:
+            color = "white"
+        flips = self.position.make_move(row, col, self.place_black)
+        self.all_tiles[row][col].color = color
+        self.dirty.add((row, col))
+        for r, c in self.position.coordinates(flips):
+            self.all_tiles[r][c].color = color
+            self.dirty.add((r, c))
+        flipped = bit_count(flips)
+        if self.place_black:
+            self.bk_tiles += flipped + 1
+            self.wt_tiles -= flipped
+        else:
+            self.wt_tiles += flipped + 1
+            self.bk_tiles -= flipped
+        self.place_black = not self.place_black
+        return flips
+
+    def unmake_move(self):
+        """
+        Takes back the last move made with make_move, restoring the tiles,
+        bk_tiles, wt_tiles and the player to move exactly.
+        """
+        square, flips, place_black = self.position.unmake_move()
+        if place_black:
+            color = "white"
+        else:
+            color = "black"
+        row, col = divmod(square, self.TILES_DIMENS)
+        self.all_tiles[row][col].color = "blank"
+        self.dirty.add((row, col))
+        for r, c in self.position.coordinates(flips):
+            self.all_tiles[r][c].color = color
+            self.dirty.add((r, c))
+        flipped = bit_count(flips)
+        if place_black:
+            self.bk_tiles -= flipped + 1
+            self.wt_tiles += flipped
+        else:
+            self.wt_tiles -= flipped + 1
+            self.bk_tiles += flipped
+        self.place_black = place_black
 
     def check_each_lane(self, tile, row, col, lane):
         """
         Given a tile instance, its row-index, column-index, and the specified
         search lane on the board, updates self.flip_set with the coordinates of
-        opponent tiles that will be flipped with this tile placement.
+        opponent tiles that will be flipped with this tile placement. Walks
+        the two precomputed rays of the lane, loaded on the first call.
         """
-
-        if lane == "row":  # Horizontal lane
-            flip_set_one, flip_set_two = set(), set()
-            for c in range(1, self.TILES_DIMENS - col):  # Right
-                flippable = self.check_tile(row, col + c, flip_set_one)
-                if flippable:
-                    flip_set_one.add(flippable)
-                else:
-                    break
-            for c in range(col - 1, -1, -1):  # Left
-                flippable = self.check_tile(row, c, flip_set_two)
-                if flippable:
-                    flip_set_two.add(flippable)
-                else:
-                    break
-
-        elif lane == "column":  # Vertical lane
-            flip_set_one, flip_set_two = set(), set()
-            for r in range(1, self.TILES_DIMENS - row):  # Top
-                flippable = self.check_tile(row + r, col, flip_set_one)
-                if flippable:
-                    flip_set_one.add(flippable)
-                else:
-                    break
-            for r in range(row - 1, -1, -1):  # Bottom
-                flippable = self.check_tile(r, col, flip_set_two)
-                if flippable:
-                    flip_set_two.add(flippable)
-                else:
-                    break
-
-        elif lane == "tl_diag":  # Diagonal reaching top left.
-            flip_set_one, flip_set_two = set(), set()
-            upper_bound = max(row, col)
-            lower_bound = min(row, col)
-            for i in range(1, self.TILES_DIMENS - upper_bound):  # Bottom right
-                flippable = self.check_tile(row + i, col + i, flip_set_one)
-                if flippable:
-                    flip_set_one.add(flippable)
-                else:
-                    break
-            for i in range(1, lower_bound + 1):  # Top left
-                flippable = self.check_tile(row - i, col - i, flip_set_two)
-                if flippable:
-                    flip_set_two.add(flippable)
-                else:
-                    break
-
-        elif lane == "tr_diag":  # Diagonal reaching top right.
-            flip_set_one, flip_set_two = set(), set()
-            bound_one = min(row + 1, self.TILES_DIMENS - col)
-            bound_two = min(self.TILES_DIMENS - row, col + 1)
-            for i in range(1, bound_one):  # Top right
-                flippable = self.check_tile(row - i, col + i, flip_set_one)
-                if flippable:
-                    flip_set_one.add(flippable)
-                else:
-                    break
-            for i in range(1, bound_two):  # Bottom left
-                flippable = self.check_tile(row + i, col - i, flip_set_two)
-                if flippable:
-                    flip_set_two.add(flippable)
-                else:
+        if self.place_black:
+            opponent_color, current_color = "white", "black"
+        else:
+            opponent_color, current_color = "black", "white"
+        tiles = self.square_tiles
+        if self.rays is None:
+            self.rays = get_rays(self.TILES_DIMENS)
+        square_rays = self.rays[row * self.TILES_DIMENS + col]
+        for direction in LANE_RAYS[lane]:
+            line = []
+            for square in square_rays[direction]:
+                color = tiles[square].color
+                if color != opponent_color:
+                    if color == current_color and line:
+                        self.flip_set.update(divmod(flipped, self.TILES_DIMENS)
+                                             for flipped in line)
                     break
+                line.append(square)
 
     def check_tile(self, r, c, flip_set):
         """
@@ -219,9 +400,26 @@ class Tiles:
         else:  # Next is blank.
             return False
 
-    def display(self):
-        """Call the display method for each tile."""
+    def display(self, renderer=None, background=None):
+        """
+        Given a renderer, draws only the tiles changed since the last call,
+        first restoring their squares from the background buffer. Without a
+        renderer, calls the display method for each tile.
+        """
         self.initial_tiles(self.done_initial)
-        for i in range(self.TILES_DIMENS):
-            for j in range(self.TILES_DIMENS):
-                self.all_tiles[i][j].display()
+        if renderer is None:
+            for i in range(self.TILES_DIMENS):
+                for j in range(self.TILES_DIMENS):
+                    self.all_tiles[i][j].display()
+            return
+        for row, col in sorted(self.dirty):
+            if background is not None:
+                renderer.copy(background, col * self.SPACING,
+                              row * self.SPACING, self.SPACING, self.SPACING)
+            self.all_tiles[row][col].render(renderer)
+        self.dirty = set()
+
+    def mark_dirty(self):
+        """Marks every tile to be drawn again."""
+        self.dirty = set((i, j) for i in range(self.TILES_DIMENS)
+                         for j in range(self.TILES_DIMENS))
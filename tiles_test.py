@@ -1,6 +1,8 @@
 # Test the constructor and methods of the Tiles class.
+from random import Random
 from board import Board
-from tiles import Tiles
+from perft import lane_moves
+from tiles import Tiles, LazyFlips
 
 
 def test_constructor():
@@ -25,7 +27,31 @@ def test_constructor():
             assert tile.color == "blank"
             assert tile.y == SPACING * i - tiles1.shift
             assert tile.x == SPACING * j - tiles1.shift
-            assert tile.diameter == 90
+            assert tile.diameter == 40
+
+
+def test_large_board():
+    """Boards much larger than 8x8 fit the same window."""
+    tiles1 = Tiles(800, 800, 25, 32)
+    assert len(tiles1.all_tiles) == 32
+    assert tiles1.all_tiles[31][31].diameter == 20
+    tiles1.initial_tiles(False)
+    tiles1.generate_legal_moves()
+    assert sorted(tiles1.legal_moves) == [(14, 15), (15, 14), (16, 17),
+                                          (17, 16)]
+    tiles1.make_move(14, 15)
+    assert (tiles1.bk_tiles, tiles1.wt_tiles) == (4, 1)
+
+
+def test_window_wider_than_board():
+    """Extra window space adds no tiles, so squares index the board."""
+    tiles1 = Tiles(800, 800, 12, 64)  # Room for 66 tiles per side.
+    assert len(tiles1.all_tiles) == 64
+    assert len(tiles1.square_tiles) == 64 * 64
+    assert tiles1.square_tiles[65] is tiles1.all_tiles[1][1]
+    tiles1.initial_tiles(False)
+    assert sorted(lane_moves(tiles1)) == [(30, 31), (31, 30), (32, 33),
+                                          (33, 32)]
 
 
 def test_initial_tiles():
@@ -77,6 +103,41 @@ def test_generate_legal_moves():
     assert (1, 3) in keys
 
 
+def test_lazy_flips():
+    """Lazy legal moves match the eager ones and only compute what is read."""
+    rng = Random(3)
+    lazy, eager = Tiles(800, 800, 100, 8), Tiles(800, 800, 100, 8)
+    eager.lazy_flips = False
+    for tiles in (lazy, eager):
+        tiles.initial_tiles(False)
+    while True:
+        lazy.generate_legal_moves()
+        eager.generate_legal_moves()
+        moves = lazy.legal_moves
+        assert isinstance(moves, LazyFlips)
+        assert type(eager.legal_moves) is dict
+        assert list(moves) == list(eager.legal_moves)
+        assert all(key in moves for key in eager.legal_moves)
+        assert (8, 0) not in moves and "key" not in moves
+        assert moves.computed == 0
+        assert moves.flip_counts() == [len(flips) for flips in
+                                       eager.legal_moves.values()]
+        if not moves:
+            break
+        key = rng.choice(list(moves))
+        assert moves[key] == eager.legal_moves[key]
+        assert moves.computed == 1
+        assert moves == eager.legal_moves
+        for tiles in (lazy, eager):
+            tiles.make_move(*key)
+
+    lazy.legal_moves["key"] = {(0, 0)}
+    assert lazy.legal_moves["key"] == {(0, 0)}
+    assert len(lazy.legal_moves) == 1
+    del lazy.legal_moves["key"]
+    assert not lazy.legal_moves
+
+
 def test_check_each_lane():
     """Test the check each lane method"""
     tiles1 = Tiles(400, 400, 100, 4)
@@ -114,3 +175,47 @@ def test_check_tile():
     assert tiles1.check_tile(1, 1, []) == (1, 1)
     assert tiles1.check_tile(1, 2, {(1, 1)}) is False
     assert tiles1.flip_set == {(1, 1)}
+
+
+def test_legal_moves_cache():
+    """Legal moves are only rebuilt after the position or turn changes."""
+    tiles1 = Tiles(400, 400, 100, 4)
+    tiles1.initial_tiles(tiles1.done_initial)
+    tiles1.generate_legal_moves()
+    assert (tiles1.cache_hits, tiles1.cache_misses) == (0, 1)
+    for _ in range(10):
+        tiles1.generate_legal_moves()
+    assert (tiles1.cache_hits, tiles1.cache_misses) == (10, 1)
+
+    tiles1.update_color(0, 1, "black")
+    tiles1.generate_legal_moves()
+    assert tiles1.cache_misses == 2
+    tiles1.place_black = not tiles1.place_black
+    tiles1.generate_legal_moves()
+    assert tiles1.cache_misses == 3
+    assert tiles1.cache_hits == 10
+
+
+def test_make_unmake_move():
+    """unmake_move restores the tiles, counters and turn exactly."""
+    tiles = Tiles(600, 600, 100, 6)
+    tiles.initial_tiles(False)
+    tiles.generate_legal_moves()
+    colors = [[tile.color for tile in row] for row in tiles.all_tiles]
+    flips = tiles.make_move(2, 1)
+    assert tiles.all_tiles[2][1].color == "black"
+    assert tiles.all_tiles[2][2].color == "black"
+    assert tiles.position.coordinates(flips) == [(2, 2)]
+    assert (tiles.bk_tiles, tiles.wt_tiles) == (4, 1)
+    assert tiles.place_black is False
+    tiles.generate_legal_moves()
+    row, col = sorted(tiles.legal_moves)[0]
+    tiles.make_move(row, col)
+    assert tiles.bk_tiles + tiles.wt_tiles == 6
+    tiles.unmake_move()
+    tiles.unmake_move()
+    assert [[tile.color for tile in row] for row in tiles.all_tiles] == colors
+    assert (tiles.bk_tiles, tiles.wt_tiles) == (2, 2)
+    assert tiles.place_black is True
+    tiles.generate_legal_moves()
+    assert (2, 1) in tiles.legal_moves
@@ -0,0 +1,225 @@
+# Plays a tournament between CompAI configurations on a pool of processes,
+# run from the command line:
+#     python tournament.py --ai random --ai negamax:0.05 --games 100
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from itertools import combinations
+from os import cpu_count
+from time import time
+from simulator import Simulator
+
+
+def play_task(task):
+    """
+    Given a task (index, TILES_DIMENS, black spec, white spec, seed), plays
+    the game and returns the task with its result.
+    """
+    index, dimens, black, white, seed = task
+    return task, Simulator(dimens, black, white).play_game(seed)
+
+
+def play_chunk(tasks):
+    """
+    Given a list of tasks, plays every game and returns a list of tasks with
+    their results. Runs in a worker process.
+    """
+    return [play_task(task) for task in tasks]
+
+
+class Tournament:
+    """
+    Round-robin tournament between AI specs, played on a process pool.
+
+    Every pair of specs plays games_per_pair games, alternating colors. Game
+    number i is seeded with seed + i, so with fixed budgets ("random",
+    "pattern", "mcts:<n>p") results do not depend on the number of workers
+    or the order in which games finish. Time budgets, such as "negamax:0.05"
+    or "mcts:1.5", reach a depth or a playout count that depends on the
+    load of the machine, so their results can vary from run to run.
+
+    Attributes
+    ----------
+    specs : list of str
+        AI specs taking part, see simulator.make_ai.
+    TILES_DIMENS : int
+        Number of tiles per side of the square board.
+    games_per_pair : int
+        Number of games played by every pair of specs.
+    seed : int
+        Seed of the first game.
+    workers : int
+        Number of worker processes. 1 plays every game in this process.
+    chunk_size : int
+        Number of games sent to a worker at a time.
+    standings : dict
+        key: AI spec.
+        value: dict of wins, losses, ties, games and disc_difference.
+    games : int
+        Counter of games played.
+    elapsed : float
+        Time taken by the last call to run, in seconds.
+
+    Methods
+    -------
+    tasks
+        Generates every game of the tournament as a task for play_task.
+    chunks
+        Generates the tasks in lists of chunk_size.
+    run
+        Plays every game and aggregates the results as they arrive.
+    collect
+        Records the results of finished futures.
+    record
+        Adds the result of one game to the standings.
+    games_per_second
+        Returns the throughput of the last call to run.
+    """
+    def __init__(self, specs, TILES_DIMENS=8, games_per_pair=10, seed=0,
+                 workers=None, chunk_size=8):
+        """
+        Parameters
+        ----------
+        specs : list of str
+            AI specs taking part, each once. A repeated spec raises
+            ValueError.
+        TILES_DIMENS : int (default 8)
+            Number of tiles per side of the square board.
+        games_per_pair : int (default 10)
+            Number of games played by every pair of specs.
+        seed : int (default 0)
+            Seed of the first game.
+        workers : int (default None)
+            Number of worker processes, None for one per CPU.
+        chunk_size : int (default 8)
+            Number of games sent to a worker at a time.
+        """
+        if len(set(specs)) != len(specs):
+            raise ValueError("every AI spec may only take part once")
+        self.specs = list(specs)
+        self.TILES_DIMENS = TILES_DIMENS
+        self.games_per_pair = games_per_pair
+        self.seed = seed
+        self.workers = workers or cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.standings = dict((spec, {"wins": 0, "losses": 0, "ties": 0,
+                                      "games": 0, "disc_difference": 0})
+                              for spec in self.specs)
+        self.games = 0
+        self.elapsed = 0.0
+
+    def tasks(self):
+        """Generates every game of the tournament as a task for play_task."""
+        index = 0
+        for first, second in combinations(self.specs, 2):
+            for game in range(self.games_per_pair):
+                if game % 2:
+                    black, white = second, first
+                else:
+                    black, white = first, second
+                yield (index, self.TILES_DIMENS, black, white,
+                       self.seed + index)
+                index += 1
+
+    def chunks(self):
+        """Generates the tasks in lists of chunk_size."""
+        chunk = []
+        for task in self.tasks():
+            chunk.append(task)
+            if len(chunk) == self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def run(self, progress=None):
+        """
+        Plays every game and aggregates the results as they arrive. Calls
+        progress(task, result) after each game if given. At most a few chunks
+        per worker are queued at a time, so memory does not grow with the
+        number of games.
+        """
+        start = time()
+        if self.workers == 1:
+            for task in self.tasks():
+                task, result = play_task(task)
+                self.record(task, result)
+                if progress:
+                    progress(task, result)
+        else:
+            limit = 4 * self.workers
+            with ProcessPoolExecutor(self.workers) as executor:
+                pending = set()
+                for chunk in self.chunks():
+                    pending.add(executor.submit(play_chunk, chunk))
+                    if len(pending) >= limit:
+                        done, pending = wait(pending,
+                                             return_when=FIRST_COMPLETED)
+                        self.collect(done, progress)
+                self.collect(wait(pending)[0], progress)
+        self.elapsed = time() - start
+        return self.standings
+
+    def collect(self, futures, progress):
+        """Records the results of finished futures."""
+        for future in futures:
+            for task, result in future.result():
+                self.record(task, result)
+                if progress:
+                    progress(task, result)
+
+    def record(self, task, result):
+        """Adds the result of one game to the standings."""
+        black, white = task[2], task[3]
+        difference = result["black"] - result["white"]
+        self.games += 1
+        for spec, sign in ((black, 1), (white, -1)):
+            standing = self.standings[spec]
+            standing["games"] += 1
+            standing["disc_difference"] += sign * difference
+            if result["winner"] == "tie":
+                standing["ties"] += 1
+            elif (result["winner"] == "black") == (sign == 1):
+                standing["wins"] += 1
+            else:
+                standing["losses"] += 1
+
+    def games_per_second(self):
+        """Returns the throughput of the last call to run."""
+        if not self.elapsed:
+            return 0.0
+        return self.games / self.elapsed
+
+
+def main(argv=None):
+    """Parses the command line, runs the tournament and prints standings."""
+    parser = ArgumentParser(description="Multi-core Othello tournament.")
+    parser.add_argument("--ai", action="append", required=True,
+                        help="AI spec, strategy[:seconds or playouts + p]; "
+                        "repeat")
+    parser.add_argument("--games", type=int, default=10,
+                        help="games per pair of AIs")
+    parser.add_argument("--dimens", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk-size", type=int, default=8)
+    args = parser.parse_args(argv)
+    if len(set(args.ai)) != len(args.ai):
+        parser.error("every --ai spec may only be given once")
+    if len(args.ai) < 2:
+        parser.error("at least two different --ai specs are needed")
+
+    tournament = Tournament(args.ai, args.dimens, args.games, args.seed,
+                            args.workers, args.chunk_size)
+    standings = tournament.run()
+    for spec in tournament.specs:
+        standing = standings[spec]
+        print("{0:20s} {1:5d} W {2:5d} L {3:5d} T  {4:+.2f} discs/game".format(
+            spec, standing["wins"], standing["losses"], standing["ties"],
+            float(standing["disc_difference"]) / max(standing["games"], 1)))
+    print("{0} games on {1} workers: {2:.2f}s, {3:.1f} games/s".format(
+        tournament.games, tournament.workers, tournament.elapsed,
+        tournament.games_per_second()))
+
+
+if __name__ == "__main__":
+    main()
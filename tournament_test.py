@@ -0,0 +1,52 @@
+# Test the Tournament class.
+import pytest
+from tournament import Tournament, main
+
+
+def test_tasks():
+    """Colors alternate and every game gets its own seed."""
+    tournament = Tournament(["a", "b", "c"], 4, 2, seed=10)
+    tasks = list(tournament.tasks())
+    assert len(tasks) == 6
+    assert tasks[0] == (0, 4, "a", "b", 10)
+    assert tasks[1] == (1, 4, "b", "a", 11)
+    assert tasks[2] == (2, 4, "a", "c", 12)
+    assert tasks[-1] == (5, 4, "c", "b", 15)
+    tournament.chunk_size = 4
+    assert [len(chunk) for chunk in tournament.chunks()] == [4, 2]
+
+
+def test_record():
+    """Test the record method."""
+    tournament = Tournament(["a", "b"], 4, 2)
+    tournament.record((0, 4, "a", "b", 0),
+                      {"black": 10, "white": 6, "winner": "black"})
+    tournament.record((1, 4, "b", "a", 1),
+                      {"black": 8, "white": 8, "winner": "tie"})
+    assert tournament.games == 2
+    assert tournament.standings["a"] == {"wins": 1, "losses": 0, "ties": 1,
+                                         "games": 2, "disc_difference": 4}
+    assert tournament.standings["b"] == {"wins": 0, "losses": 1, "ties": 1,
+                                         "games": 2, "disc_difference": -4}
+
+
+def test_run_is_deterministic():
+    """Standings do not depend on the number of workers."""
+    seen = []
+    serial = Tournament(["random", "random:1"], 6, 12, seed=3, workers=1)
+    serial.run(lambda task, result: seen.append(task[0]))
+    parallel = Tournament(["random", "random:1"], 6, 12, seed=3, workers=2,
+                          chunk_size=5)
+    parallel.run()
+    assert sorted(seen) == list(range(12))
+    assert parallel.games == serial.games == 12
+    assert parallel.standings == serial.standings
+    assert parallel.games_per_second() > 0
+
+
+def test_duplicate_specs():
+    """A spec given twice would merge two entrants, so it is rejected."""
+    with pytest.raises(ValueError):
+        Tournament(["random", "random", "negamax:1"])
+    with pytest.raises(SystemExit):
+        main(["--ai", "random", "--ai", "random", "--ai", "negamax:1"])
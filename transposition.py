@@ -0,0 +1,128 @@
+# Creates an instance of the TranspositionTable class, a fixed-size hash table
+# of search results keyed by Zobrist hash.
+from array import array
+
+# Bound types of a stored score.
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+try:
+    KEY_TYPECODE = "q"
+    array(KEY_TYPECODE)
+except ValueError:  # Jython has no "q", but its "l" is 64 bits wide.
+    KEY_TYPECODE = "l"
+# Bytes per entry: key 8, score 4, move 2, depth 1, bound 1, age 1.
+ENTRY_BYTES = 17
+POLICIES = ("depth", "always")
+
+
+class TranspositionTable:
+    """
+    Fixed-size table of search results, stored in flat arrays so that its
+    memory use never grows past max_bytes.
+
+    Attributes
+    ----------
+    size : int
+        Number of entries in the table.
+    policy : str
+        Replacement policy: "depth" keeps the deeper of two results from the
+        same search, "always" keeps the newest.
+    keys, scores, moves, depths, bounds, ages : arrays
+        One slot per entry. A depth of -1 marks an empty slot.
+    age : int
+        Counter of searches, used to replace results from older searches.
+    probes : int
+        Counter of probes since the last reset_stats.
+    hits : int
+        Counter of probes that found their key.
+    stores : int
+        Counter of results stored.
+    overwrites : int
+        Counter of stores that replaced a different position.
+
+    Methods
+    -------
+    probe
+        Given a key, returns the index of its entry or -1.
+    store
+        Stores a search result, following the replacement policy.
+    new_search
+        Marks every stored entry as coming from an older search.
+    clear
+        Removes every entry.
+    reset_stats
+        Resets the probe and store counters.
+    hit_rate
+        Returns the fraction of probes that found their key.
+    """
+    def __init__(self, max_bytes=1 << 22, policy="depth"):
+        """
+        Parameters
+        ----------
+        max_bytes : int (default 4 MiB)
+            Hard cap on the memory used by the entries.
+        policy : str (default depth)
+            Replacement policy, "depth" or "always".
+        """
+        if policy not in POLICIES:
+            raise ValueError("Unknown replacement policy: " + str(policy))
+        self.size = max(1, max_bytes // ENTRY_BYTES)
+        self.policy = policy
+        self.keys = array(KEY_TYPECODE, [0]) * self.size
+        self.scores = array("i", [0]) * self.size
+        self.moves = array("h", [-1]) * self.size
+        self.depths = array("b", [-1]) * self.size
+        self.bounds = array("b", [EXACT]) * self.size
+        self.ages = array("B", [0]) * self.size
+        self.age = 0
+        self.reset_stats()
+
+    def probe(self, key):
+        """Given a key, returns the index of its entry or -1."""
+        self.probes += 1
+        index = key % self.size
+        if self.depths[index] >= 0 and self.keys[index] == key:
+            self.hits += 1
+            return index
+        return -1
+
+    def store(self, key, depth, bound, score, move):
+        """Stores a search result, following the replacement policy."""
+        index = key % self.size
+        old_depth = self.depths[index]
+        same_key = self.keys[index] == key
+        if (self.policy == "depth" and old_depth > depth and not same_key and
+                self.ages[index] == self.age):
+            return  # Keep the deeper result from this search.
+        if old_depth >= 0 and not same_key:
+            self.overwrites += 1
+        self.stores += 1
+        self.keys[index] = key
+        self.scores[index] = score
+        self.moves[index] = move
+        self.depths[index] = depth
+        self.bounds[index] = bound
+        self.ages[index] = self.age
+
+    def new_search(self):
+        """Marks every stored entry as coming from an older search."""
+        self.age = (self.age + 1) % 256
+
+    def clear(self):
+        """Removes every entry."""
+        self.depths = array("b", [-1]) * self.size
+
+    def reset_stats(self):
+        """Resets the probe and store counters."""
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+        self.overwrites = 0
+
+    def hit_rate(self):
+        """Returns the fraction of probes that found their key."""
+        if not self.probes:
+            return 0.0
+        return float(self.hits) / self.probes
@@ -0,0 +1,73 @@
+# Test the TranspositionTable class.
+from transposition import (TranspositionTable, ENTRY_BYTES, EXACT, LOWER,
+                           UPPER)
+
+
+def test_constructor():
+    """Test the constructor."""
+    table = TranspositionTable(1000 * ENTRY_BYTES, "always")
+    assert table.size == 1000
+    assert table.policy == "always"
+    assert table.probes == 0
+    assert table.hits == 0
+    for array in (table.keys, table.scores, table.moves, table.depths,
+                  table.bounds, table.ages):
+        assert len(array) == 1000
+    assert (len(table.keys) * table.keys.itemsize +
+            len(table.scores) * table.scores.itemsize +
+            len(table.moves) * table.moves.itemsize +
+            len(table.depths) * table.depths.itemsize +
+            len(table.bounds) * table.bounds.itemsize +
+            len(table.ages) * table.ages.itemsize) <= 1000 * ENTRY_BYTES
+
+
+def test_unknown_policy():
+    """An unknown replacement policy is rejected."""
+    try:
+        TranspositionTable(1000, "never")
+    except ValueError:
+        return
+    assert False
+
+
+def test_store_and_probe():
+    """Test the store and probe methods."""
+    table = TranspositionTable(100 * ENTRY_BYTES)
+    assert table.probe(12345) == -1
+    table.store(12345, 4, LOWER, -7, 19)
+    index = table.probe(12345)
+    assert index >= 0
+    assert table.depths[index] == 4
+    assert table.bounds[index] == LOWER
+    assert table.scores[index] == -7
+    assert table.moves[index] == 19
+    assert table.probe(12345 + 100) == -1  # Same slot, different key.
+    assert (table.probes, table.hits) == (3, 1)
+    assert table.hit_rate() == 1 / 3.0
+    table.clear()
+    assert table.probe(12345) == -1
+
+
+def test_depth_policy():
+    """The depth policy keeps the deeper result from the same search."""
+    table = TranspositionTable(100 * ENTRY_BYTES, "depth")
+    table.store(5, 6, EXACT, 1, 1)
+    table.store(105, 2, UPPER, 2, 2)
+    assert table.probe(5) >= 0
+    assert table.probe(105) == -1
+    table.store(5, 1, EXACT, 3, 3)  # Same position always updates.
+    assert table.scores[table.probe(5)] == 3
+    table.store(5, 6, EXACT, 1, 1)
+    table.new_search()
+    table.store(105, 2, UPPER, 2, 2)  # Older results are replaced.
+    assert table.probe(105) >= 0
+    assert table.overwrites == 1
+
+
+def test_always_policy():
+    """The always policy keeps the newest result."""
+    table = TranspositionTable(100 * ENTRY_BYTES, "always")
+    table.store(5, 6, EXACT, 1, 1)
+    table.store(105, 2, UPPER, 2, 2)
+    assert table.probe(5) == -1
+    assert table.probe(105) >= 0